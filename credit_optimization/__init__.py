@@ -0,0 +1,51 @@
+"""
+Credit allocation optimization by economic scenario
+
+    from credit_optimization import load_config, run_scenario
+    result = run_scenario(load_config('scenarios/scenario_1.json'))
+"""
+
+from .cleaning import clean_dataset, validate_cleaned_data
+from .compliance import evaluate_compliance, evaluate_compliance_batch
+from .config import ScenarioConfig, load_config, config_from_dict
+from .dashboard import render_dashboard, start_dashboard_rendering
+from .decisions import DecisionStore, write_decision_store
+from .ensemble import EnsembleResult, run_ensemble
+from .export import results_table, write_results, write_analysis_workbook
+from .incremental import incremental_update
+from .metrics import compute_portfolio_metrics, category_analysis_table
+from .mps import load_model, save_model
+from .multiperiod import MultiPeriodResult, optimize_multiperiod
+from .optimizer import AllocationModel, OptimizationResult, build_model, optimize
+from .outliers import KLLSketch, OutlierSketches
+from .pd_model import LogisticPDModel, fit_pd_model
+from .portfolio import Portfolio
+from .preview import PreviewResult, preview_scenario
+from .pipeline import (
+    PipelineError, ScenarioResult, load_dataset, prepare_clients, compute_scenario,
+    write_outputs, report_scenario, run_scenario
+)
+from .scaling import solve_scaled
+from .scoring import score_clients, prepare_optimizer_inputs
+from .sensitivity import sensitivity_report
+from .service import WhatIfService
+from .solution_cache import SolutionCache
+from .stages import CheckpointStore, run_stages
+from .stress import run_stress
+
+__all__ = [
+    'clean_dataset', 'validate_cleaned_data', 'evaluate_compliance', 'evaluate_compliance_batch',
+    'ScenarioConfig', 'load_config', 'config_from_dict',
+    'render_dashboard', 'start_dashboard_rendering',
+    'DecisionStore', 'write_decision_store', 'EnsembleResult', 'run_ensemble',
+    'results_table', 'write_results', 'write_analysis_workbook',
+    'incremental_update', 'compute_portfolio_metrics', 'category_analysis_table',
+    'load_model', 'save_model', 'MultiPeriodResult', 'optimize_multiperiod',
+    'KLLSketch', 'OutlierSketches', 'LogisticPDModel', 'fit_pd_model',
+    'Portfolio', 'PreviewResult', 'preview_scenario',
+    'AllocationModel', 'OptimizationResult', 'build_model', 'optimize',
+    'PipelineError', 'ScenarioResult', 'load_dataset', 'prepare_clients', 'compute_scenario',
+    'write_outputs', 'report_scenario', 'run_scenario',
+    'solve_scaled', 'score_clients', 'prepare_optimizer_inputs', 'sensitivity_report', 'WhatIfService', 'SolutionCache',
+    'CheckpointStore', 'run_stages', 'run_stress'
+]
@@ -0,0 +1,7 @@
+import sys
+
+from .cli import main
+
+# Garde: les workers multiprocessing (spawn/forkserver) réimportent ce module
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+Pipelined execution of several scenarios
+
+Scenario k+1 is cleaned, scored and solved in a worker process while the
+outputs of scenario k are written. The openpyxl exports hold the GIL, so
+they run on a pool of io_workers processes and up to max_pending scenarios
+are written at the same time; the dashboards are rendered on their own
+processes. A bounded queue between the compute and output stages caps the
+number of finished scenarios held in memory.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .dashboard import render_dashboard
+from .pipeline import PipelineError, compute_scenario, dashboard_job, export_results, load_dataset, report_scenario
+from .workers import process_context
+
+
+def _busy_time(intervals):
+    """Total length of the union of (start, end) intervals"""
+    total = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+class BatchRunner:
+    """
+    Two-stage pipeline (compute, then outputs) over a list of scenarios
+
+    Parameters:
+    data: str or None - extract used by every scenario (default: config.dataset)
+    incremental: bool - incremental cleaning and scoring
+    output_dir: str - root directory of the outputs
+    store_dir: str - directory of the incremental stores
+    partitions: int or None - partitioned cleaning and scoring
+    max_pending: int - computed scenarios written at the same time (and
+                 allowed to wait for a writer)
+    io_workers: int - processes writing the Excel files
+    verbose: bool - print the per-scenario reports and the batch summary
+    """
+
+    def __init__(self, data=None, incremental=False, output_dir='.', store_dir='cache', partitions=None,
+                 max_pending=2, io_workers=2, verbose=True):
+        self.data = data
+        self.incremental = incremental
+        self.partitions = partitions
+        self.output_dir = output_dir
+        self.store_dir = store_dir
+        self.max_pending = max_pending
+        self.io_workers = io_workers
+        self.verbose = verbose
+        self.timeline = []
+
+    def _record(self, scenario_id, stage, start, end):
+        self.timeline.append({'scenario': scenario_id, 'etape': stage, 'debut': start, 'fin': end})
+
+    async def _timed(self, scenario_id, stage, executor, fn, *args):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            return await loop.run_in_executor(executor, fn, *args)
+        finally:
+            self._record(scenario_id, stage, start, time.perf_counter())
+
+    async def _produce(self, configs, queue, failures):
+        for config in configs:
+            try:
+                raw = await self._timed(config.id, 'lecture', self._read_pool, load_dataset,
+                                        self.data or config.dataset)
+                result = await self._timed(config.id, 'calcul', self._compute_pool, compute_scenario,
+                                           config, raw, self.incremental, self.store_dir, False, self.partitions,
+                                           None, self.data)
+            except Exception as e:
+                # Une erreur d'un scénario (section invalide, pool de processus cassé...) n'arrête pas le lot
+                erreur = str(e) if isinstance(e, (PipelineError, OSError)) else \
+                    f"Erreur lors du calcul: {type(e).__name__}: {e}"
+                failures[config.id] = erreur
+                if self.verbose:
+                    print(f"{config.title}: {erreur}")
+                continue
+
+            if self.verbose:
+                print(f"{config.title}: calcul terminé en {sum(result.timings.values()):.1f}s "
+                      f"({result.metrics['clients_selectionnes']:,} clients sélectionnés)")
+            # Bloque tant que max_pending scénarios attendent un écrivain
+            await queue.put(result)
+        await queue.put(None)
+
+    async def _write(self, result):
+        jobs = [self._timed(result.config.id, 'export', self._export_pool, export_results,
+                            result, self.output_dir, False)]
+        dashboard = dashboard_job(result, self.output_dir)
+        if dashboard is not None:
+            args, kwargs = dashboard
+            jobs.append(self._timed(result.config.id, 'graphiques', self._render_pool,
+                                    _render, args, kwargs))
+
+        start = time.perf_counter()
+        outputs, *rendering = await asyncio.gather(*jobs, return_exceptions=True)
+        result.timings['export'] = time.perf_counter() - start
+
+        if isinstance(outputs, Exception):
+            raise outputs
+        outputs['dashboard'] = None
+        if rendering:
+            if isinstance(rendering[0], Exception):
+                if self.verbose:
+                    print(f"Erreur lors de la génération des graphiques: {rendering[0]}")
+            else:
+                outputs['dashboard'] = rendering[0]
+        result.outputs = outputs
+
+    async def _write_and_report(self, result, results, failures, slots):
+        try:
+            await self._write(result)
+        except Exception as e:
+            failures[result.config.id] = f"Erreur lors de l'export: {e}"
+            if self.verbose:
+                print(f"{result.config.title}: {failures[result.config.id]}")
+            return
+        finally:
+            slots.release()
+        results.append(result)
+        report_scenario(result, self.verbose)
+
+    async def _consume(self, queue, results, failures):
+        # Jusqu'à max_pending scénarios écrits simultanément
+        slots = asyncio.Semaphore(self.max_pending)
+        writers = []
+        while True:
+            await slots.acquire()
+            result = await queue.get()
+            if result is None:
+                break
+            writers.append(asyncio.create_task(self._write_and_report(result, results, failures, slots)))
+        await asyncio.gather(*writers)
+
+    async def run_async(self, configs):
+        """
+        Run the scenarios and return the batch report (see summary)
+        """
+        self.timeline = []
+        results, failures = [], {}
+        queue = asyncio.Queue(maxsize=self.max_pending)
+
+        context = process_context()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=1) as self._read_pool, \
+                ProcessPoolExecutor(max_workers=self.io_workers, mp_context=context) as self._export_pool, \
+                ProcessPoolExecutor(max_workers=1, mp_context=context) as self._compute_pool, \
+                ProcessPoolExecutor(max_workers=self.max_pending, mp_context=context) as self._render_pool:
+            await asyncio.gather(
+                self._produce(configs, queue, failures),
+                self._consume(queue, results, failures)
+            )
+        wall_time = time.perf_counter() - start
+
+        report = self.summary(wall_time)
+        report['results'] = results
+        report['failures'] = failures
+        return report
+
+    def run(self, configs):
+        return asyncio.run(self.run_async(configs))
+
+    def summary(self, wall_time):
+        """
+        Overlap statistics of the last run
+
+        Returns:
+        report: dict - compute_time, io_time (busy time of each stage),
+                wall_time, sequential_time (compute + every output task
+                one after the other), overlap_efficiency (share of that
+                output time hidden by running it alongside the compute and
+                the other outputs) and export_concurrency (average number
+                of exports running while one is)
+        """
+        compute = [(t['debut'], t['fin']) for t in self.timeline if t['etape'] == 'calcul']
+        io = [(t['debut'], t['fin']) for t in self.timeline if t['etape'] != 'calcul']
+        exports = [(t['debut'], t['fin']) for t in self.timeline if t['etape'] == 'export']
+
+        compute_time = _busy_time(compute)
+        io_time = _busy_time(io)
+        io_total = sum(fin - debut for debut, fin in io)
+        sequential_time = compute_time + io_total
+        hidden = max(0.0, sequential_time - wall_time)
+        export_busy = _busy_time(exports)
+
+        report = {
+            'compute_time': compute_time,
+            'io_time': io_time,
+            'wall_time': wall_time,
+            'sequential_time': sequential_time,
+            'overlap_efficiency': min(1.0, hidden / io_total) if io_total > 0 else 1.0,
+            'export_concurrency': sum(fin - debut for debut, fin in exports) / export_busy if export_busy > 0 else 0.0,
+            'timeline': list(self.timeline)
+        }
+
+        if self.verbose:
+            print(f"\n{'='*60}")
+            print("RÉSUMÉ DU LOT")
+            print(f"{'='*60}")
+            print(f"Temps de calcul:        {compute_time:.1f}s")
+            print(f"Temps d'entrées/sorties: {io_time:.1f}s")
+            print(f"Durée séquentielle:     {sequential_time:.1f}s")
+            print(f"Durée du lot:           {wall_time:.1f}s "
+                  f"({wall_time / compute_time if compute_time > 0 else 0:.2f}x le temps de calcul)")
+            print(f"Recouvrement:           {report['overlap_efficiency']*100:.0f}% des entrées/sorties masquées, "
+                  f"{report['export_concurrency']:.1f} exports simultanés en moyenne")
+        return report
+
+
+def _render(args, kwargs):
+    return render_dashboard(*args, **kwargs)
+
+
+def run_batch(configs, **kwargs):
+    """
+    Run several scenarios with overlapped compute and output stages
+
+    Parameters:
+    configs: list of ScenarioConfig
+    **kwargs: BatchRunner options
+
+    Returns:
+    report: dict - results, failures and overlap statistics
+    """
+    return BatchRunner(**kwargs).run(configs)
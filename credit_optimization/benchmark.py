@@ -0,0 +1,155 @@
+"""
+Replay of saved allocation models on the local solver backends
+
+Every model written by mps.save_model (--export-model) is loaded and solved
+by each backend with each option set; the report gives the solve time
+(median and best of the repeats), the iterations and the objective, and
+the relative gap to the objective recorded at export time.
+
+    python -m credit_optimization.benchmark results/models/*.mps
+        [--backends highs highs-ds highs-ipm dual] [--options options.json]
+        [--repeat 3] [--output benchmark.csv]
+
+options.json maps a set name to solver options, e.g.
+{"defaut": {}, "sans_presolve": {"presolve": false}}. HiGHS backends take
+the linprog options (presolve, time_limit, dual_feasibility_tolerance...),
+the dual backend the keys of dual_solver.DEFAULTS; other keys are ignored.
+"""
+
+import argparse
+import json
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import linprog
+
+from .dual_solver import DEFAULTS as DUAL_DEFAULTS, solve_dual
+from .mps import load_model
+
+DEFAULT_OPTION_SETS = {'defaut': {}}
+
+
+def _linprog_backend(method):
+    def solve(model, options):
+        res = linprog(model.c, A_ub=model.A_ub, b_ub=model.b_ub, bounds=model.bounds, method=method,
+                      options=options)
+        return {'statut': res.status, 'message': res.message, 'objectif': float(res.fun) if res.success else np.nan,
+                'iterations': int(res.nit)}
+    return solve
+
+
+def _dual_backend(model, options):
+    if model.extended:
+        return {'statut': None, 'message': 'Modèle avec variables auxiliaires: solveur dual non applicable',
+                'objectif': np.nan, 'iterations': 0}
+    params = {**DUAL_DEFAULTS, **{key: value for key, value in options.items() if key in DUAL_DEFAULTS}}
+    res, report = solve_dual(model, params['tolerance'], params['max_iterations'], params['band'],
+                             params['max_rounds'])
+    if res is None:
+        return {'statut': 1, 'message': 'Récupération primale non conclusive', 'objectif': np.nan,
+                'iterations': report['iterations']}
+    return {'statut': 0, 'message': res.message, 'objectif': float(res.fun), 'iterations': report['iterations']}
+
+
+BACKENDS = {
+    'highs': _linprog_backend('highs'),
+    'highs-ds': _linprog_backend('highs-ds'),
+    'highs-ipm': _linprog_backend('highs-ipm'),
+    'dual': _dual_backend
+}
+
+
+def _backend_options(backend, options):
+    if backend == 'dual':
+        return {key: value for key, value in options.items() if key in DUAL_DEFAULTS}
+    return {key: value for key, value in options.items() if key not in DUAL_DEFAULTS}
+
+
+def replay(paths, backends=None, option_sets=None, repeat=1, verbose=True):
+    """
+    Solve every saved model with every backend and option set
+
+    Parameters:
+    paths: list of str - .mps files written by save_model
+    backends: list of str or None - keys of BACKENDS (all if None)
+    option_sets: dict or None - set name -> options (DEFAULT_OPTION_SETS if None)
+    repeat: int - solves per combination (median and best time reported)
+
+    Returns:
+    report: pandas DataFrame, one row per model × backend × option set
+    """
+    backends = backends or list(BACKENDS)
+    inconnus = set(backends) - set(BACKENDS)
+    if inconnus:
+        raise ValueError(f"Solveurs inconnus: {', '.join(sorted(inconnus))}")
+    option_sets = option_sets or DEFAULT_OPTION_SETS
+
+    lignes = []
+    for path in paths:
+        model, metadata = load_model(path)
+        reference = metadata.get('objectif')
+        if verbose:
+            print(f"{path}: {model.n_variables:,} variables, {len(model.row_names)} contraintes")
+        for backend in backends:
+            vus = set()
+            for nom, options in option_sets.items():
+                options = _backend_options(backend, options)
+                # Jeux d'options identiques pour ce solveur: une seule mesure
+                signature = json.dumps(options, sort_keys=True)
+                if signature in vus:
+                    continue
+                vus.add(signature)
+                durees = []
+                for _ in range(repeat):
+                    debut = time.perf_counter()
+                    resultat = BACKENDS[backend](model, options)
+                    durees.append(time.perf_counter() - debut)
+                ecart = abs(resultat['objectif'] - reference) / max(abs(reference), 1.0) \
+                    if reference is not None else np.nan
+                lignes.append({
+                    'modele': metadata.get('scenario', path), 'fichier': path, 'backend': backend,
+                    'options': nom, 'statut': resultat['statut'], 'objectif': resultat['objectif'],
+                    'iterations': resultat['iterations'], 'duree': float(np.median(durees)),
+                    'duree_min': min(durees), 'ecart_reference': ecart, 'message': resultat['message']
+                })
+                if verbose:
+                    print(f"  {backend:<10} {nom:<16} {lignes[-1]['duree']:8.3f}s  "
+                          f"{resultat['iterations']:>7} it.  objectif {resultat['objectif']:,.2f}")
+    return pd.DataFrame(lignes)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m credit_optimization.benchmark',
+        description='Rejouer les modèles exportés sur les solveurs disponibles'
+    )
+    parser.add_argument('models', nargs='+', metavar='MPS', help='modèles exportés (.mps)')
+    parser.add_argument('--backends', nargs='+', default=None, choices=list(BACKENDS),
+                        help='solveurs à comparer (défaut: tous)')
+    parser.add_argument('--options', default=None,
+                        help="fichier JSON des jeux d'options {nom: {option: valeur}}")
+    parser.add_argument('--repeat', type=int, default=1, help='résolutions par combinaison (défaut: 1)')
+    parser.add_argument('--output', default=None, help='rapport CSV')
+    args = parser.parse_args(argv)
+    warnings.filterwarnings('ignore')
+
+    option_sets = None
+    if args.options:
+        with open(args.options, encoding='utf-8') as f:
+            option_sets = json.load(f)
+    try:
+        report = replay(args.models, args.backends, option_sets, args.repeat)
+    except (OSError, ValueError) as e:
+        print(f"Erreur: {e}")
+        return 1
+    if args.output:
+        report.to_csv(args.output, index=False)
+        print(f"Rapport exporté vers '{args.output}'")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,25 +5,35 @@ Comprehensive data validation and outlier removal functions
 
 import pandas as pd
 import numpy as np
-import warnings
-warnings.filterwarnings('ignore')
 
-def clean_dataset(df, scenario_name="Unknown"):
+from .outliers import outlier_mask
+
+
+def _silent(*args, **kwargs):
+    pass
+
+
+def clean_dataset(df, scenario_name="Unknown", verbose=True, outlier_bounds=None):
     """
     Comprehensive data cleaning function to remove abnormal values
     
     Parameters:
     df: pandas DataFrame - the raw dataset
     scenario_name: str - name of the scenario for logging
+    verbose: bool - print the cleaning report
+    outlier_bounds: pandas DataFrame or None - accepted range per column and
+                    loan_intent segment (see outliers.py); None skips the
+                    statistical outlier rules
     
     Returns:
     df_clean: pandas DataFrame - cleaned dataset
     cleaning_report: dict - report of cleaning actions
     """
+    log = print if verbose else _silent
     
-    print(f"\n{'='*60}")
-    print(f"DATA CLEANING REPORT - {scenario_name}")
-    print(f"{'='*60}")
+    log(f"\n{'='*60}")
+    log(f"DATA CLEANING REPORT - {scenario_name}")
+    log(f"{'='*60}")
     
     # Initialize cleaning report
     cleaning_report = {
@@ -36,23 +46,23 @@ def clean_dataset(df, scenario_name="Unknown"):
     df_clean = df.copy()
     initial_count = len(df_clean)
     
-    print(f"Original dataset: {initial_count:,} records")
+    log(f"Original dataset: {initial_count:,} records")
     
     # 1. Remove records with unrealistic ages
-    print(f"\n1. AGE VALIDATION")
+    log(f"\n1. AGE VALIDATION")
     age_issues = (df_clean['person_age'] < 18) | (df_clean['person_age'] > 100)
     age_removed = age_issues.sum()
     
     if age_removed > 0:
-        print(f"   Removing {age_removed:,} records with age < 18 or > 100")
-        print(f"   Age range of removed records: {df_clean[age_issues]['person_age'].min():.0f} to {df_clean[age_issues]['person_age'].max():.0f}")
+        log(f"   Removing {age_removed:,} records with age < 18 or > 100")
+        log(f"   Age range of removed records: {df_clean[age_issues]['person_age'].min():.0f} to {df_clean[age_issues]['person_age'].max():.0f}")
         df_clean = df_clean[~age_issues]
         cleaning_report['cleaning_actions'].append(f"Removed {age_removed} records with unrealistic ages")
     else:
-        print(f"   ✓ No age issues found")
+        log(f"   ✓ No age issues found")
     
     # 2. Remove records with impossible employment lengths
-    print(f"\n2. EMPLOYMENT LENGTH VALIDATION")
+    log(f"\n2. EMPLOYMENT LENGTH VALIDATION")
     emp_issues = (
         (df_clean['person_emp_length'] > df_clean['person_age']) |  # Employment > age
         (df_clean['person_emp_length'] > 80) |  # Employment > 80 years
@@ -61,26 +71,26 @@ def clean_dataset(df, scenario_name="Unknown"):
     emp_removed = emp_issues.sum()
     
     if emp_removed > 0:
-        print(f"   Removing {emp_removed:,} records with employment length issues")
+        log(f"   Removing {emp_removed:,} records with employment length issues")
         # Show specific issues
         emp_gt_age = (df_clean['person_emp_length'] > df_clean['person_age']).sum()
         emp_gt_80 = (df_clean['person_emp_length'] > 80).sum()
         emp_negative = (df_clean['person_emp_length'] < 0).sum()
         
         if emp_gt_age > 0:
-            print(f"   - Employment > age: {emp_gt_age:,} records")
+            log(f"   - Employment > age: {emp_gt_age:,} records")
         if emp_gt_80 > 0:
-            print(f"   - Employment > 80 years: {emp_gt_80:,} records")
+            log(f"   - Employment > 80 years: {emp_gt_80:,} records")
         if emp_negative > 0:
-            print(f"   - Negative employment: {emp_negative:,} records")
+            log(f"   - Negative employment: {emp_negative:,} records")
             
         df_clean = df_clean[~emp_issues]
         cleaning_report['cleaning_actions'].append(f"Removed {emp_removed} records with employment length issues")
     else:
-        print(f"   ✓ No employment length issues found")
+        log(f"   ✓ No employment length issues found")
     
     # 3. Remove records with impossible credit history lengths
-    print(f"\n3. CREDIT HISTORY VALIDATION")
+    log(f"\n3. CREDIT HISTORY VALIDATION")
     hist_issues = (
         (df_clean['cb_person_cred_hist_length'] > df_clean['person_age']) |  # History > age
         (df_clean['cb_person_cred_hist_length'] > 80) |  # History > 80 years
@@ -89,26 +99,26 @@ def clean_dataset(df, scenario_name="Unknown"):
     hist_removed = hist_issues.sum()
     
     if hist_removed > 0:
-        print(f"   Removing {hist_removed:,} records with credit history issues")
+        log(f"   Removing {hist_removed:,} records with credit history issues")
         # Show specific issues
         hist_gt_age = (df_clean['cb_person_cred_hist_length'] > df_clean['person_age']).sum()
         hist_gt_80 = (df_clean['cb_person_cred_hist_length'] > 80).sum()
         hist_negative = (df_clean['cb_person_cred_hist_length'] < 0).sum()
         
         if hist_gt_age > 0:
-            print(f"   - Credit history > age: {hist_gt_age:,} records")
+            log(f"   - Credit history > age: {hist_gt_age:,} records")
         if hist_gt_80 > 0:
-            print(f"   - Credit history > 80 years: {hist_gt_80:,} records")
+            log(f"   - Credit history > 80 years: {hist_gt_80:,} records")
         if hist_negative > 0:
-            print(f"   - Negative credit history: {hist_negative:,} records")
+            log(f"   - Negative credit history: {hist_negative:,} records")
             
         df_clean = df_clean[~hist_issues]
         cleaning_report['cleaning_actions'].append(f"Removed {hist_removed} records with credit history issues")
     else:
-        print(f"   ✓ No credit history issues found")
+        log(f"   ✓ No credit history issues found")
     
     # 4. Remove records with unrealistic income values
-    print(f"\n4. INCOME VALIDATION")
+    log(f"\n4. INCOME VALIDATION")
     income_issues = (
         (df_clean['person_income'] <= 0) |  # Zero or negative income
         (df_clean['person_income'] > 10_000_000)  # Income > 10M (unrealistic)
@@ -116,22 +126,22 @@ def clean_dataset(df, scenario_name="Unknown"):
     income_removed = income_issues.sum()
     
     if income_removed > 0:
-        print(f"   Removing {income_removed:,} records with income issues")
+        log(f"   Removing {income_removed:,} records with income issues")
         zero_income = (df_clean['person_income'] <= 0).sum()
         high_income = (df_clean['person_income'] > 10_000_000).sum()
         
         if zero_income > 0:
-            print(f"   - Zero/negative income: {zero_income:,} records")
+            log(f"   - Zero/negative income: {zero_income:,} records")
         if high_income > 0:
-            print(f"   - Income > 10M: {high_income:,} records")
+            log(f"   - Income > 10M: {high_income:,} records")
             
         df_clean = df_clean[~income_issues]
         cleaning_report['cleaning_actions'].append(f"Removed {income_removed} records with income issues")
     else:
-        print(f"   ✓ No income issues found")
+        log(f"   ✓ No income issues found")
     
     # 5. Remove records with unrealistic loan amounts
-    print(f"\n5. LOAN AMOUNT VALIDATION")
+    log(f"\n5. LOAN AMOUNT VALIDATION")
     loan_issues = (
         (df_clean['loan_amnt'] <= 0) |  # Zero or negative loan
         (df_clean['loan_amnt'] > 1_000_000)  # Loan > 1M (very high)
@@ -139,22 +149,22 @@ def clean_dataset(df, scenario_name="Unknown"):
     loan_removed = loan_issues.sum()
     
     if loan_removed > 0:
-        print(f"   Removing {loan_removed:,} records with loan amount issues")
+        log(f"   Removing {loan_removed:,} records with loan amount issues")
         zero_loan = (df_clean['loan_amnt'] <= 0).sum()
         high_loan = (df_clean['loan_amnt'] > 1_000_000).sum()
         
         if zero_loan > 0:
-            print(f"   - Zero/negative loan: {zero_loan:,} records")
+            log(f"   - Zero/negative loan: {zero_loan:,} records")
         if high_loan > 0:
-            print(f"   - Loan > 1M: {high_loan:,} records")
+            log(f"   - Loan > 1M: {high_loan:,} records")
             
         df_clean = df_clean[~loan_issues]
         cleaning_report['cleaning_actions'].append(f"Removed {loan_removed} records with loan amount issues")
     else:
-        print(f"   ✓ No loan amount issues found")
+        log(f"   ✓ No loan amount issues found")
     
     # 6. Remove records with unrealistic interest rates
-    print(f"\n6. INTEREST RATE VALIDATION")
+    log(f"\n6. INTEREST RATE VALIDATION")
     rate_issues = (
         (df_clean['loan_int_rate'] <= 0) |  # Zero or negative rate
         (df_clean['loan_int_rate'] > 100)   # Rate > 100%
@@ -162,22 +172,22 @@ def clean_dataset(df, scenario_name="Unknown"):
     rate_removed = rate_issues.sum()
     
     if rate_removed > 0:
-        print(f"   Removing {rate_removed:,} records with interest rate issues")
+        log(f"   Removing {rate_removed:,} records with interest rate issues")
         zero_rate = (df_clean['loan_int_rate'] <= 0).sum()
         high_rate = (df_clean['loan_int_rate'] > 100).sum()
         
         if zero_rate > 0:
-            print(f"   - Zero/negative rate: {zero_rate:,} records")
+            log(f"   - Zero/negative rate: {zero_rate:,} records")
         if high_rate > 0:
-            print(f"   - Rate > 100%: {high_rate:,} records")
+            log(f"   - Rate > 100%: {high_rate:,} records")
             
         df_clean = df_clean[~rate_issues]
         cleaning_report['cleaning_actions'].append(f"Removed {rate_removed} records with interest rate issues")
     else:
-        print(f"   ✓ No interest rate issues found")
+        log(f"   ✓ No interest rate issues found")
     
     # 7. Remove records with unrealistic loan-to-income ratios
-    print(f"\n7. LOAN-TO-INCOME RATIO VALIDATION")
+    log(f"\n7. LOAN-TO-INCOME RATIO VALIDATION")
     ratio_issues = (
         (df_clean['loan_percent_income'] <= 0) |  # Zero or negative ratio
         (df_clean['loan_percent_income'] > 5)     # Ratio > 500%
@@ -185,57 +195,75 @@ def clean_dataset(df, scenario_name="Unknown"):
     ratio_removed = ratio_issues.sum()
     
     if ratio_removed > 0:
-        print(f"   Removing {ratio_removed:,} records with loan-to-income ratio issues")
+        log(f"   Removing {ratio_removed:,} records with loan-to-income ratio issues")
         zero_ratio = (df_clean['loan_percent_income'] <= 0).sum()
         high_ratio = (df_clean['loan_percent_income'] > 5).sum()
         
         if zero_ratio > 0:
-            print(f"   - Zero/negative ratio: {zero_ratio:,} records")
+            log(f"   - Zero/negative ratio: {zero_ratio:,} records")
         if high_ratio > 0:
-            print(f"   - Ratio > 500%: {high_ratio:,} records")
+            log(f"   - Ratio > 500%: {high_ratio:,} records")
             
         df_clean = df_clean[~ratio_issues]
         cleaning_report['cleaning_actions'].append(f"Removed {ratio_removed} records with ratio issues")
     else:
-        print(f"   ✓ No loan-to-income ratio issues found")
+        log(f"   ✓ No loan-to-income ratio issues found")
     
+    # 7b. Remove statistical outliers (IQR/MAD per loan_intent segment), only with outlier bounds
+    if outlier_bounds is not None:
+        log(f"\n7b. STATISTICAL OUTLIER VALIDATION (optional)")
+        outlier_issues, outlier_counts = outlier_mask(df_clean, outlier_bounds)
+        outlier_removed = outlier_issues.sum()
+
+        if outlier_removed > 0:
+            log(f"   Removing {outlier_removed:,} records outside the range of their segment")
+            for col, count in outlier_counts.items():
+                if count > 0:
+                    log(f"   - {col}: {count:,} records")
+
+            df_clean = df_clean[~outlier_issues]
+            cleaning_report['cleaning_actions'].append(f"Removed {outlier_removed} statistical outliers")
+        else:
+            log(f"   ✓ No statistical outliers found")
+
     # 8. Remove duplicate records
-    print(f"\n8. DUPLICATE RECORDS VALIDATION")
+    log(f"\n8. DUPLICATE RECORDS VALIDATION")
     duplicates = df_clean.duplicated()
     dup_removed = duplicates.sum()
     
     if dup_removed > 0:
-        print(f"   Removing {dup_removed:,} duplicate records")
+        log(f"   Removing {dup_removed:,} duplicate records")
         df_clean = df_clean[~duplicates]
         cleaning_report['cleaning_actions'].append(f"Removed {dup_removed} duplicate records")
     else:
-        print(f"   ✓ No duplicate records found")
+        log(f"   ✓ No duplicate records found")
     
     # Final statistics
     final_count = len(df_clean)
     total_removed = initial_count - final_count
     
-    print(f"\n{'='*60}")
-    print(f"CLEANING SUMMARY")
-    print(f"{'='*60}")
-    print(f"Original records:    {initial_count:,}")
-    print(f"Records removed:     {total_removed:,} ({(total_removed/initial_count*100):.2f}%)")
-    print(f"Final clean records: {final_count:,} ({(final_count/initial_count*100):.2f}%)")
+    log(f"\n{'='*60}")
+    log(f"CLEANING SUMMARY")
+    log(f"{'='*60}")
+    log(f"Original records:    {initial_count:,}")
+    log(f"Records removed:     {total_removed:,} ({(total_removed/initial_count*100):.2f}%)")
+    log(f"Final clean records: {final_count:,} ({(final_count/initial_count*100):.2f}%)")
     
     # Update cleaning report
     cleaning_report['removed_records'] = total_removed
     cleaning_report['final_records'] = final_count
     
     # Validate data consistency after cleaning
-    print(f"\n9. POST-CLEANING VALIDATION")
-    validate_cleaned_data(df_clean)
+    log(f"\n9. POST-CLEANING VALIDATION")
+    validate_cleaned_data(df_clean, verbose)
     
     return df_clean, cleaning_report
 
-def validate_cleaned_data(df):
+def validate_cleaned_data(df, verbose=True):
     """
     Validate that the cleaned data meets all consistency requirements
     """
+    log = print if verbose else _silent
     issues = []
     
     # Check age consistency
@@ -283,10 +311,10 @@ def validate_cleaned_data(df):
         issues.append("Ratio > 500% still present")
     
     if issues:
-        print(f"   ⚠️  VALIDATION ISSUES FOUND:")
+        log(f"   ⚠️  VALIDATION ISSUES FOUND:")
         for issue in issues:
-            print(f"   - {issue}")
+            log(f"   - {issue}")
         return False
     else:
-        print(f"   ✅ All data consistency checks passed")
+        log(f"   ✅ All data consistency checks passed")
         return True
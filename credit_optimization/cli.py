@@ -0,0 +1,224 @@
+"""
+Command line entry point
+
+    python -m credit_optimization scenarios/scenario_1.json [scenarios/scenario_2.json ...]
+"""
+
+import argparse
+import sys
+import warnings
+
+from .batch import run_batch
+from .config import load_config
+from .pipeline import PipelineError, load_dataset, run_scenario
+from .stages import STAGE_NAMES
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m credit_optimization',
+        description="Optimisation de l'allocation de crédit par scénario économique"
+    )
+    parser.add_argument('configs', nargs='+', metavar='CONFIG',
+                        help='fichier(s) de configuration de scénario (JSON)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='ne nettoyer et scorer que les lignes nouvelles ou modifiées')
+    parser.add_argument('--partitions', type=int, default=None, metavar='P',
+                        help='nettoyer et scorer par P partitions sur plusieurs processus')
+    parser.add_argument('--data', default=None,
+                        help='extrait à utiliser à la place du dataset de la configuration')
+    parser.add_argument('--output-dir', default='.',
+                        help='dossier racine des résultats (défaut: dossier courant)')
+    parser.add_argument('--cache-dir', default='cache',
+                        help='dossier des stores du mode incrémental')
+    parser.add_argument('--periods', type=int, default=None,
+                        help='allocation multi-périodes sur T périodes avec recyclage des remboursements')
+    parser.add_argument('--window', type=int, default=None,
+                        help='horizon glissant: nombre de périodes résolues à chaque pas (avec --periods)')
+    parser.add_argument('--robust', action='store_true',
+                        help='contrainte de risque robuste aux déviations de PD (Bertsimas-Sim)')
+    parser.add_argument('--gamma', type=float, default=None,
+                        help='nombre de PD pouvant dévier simultanément (avec --robust)')
+    parser.add_argument('--ensemble', type=int, default=None, metavar='K',
+                        help='stabilité de la sélection sur K réalisations du bruit des PD')
+    parser.add_argument('--workers', type=int, default=None,
+                        help="processus de résolution de l'ensemble (défaut: un par CPU), threads du service")
+    parser.add_argument('--pd-model', action='store_true',
+                        help='PD estimée par régression logistique sur loan_status au lieu des pondérations fixes')
+    parser.add_argument('--outliers', nargs='?', const='iqr', default=None, choices=['iqr', 'mad'],
+                        help='écarter les valeurs aberrantes par objectif de prêt (règle IQR ou MAD, défaut: IQR)')
+    parser.add_argument('--solution-cache', action='store_true',
+                        help='réutiliser les solutions déjà calculées (démarrage à chaud si proches)')
+    parser.add_argument('--dual-solver', action='store_true',
+                        help='résoudre par le dual lagrangien des contraintes couplantes au lieu de HiGHS')
+    parser.add_argument('--scaling', action='store_true',
+                        help='mettre le modèle à l\'échelle avant HiGHS (équilibrage lignes/colonnes)')
+    parser.add_argument('--partial-funding', type=float, nargs='?', const=0, default=None, metavar='TICKET',
+                        help='financer une fraction du montant demandé (ticket minimum optionnel en euros)')
+    parser.add_argument('--stress', action='store_true',
+                        help='tests de résistance du portefeuille retenu sous des PD choquées')
+    parser.add_argument('--export-model', action='store_true',
+                        help="exporter le modèle d'allocation (MPS) et les métadonnées de résolution")
+    parser.add_argument('--preview', type=float, nargs='?', const=0, default=None, metavar='TAUX',
+                        help="aperçu rapide sur échantillons stratifiés (taux d'échantillonnage, défaut: section preview)")
+    parser.add_argument('--promote', action='store_true',
+                        help="enchaîner la résolution complète après l'aperçu (avec --preview)")
+    parser.add_argument('--serve', type=int, nargs='?', const=8765, default=None, metavar='PORT',
+                        help='service de simulation résident sur http://127.0.0.1:PORT (défaut: 8765)')
+    parser.add_argument('--checkpoints', action='store_true',
+                        help="enregistrer chaque étape et ne réexécuter que celles dont les entrées ont changé")
+    parser.add_argument('--rerun', nargs='+', default=None, metavar='ETAPE', choices=STAGE_NAMES,
+                        help=f"étapes à réexécuter malgré leur checkpoint (avec --checkpoints): {', '.join(STAGE_NAMES)}")
+    parser.add_argument('--sequential', action='store_true',
+                        help="exécuter les scénarios l'un après l'autre sans recouvrement calcul/écriture")
+    parser.add_argument('--max-pending', type=int, default=2,
+                        help="scénarios dont les résultats sont écrits simultanément (défaut: 2)")
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help="n'afficher que le statut final de chaque scénario")
+    return parser
+
+
+def main(argv=None):
+    """
+    Run the scenarios given on the command line
+
+    Returns:
+    exit code: 0 on success, 1 if a scenario failed
+    """
+    args = build_parser().parse_args(argv)
+    warnings.filterwarnings('ignore')
+
+    try:
+        configs = [load_config(path) for path in args.configs]
+    except (OSError, ValueError, TypeError) as e:
+        print(f"Erreur de configuration: {e}")
+        return 1
+
+    if args.periods is not None:
+        configs = [
+            config.with_overrides(multiperiod={**(config.multiperiod or {}), 'enabled': True,
+                                               'periods': args.periods, 'window': args.window})
+            for config in configs
+        ]
+
+    if args.robust:
+        configs = [
+            config.with_overrides(robust={**(config.robust or {}), 'enabled': True,
+                                          **({'gamma': args.gamma} if args.gamma is not None else {})})
+            for config in configs
+        ]
+
+    if args.ensemble is not None:
+        configs = [
+            config.with_overrides(ensemble={**(config.ensemble or {}), 'enabled': True, 'size': args.ensemble,
+                                            **({'workers': args.workers} if args.workers is not None else {})})
+            for config in configs
+        ]
+
+    if args.pd_model:
+        configs = [config.with_overrides(pd_model={**(config.pd_model or {}), 'enabled': True}) for config in configs]
+
+    if args.outliers:
+        configs = [config.with_overrides(outliers={**(config.outliers or {}), 'enabled': True, 'method': args.outliers})
+                   for config in configs]
+
+    if args.solution_cache:
+        configs = [config.with_overrides(solution_cache={**(config.solution_cache or {}), 'enabled': True})
+                   for config in configs]
+
+    if args.partial_funding is not None:
+        configs = [
+            config.with_overrides(partial_funding={**(config.partial_funding or {}), 'enabled': True,
+                                                   'min_ticket': args.partial_funding})
+            for config in configs
+        ]
+
+    if args.dual_solver:
+        configs = [config.with_overrides(dual_solver={**(config.dual_solver or {}), 'enabled': True})
+                   for config in configs]
+
+    if args.scaling:
+        configs = [config.with_overrides(scaling={**(config.scaling or {}), 'enabled': True}) for config in configs]
+
+    if args.stress:
+        configs = [config.with_overrides(stress={**(config.stress or {}), 'enabled': True}) for config in configs]
+
+    if args.checkpoints or args.rerun:
+        configs = [config.with_overrides(checkpoints={**(config.checkpoints or {}), 'enabled': True,
+                                                      'rerun': args.rerun or []})
+                   for config in configs]
+
+    if args.export_model:
+        configs = [config.with_overrides(model_export={**(config.model_export or {}), 'enabled': True})
+                   for config in configs]
+
+    if args.preview is not None:
+        from .preview import preview_scenario
+
+        exit_code = 0
+        for config in configs:
+            if args.preview:
+                config = config.with_overrides(preview={**(config.preview or {}), 'rate': args.preview})
+            try:
+                raw = load_dataset(args.data or config.dataset)
+                preview_scenario(config, raw, store_dir=args.cache_dir)
+                if args.promote:
+                    result = run_scenario(config, raw, output_dir=args.output_dir, store_dir=args.cache_dir,
+                                          verbose=not args.quiet, data=args.data)
+                    if args.quiet:
+                        print(f"{config.title} - Statut: {result.statut}")
+            except (PipelineError, OSError) as e:
+                print(f"{config.title}: {e}")
+                exit_code = 1
+        return exit_code
+
+    if args.serve is not None:
+        if len(configs) > 1:
+            print("Le service de simulation ne sert qu'un scénario à la fois")
+            return 1
+        from .service import serve
+
+        config = configs[0]
+        try:
+            serve(config, raw=load_dataset(args.data or config.dataset), port=args.serve, store_dir=args.cache_dir,
+                  workers=args.workers or 2, verbose=not args.quiet, data=args.data)
+        except (PipelineError, OSError) as e:
+            print(f"{config.title}: {e}")
+            return 1
+        return 0
+
+    checkpoints = any(config.checkpoints and config.checkpoints.get('enabled') for config in configs)
+    if len(configs) > 1 and not args.sequential and not checkpoints:
+        # Le scénario k+1 est calculé pendant l'écriture des résultats du scénario k
+        report = run_batch(configs, data=args.data, incremental=args.incremental, output_dir=args.output_dir,
+                           store_dir=args.cache_dir, partitions=args.partitions, max_pending=args.max_pending, verbose=not args.quiet)
+        if args.quiet:
+            for result in report['results']:
+                print(f"{result.config.title} - Statut: {result.statut}")
+            for scenario_id, erreur in report['failures'].items():
+                print(f"{scenario_id}: {erreur}")
+        return 1 if report['failures'] else 0
+
+    exit_code = 0
+    for config in configs:
+        try:
+            if config.checkpoints and config.checkpoints.get('enabled'):
+                # L'étape load ne relit l'extrait que s'il a changé
+                raw = None
+            else:
+                # Le même extrait n'est lu qu'une fois pour tous les scénarios
+                raw = load_dataset(args.data or config.dataset)
+            result = run_scenario(config, raw, incremental=args.incremental, output_dir=args.output_dir,
+                                  store_dir=args.cache_dir, verbose=not args.quiet, partitions=args.partitions,
+                                  data=args.data)
+            if args.quiet:
+                print(f"{config.title} - Statut: {result.statut}")
+        except (PipelineError, OSError) as e:
+            print(f"{config.title}: {e}")
+            exit_code = 1
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
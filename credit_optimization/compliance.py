@@ -0,0 +1,182 @@
+"""
+Compliance checks of a final credit portfolio against the scenario requirements
+
+evaluate_compliance reports on one selection; evaluate_compliance_batch
+evaluates K candidate portfolios at once from a K × N decision matrix (one
+matrix product for all the per-client indicators), with the same criteria.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Indicateurs moyennés sur les clients retenus (colonne ou seuil de la règle)
+_AVERAGED = [
+    ('age_moyen', 'person_age', None),
+    ('revenu_moyen', 'person_income', None),
+    ('emploi_stable', 'person_emp_length', 'emp_length_min'),
+    ('historique_bon', 'cb_person_cred_hist_length', 'history_min'),
+    ('ratio_pret_revenu', 'loan_percent_income', None)
+]
+
+
+def compliance_status(score):
+    """
+    Status label of a compliance score (percentage of criteria met)
+    """
+    if score >= 90:
+        return "CONFORME"
+    elif score >= 70:
+        return "LARGEMENT CONFORME"
+    return "PARTIELLEMENT CONFORME"
+
+
+def _checks(rules, indicateurs):
+    """
+    Criteria met, from the indicators (scalars or arrays over portfolios)
+
+    Returns:
+    list of (libellé, respecté) - libellé None: counted but not displayed
+    """
+    age_min, age_max = rules['age_range']
+    checks = [
+        (f"Risque <= {rules['max_risk']*100:.0f}%", indicateurs['risque_final'] <= rules['max_risk']),
+        ("Emploi stable", indicateurs['emploi_stable'] >= rules['emp_stable_min_pct']),
+        ("Bon historique", indicateurs['historique_bon'] >= rules['history_min_pct']),
+        ("Age approprié", (age_min <= indicateurs['age_moyen']) & (indicateurs['age_moyen'] <= age_max)),
+        ("Revenus décents", indicateurs['revenu_moyen'] >= rules['income_min']),
+        (None, indicateurs['ratio_pret_revenu'] <= rules['loan_to_income_max_pct'])
+    ]
+    if rules.get('client_count_range'):
+        count_min, count_max = rules['client_count_range']
+        checks.append(("Nombre de clients",
+                       (count_min <= indicateurs['nb_clients']) & (indicateurs['nb_clients'] <= count_max)))
+    return checks
+
+
+def evaluate_compliance(clients, metrics, config):
+    """
+    Evaluate the selected clients against the scenario requirements
+
+    Parameters:
+    clients: pandas DataFrame - solvent clients with a credit_alloue column
+    metrics: dict - output of compute_portfolio_metrics for the same selection
+    config: ScenarioConfig
+
+    Returns:
+    report: dict with statut, score, the indicators and the criteria (or
+            statut 'ECHEC' and no criteria when no client was selected)
+    """
+    rules = config.compliance
+    clients_finaux = clients[clients['credit_alloue'] == 1]
+
+    if len(clients_finaux) == 0:
+        return {'statut': "ECHEC", 'score': None, 'nb_clients': 0, 'criteres': []}
+
+    # Sans montant alloué, le risque pondéré n'est pas défini: moyenne simple des PD
+    if metrics['montant_total_alloue'] > 0:
+        risque_final = metrics['risque_moyen']
+    else:
+        risque_final = metrics['pd_moyenne']
+
+    age_moyen = clients_finaux['person_age'].mean()
+    revenu_moyen = clients_finaux['person_income'].mean()
+    emploi_stable = (clients_finaux['person_emp_length'] >= rules['emp_length_min']).mean() * 100
+    historique_bon = (clients_finaux['cb_person_cred_hist_length'] >= rules['history_min']).mean() * 100
+    ratio_pret_revenu = clients_finaux['loan_percent_income'].mean() * 100
+
+    indicateurs = {
+        'risque_final': risque_final, 'age_moyen': age_moyen, 'revenu_moyen': revenu_moyen,
+        'emploi_stable': emploi_stable, 'historique_bon': historique_bon,
+        'ratio_pret_revenu': ratio_pret_revenu, 'nb_clients': len(clients_finaux)
+    }
+    valeurs = [f"{risque_final*100:.2f}%", f"{emploi_stable:.1f}%", f"{historique_bon:.1f}%",
+               f"{age_moyen:.1f} ans", f"{revenu_moyen:,.0f} euros", f"{ratio_pret_revenu:.1f}%",
+               f"{len(clients_finaux):,}"]
+
+    # (libellé affiché, valeur formatée, respecté) - None: critère compté mais non affiché
+    criteres = [(libelle, valeur, bool(ok)) for (libelle, ok), valeur in zip(_checks(rules, indicateurs), valeurs)]
+
+    score_conformite = sum(ok for _, _, ok in criteres) / len(criteres) * 100
+
+    return {
+        'statut': compliance_status(score_conformite),
+        'score': score_conformite,
+        'nb_clients': len(clients_finaux),
+        'risque_final': risque_final,
+        'age_moyen': age_moyen,
+        'revenu_moyen': revenu_moyen,
+        'emploi_stable': emploi_stable,
+        'historique_bon': historique_bon,
+        'ratio_pret_revenu': ratio_pret_revenu,
+        'criteres': criteres
+    }
+
+
+def evaluate_compliance_batch(clients, decisions, Mi, PD, config):
+    """
+    Compliance of K candidate portfolios at once
+
+    Parameters:
+    clients: pandas DataFrame - the N clients the decisions refer to
+    decisions: array-like (K, N) - 0/1 decisions or funded fractions
+    Mi: array-like (N,) - requested amounts
+    PD: array-like (N,) or (K, N) - PD per client (per portfolio if 2-D)
+    config: ScenarioConfig
+
+    Returns:
+    pandas DataFrame indexed by portfolio: nb_clients, the indicators of
+    evaluate_compliance, one column per criterion, score and statut
+    ('ECHEC' and no score for an empty portfolio)
+    """
+    rules = config.compliance
+    Y = np.asarray(decisions, dtype=np.float64)
+    Mi = np.asarray(Mi, dtype=np.float64)
+    PD = np.asarray(PD, dtype=np.float64)
+    S = (Y > 0).astype(np.float64)
+    nb = S.sum(axis=1)
+
+    # Tous les indicateurs moyennés en un seul produit (K × N) · (N × 5)
+    colonnes = []
+    for _, colonne, seuil in _AVERAGED:
+        valeurs = clients[colonne].to_numpy(dtype=np.float64)
+        colonnes.append(valeurs >= rules[seuil] if seuil else valeurs)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        moyennes = (S @ np.column_stack(colonnes)) / nb[:, None]
+
+        montant = Y @ Mi
+        if PD.ndim == 1:
+            risque, somme_pd = Y @ (Mi * PD), S @ PD
+        else:
+            risque, somme_pd = np.einsum('kn,kn->k', Y, PD * Mi), np.einsum('kn,kn->k', S, PD)
+        # Sans montant alloué, moyenne simple des PD (comme evaluate_compliance)
+        risque_final = np.where(montant > 0, risque / montant, somme_pd / nb)
+
+    indicateurs = {'nb_clients': nb.astype(np.int64), 'risque_final': risque_final}
+    for j, (nom, _, _) in enumerate(_AVERAGED):
+        indicateurs[nom] = moyennes[:, j] * (100 if nom in ('emploi_stable', 'historique_bon', 'ratio_pret_revenu') else 1)
+    table = pd.DataFrame(indicateurs)
+    table.index.name = 'Portefeuille'
+
+    checks = _checks(rules, indicateurs)
+    for libelle, ok in checks:
+        table[libelle or 'Ratio pret/revenu'] = ok
+    score = np.mean([ok for _, ok in checks], axis=0) * 100
+    vide = nb == 0
+    table['score'] = np.where(vide, np.nan, score)
+    table['statut'] = ['ECHEC' if v else compliance_status(s) for v, s in zip(vide, score)]
+    return table
+
+
+def print_compliance(report):
+    """
+    Print a compliance report produced by evaluate_compliance
+    """
+    if report['score'] is None:
+        print("Aucun client final pour validation")
+        return
+
+    print("Conformité aux exigences:")
+    for libelle, valeur, ok in report['criteres']:
+        if libelle is not None:
+            print(f"{libelle}: {valeur} ({'OK' if ok else 'NOK'})")
+    print(f"Score de conformité: {report['score']:.1f}%")
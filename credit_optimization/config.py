@@ -0,0 +1,109 @@
+"""
+Scenario configuration for the credit allocation pipeline
+A scenario is fully described by a JSON file (see scenarios/)
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field, asdict, replace
+
+
+@dataclass(frozen=True)
+class ScenarioConfig:
+    """
+    Parameters of one economic scenario
+
+    budget_total, budget_fraction, risk_tolerance (TR), lgd and epsilon are
+    the optimizer inputs; the nested sections keep the JSON layout:
+    allocation (target share per loan_intent), scoring (PD rules),
+    returns (requested amount and return rate), intents, fallback,
+    compliance, output and the optional multiperiod, robust, ensemble,
+    pd_model, solution_cache, dual_solver, preview, partial_funding,
+    model_export, outliers, stress, scaling and checkpoints sections.
+    """
+    id: str
+    title: str
+    strategy: str
+    budget_total: float
+    budget_fraction: float
+    risk_tolerance: float
+    lgd: float
+    epsilon: float
+    allocation: dict
+    scoring: dict
+    returns: dict
+    intents: dict
+    fallback: dict
+    compliance: dict
+    output: dict
+    multiperiod: dict = None
+    robust: dict = None
+    ensemble: dict = None
+    pd_model: dict = None
+    solution_cache: dict = None
+    dual_solver: dict = None
+    preview: dict = None
+    partial_funding: dict = None
+    model_export: dict = None
+    outliers: dict = None
+    stress: dict = None
+    scaling: dict = None
+    checkpoints: dict = None
+    description: str = ''
+    dataset: str = 'content/credit_risk_dataset.xlsx'
+    source_path: str = field(default=None, compare=False)
+
+    @property
+    def budget_used(self):
+        """Budget actually allocated (BUDGET_UTILISE)"""
+        return int(self.budget_total * self.budget_fraction)
+
+    @property
+    def categories(self):
+        """Loan intents in the order of the target allocation"""
+        return list(self.allocation.keys())
+
+    def to_dict(self):
+        data = asdict(self)
+        data.pop('source_path')
+        return data
+
+    def with_overrides(self, **changes):
+        """Copy of the scenario with some parameters replaced"""
+        return replace(self, **changes)
+
+    def fingerprint(self, *sections):
+        """
+        Stable hash of the given sections (all parameters if none given)
+        """
+        data = self.to_dict()
+        if sections:
+            data = {key: data[key] for key in sections}
+        payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def config_from_dict(data, source_path=None):
+    """
+    Build a ScenarioConfig from a parsed JSON document
+    """
+    data = dict(data)
+    if source_path is not None:
+        data['source_path'] = source_path
+    return ScenarioConfig(**data)
+
+
+def load_config(path):
+    """
+    Load a scenario configuration file
+
+    Parameters:
+    path: str - path of a JSON scenario file
+
+    Returns:
+    config: ScenarioConfig
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return config_from_dict(data, source_path=os.path.abspath(path))
@@ -0,0 +1,176 @@
+"""
+Dashboard Module for Banking Optimization Scenarios
+Renders the scenario charts on the Agg backend in a background worker so
+that the main pipeline keeps exporting while the figures are drawn
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .workers import process_context
+
+
+def _new_figure(figsize):
+    # Figure + FigureCanvasAgg directly: no pyplot global state in the worker
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _plot_allocation_vs_target(ax, data):
+    categories = data['categories']
+    positions = np.arange(len(categories))
+    reel = data['part_reelle'] * 100
+    cible = data['part_cible'] * 100
+    tolerance = cible * data['epsilon']
+
+    ax.bar(positions - 0.2, cible, width=0.4, yerr=tolerance, capsize=3,
+           color='#bbbbbb', label='Cible (±ε)')
+    ax.bar(positions + 0.2, reel, width=0.4, color='#1f77b4', label='Réalisé')
+    ax.set_xticks(positions)
+    ax.set_xticklabels(categories, rotation=30, ha='right', fontsize=8)
+    ax.set_ylabel('Part du montant alloué (%)')
+    ax.set_title('Allocation vs cible par objectif')
+    ax.legend(fontsize=8)
+
+
+def _plot_pd_histogram(ax, data):
+    selection = data['Yi'] > 0
+    bins = np.linspace(0, max(data['PD'].max(), 1e-3), 40)
+    ax.hist(data['PD'][~selection], bins=bins, alpha=0.6, color='#d62728', label='Rejetés')
+    ax.hist(data['PD'][selection], bins=bins, alpha=0.6, color='#2ca02c', label='Sélectionnés')
+    ax.axvline(data['taux_risque'], color='black', linestyle='--', linewidth=1, label='Tolérance TR')
+    ax.set_xlabel('PD calibrée')
+    ax.set_ylabel('Nombre de clients')
+    ax.set_title('Distribution des PD')
+    ax.legend(fontsize=8)
+
+
+def _plot_profit_vs_risk(ax, data):
+    selection = data['Yi'] > 0
+    profit = data['Mi'] * data['ri'] - data['PD'] * data['LGD'] * data['Mi']
+    risque = data['PD'] * data['Mi']
+    ax.scatter(risque[~selection], profit[~selection], s=2, alpha=0.3,
+               color='#d62728', label='Rejetés', rasterized=True)
+    ax.scatter(risque[selection], profit[selection], s=2, alpha=0.5,
+               color='#2ca02c', label='Sélectionnés', rasterized=True)
+    ax.set_xlabel('Risque PD × Mi (€)')
+    ax.set_ylabel('Profit net attendu (€)')
+    ax.set_title('Profit vs risque par client')
+    ax.legend(fontsize=8, markerscale=4)
+
+
+def _plot_cumulative_budget(ax, data):
+    selection = data['Yi'] > 0
+    Mi = data['Mi'][selection] * data['Yi'][selection]
+    profit = Mi * (data['ri'][selection] - data['PD'][selection] * data['LGD'])
+
+    # Clients ranked by decreasing profitability (profit per euro lent)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rentabilite = np.where(Mi > 0, profit / Mi, 0)
+    ordre = np.argsort(-rentabilite)
+    montant_cumule = np.cumsum(Mi[ordre])
+    profit_cumule = np.cumsum(profit[ordre])
+
+    ax.plot(montant_cumule / 1e6, profit_cumule / 1e6, color='#1f77b4')
+    ax.axvline(data['budget'] / 1e6, color='black', linestyle='--', linewidth=1, label='Budget utilisé')
+    ax.set_xlabel('Montant cumulé (M€)')
+    ax.set_ylabel('Profit net cumulé (M€)')
+    ax.set_title('Courbe de budget cumulé')
+    ax.legend(fontsize=8)
+
+
+def render_dashboard(data, output_dir, pie_filename, dashboard_filename='tableau_de_bord.png',
+                     title='', dpi=300):
+    """
+    Render the allocation pie chart and the 2x2 scenario dashboard
+
+    Parameters:
+    data: dict - numpy arrays and scalars (see dashboard_payload)
+    output_dir: str - directory receiving the PNG files
+    pie_filename: str - file name of the allocation pie chart
+    dashboard_filename: str - file name of the dashboard
+    title: str - scenario title shown on the figures
+    dpi: int - output resolution
+
+    Returns:
+    rendering_report: dict - 'files' written and rendering 'duration' in seconds
+    """
+    start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    files = []
+
+    # Allocation pie chart (same figure as before)
+    montants = data['montants_categorie']
+    if montants.sum() > 0:
+        fig = _new_figure((10, 6))
+        ax = fig.add_subplot(1, 1, 1)
+        non_vides = montants > 0
+        ax.pie(montants[non_vides], labels=np.asarray(data['categories'])[non_vides],
+               autopct='%1.1f%%', startangle=90)
+        ax.set_title(f'Répartition des Montants par Objectif de Prêt{title}')
+        path = os.path.join(output_dir, pie_filename)
+        fig.savefig(path, dpi=dpi, bbox_inches='tight')
+        files.append(path)
+
+    # 2x2 dashboard
+    fig = _new_figure((16, 11))
+    axes = fig.subplots(2, 2)
+    _plot_allocation_vs_target(axes[0, 0], data)
+    _plot_pd_histogram(axes[0, 1], data)
+    _plot_profit_vs_risk(axes[1, 0], data)
+    _plot_cumulative_budget(axes[1, 1], data)
+    fig.suptitle(f'Tableau de bord{title}', fontsize=14)
+    fig.tight_layout()
+    path = os.path.join(output_dir, dashboard_filename)
+    fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    files.append(path)
+
+    return {'files': files, 'duration': time.perf_counter() - start}
+
+
+def dashboard_payload(Yi, Mi, ri, PD, metrics, categories, LGD, taux_risque, epsilon, budget):
+    """
+    Collect the small arrays the dashboard needs (cheap to send to a worker)
+
+    budget is the budget available to the optimizer (config.budget_used),
+    drawn on the cumulative budget curve.
+    """
+    par_categorie = metrics['par_categorie'].reindex(categories).fillna(0)
+    return {
+        'Yi': np.asarray(Yi, dtype=np.float64),
+        'Mi': np.asarray(Mi, dtype=np.float64),
+        'ri': np.asarray(ri, dtype=np.float64),
+        'PD': np.asarray(PD, dtype=np.float64),
+        'categories': list(categories),
+        'montants_categorie': par_categorie['Montant_Total'].values.astype(np.float64),
+        'part_reelle': par_categorie['Part_Reelle'].values.astype(np.float64),
+        'part_cible': par_categorie['Part_Cible'].values.astype(np.float64),
+        'budget': float(budget),
+        'LGD': LGD,
+        'taux_risque': taux_risque,
+        'epsilon': epsilon
+    }
+
+
+def start_dashboard_rendering(data, output_dir, pie_filename, **kwargs):
+    """
+    Start rendering in a background worker and return immediately
+
+    The figures are drawn in a worker process (forkserver or spawn, see
+    workers.process_context) so that rendering runs truly in parallel with
+    the export.
+
+    Returns:
+    future: concurrent.futures.Future resolving to the render_dashboard report
+    """
+    executor = ProcessPoolExecutor(max_workers=1, mp_context=process_context())
+    future = executor.submit(render_dashboard, data, output_dir, pie_filename, **kwargs)
+    executor.shutdown(wait=False)
+    return future
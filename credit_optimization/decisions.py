@@ -0,0 +1,169 @@
+"""
+Memory-mapped per-client decision store
+
+A store is a directory with one .npy file per column, sorted by client id,
+and a metadata.json describing the run:
+
+    client_id.npy  Yi.npy  montant_alloue.npy  revenus_attendus.npy
+    pertes_attendues.npy  profit_net.npy  metadata.json
+
+Readers open the columns with np.load(mmap_mode='r'): nothing is read until
+a lookup touches it, a range scan returns views of the mapped files, and
+every process reading the same store shares the operating system page cache.
+"""
+
+import datetime
+import json
+import os
+import shutil
+
+import numpy as np
+
+STORE_VERSION = 1
+
+DECISION_COLUMNS = {
+    'Yi': np.int8,
+    'montant_alloue': np.float64,
+    'revenus_attendus': np.float64,
+    'pertes_attendues': np.float64,
+    'profit_net': np.float64
+}
+
+
+def write_decision_store(directory, client_ids, columns, metadata=None):
+    """
+    Write a decision store
+
+    The store is written next to the target and swapped in by two renames
+    (old store moved aside, new store moved in): a store is never seen half
+    written, but a reader opening it between the two renames finds no
+    directory and must retry.
+
+    Parameters:
+    directory: str - store directory
+    client_ids: array-like of int - client identifier per row (unique)
+    columns: dict of column name -> array-like aligned on client_ids
+    metadata: dict or None - run description stored in metadata.json
+
+    Returns:
+    directory: str
+    """
+    client_ids = np.asarray(client_ids, dtype=np.int64)
+    if len(np.unique(client_ids)) != len(client_ids):
+        raise ValueError("Identifiants clients non uniques")
+
+    ordre = np.argsort(client_ids, kind='stable')
+    tmp = f'{directory}.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    np.save(os.path.join(tmp, 'client_id.npy'), client_ids[ordre])
+    types = {}
+    for nom, valeurs in columns.items():
+        valeurs = np.asarray(valeurs, dtype=DECISION_COLUMNS.get(nom))[ordre]
+        np.save(os.path.join(tmp, f'{nom}.npy'), valeurs)
+        types[nom] = valeurs.dtype.str
+
+    with open(os.path.join(tmp, 'metadata.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': STORE_VERSION,
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'n_clients': int(len(client_ids)),
+            'columns': types,
+            **(metadata or {})
+        }, f, ensure_ascii=False, indent=2, default=str)
+
+    # Remplacement du store précédent: deux renommages, le répertoire est absent entre les deux
+    if os.path.isdir(directory):
+        old = f'{directory}.old'
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(directory, old)
+        os.replace(tmp, directory)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.replace(tmp, directory)
+    return directory
+
+
+class DecisionStore:
+    """
+    Read-only view of a decision store
+
+        store = DecisionStore('scenario_1_results/scenario_1_decisions')
+        store.lookup(1234)            # dict of the client's values, or None
+        store.range(1000, 2000)       # dict of column views for 1000 <= id < 2000
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'metadata.json'), encoding='utf-8') as f:
+            self.metadata = json.load(f)
+        if self.metadata.get('version') != STORE_VERSION:
+            raise ValueError(f"Version de store non supportée: {self.metadata.get('version')}")
+        self.client_id = np.load(os.path.join(directory, 'client_id.npy'), mmap_mode='r')
+        self._columns = {
+            nom: np.load(os.path.join(directory, f'{nom}.npy'), mmap_mode='r')
+            for nom in self.metadata['columns']
+        }
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    def __len__(self):
+        return len(self.client_id)
+
+    def __contains__(self, client_id):
+        return self._position(client_id) is not None
+
+    def _position(self, client_id):
+        pos = int(np.searchsorted(self.client_id, client_id))
+        if pos < len(self.client_id) and self.client_id[pos] == client_id:
+            return pos
+        return None
+
+    def column(self, name):
+        """Whole column as a memory-mapped array (no copy)"""
+        return self._columns[name]
+
+    def lookup(self, client_id):
+        """
+        Decision of one client
+
+        Returns:
+        dict of column -> value, or None if the client is not in the store
+        """
+        pos = self._position(client_id)
+        if pos is None:
+            return None
+        return {'client_id': int(client_id), **{nom: valeurs[pos].item() for nom, valeurs in self._columns.items()}}
+
+    def lookup_many(self, client_ids):
+        """
+        Decisions of several clients
+
+        Returns:
+        found: numpy array of bool - which client_ids are in the store
+        values: dict of column -> array for the found clients
+        """
+        client_ids = np.asarray(client_ids, dtype=np.int64)
+        pos = np.searchsorted(self.client_id, client_ids)
+        pos_valides = np.minimum(pos, max(len(self.client_id) - 1, 0))
+        found = (pos < len(self.client_id)) & (np.asarray(self.client_id[pos_valides]) == client_ids)
+        pos = pos[found]
+        return found, {nom: np.asarray(valeurs[pos]) for nom, valeurs in self._columns.items()}
+
+    def range(self, start, stop):
+        """
+        Decisions of the clients with start <= client_id < stop
+
+        Returns:
+        dict of column -> memory-mapped view (client_id included)
+        """
+        debut, fin = np.searchsorted(self.client_id, [start, stop])
+        return {'client_id': self.client_id[debut:fin],
+                **{nom: valeurs[debut:fin] for nom, valeurs in self._columns.items()}}
+
+
+def decision_store_path(config, results_dir):
+    return os.path.join(results_dir, config.output.get('decision_store', f'{config.id}_decisions'))
@@ -0,0 +1,202 @@
+"""
+Lagrangian dual solver of the allocation LP
+
+The model has N decisions but only m coupling rows (budget, risque and a
+min/max pair per intent, m ≈ 14). Dualizing them gives
+
+    g(y) = b·y + Σ max(0, pᵢ - aᵢ·y),  y ≥ 0
+
+an upper bound on the profit for every y, whose minimum equals the LP
+optimum. Given y, each client is a closed-form threshold decision
+(Yi = 1 when its profit exceeds the priced use aᵢ·y of the rows), and one
+vectorized O(N·m) pass returns g(y) and a subgradient b - A·Y.
+
+The m multipliers are searched by a trust-region cutting-plane method: the
+master problem is a small LP over the collected cuts restricted to a box
+around the current centre, and it stops when the model predicts no further
+decrease. Rows and profits are normalized so every multiplier is of order 1.
+
+Primal recovery: clients with a clear reduced cost keep their threshold
+decision, and only the clients near their threshold are solved as a
+restricted LP (see solution_cache.warm_start_solve); the duality gap
+between the recovered profit and the dual bound is reported.
+"""
+
+import time
+
+import numpy as np
+from scipy.optimize import linprog
+
+from .solution_cache import warm_start_solve
+
+DEFAULTS = {
+    'tolerance': 1e-7,
+    'max_iterations': 300,
+    'band': 0.01,
+    'max_rounds': 5
+}
+
+
+def dual_solver_params(config, **overrides):
+    """
+    Dual solver parameters of a scenario (config.dual_solver over DEFAULTS)
+    """
+    params = dict(DEFAULTS)
+    params.update(config.dual_solver or {})
+    params.update({key: value for key, value in overrides.items() if value is not None})
+    return params
+
+
+class LagrangianDual:
+    """
+    Dual function of the allocation LP on normalized rows
+
+    Parameters:
+    model: AllocationModel - Yi only (no auxiliary variables)
+    """
+
+    def __init__(self, model):
+        A = np.asarray(model.A_ub, dtype=np.float64)
+        b = np.asarray(model.b_ub, dtype=np.float64)
+        profit = -np.asarray(model.c, dtype=np.float64)
+
+        # Échelles: chaque ligne rapportée à son second membre, le profit au profit positif total
+        self.row_scale = np.where(b != 0, np.abs(b), np.maximum(np.abs(A).max(axis=1), 1.0))
+        self.profit_scale = max(float(np.maximum(profit, 0).sum()), 1.0)
+        self.A = A / self.row_scale[:, None]
+        self.b = b / self.row_scale
+        self.profit = profit / self.profit_scale
+        self.evaluations = 0
+
+    @property
+    def n_rows(self):
+        return len(self.b)
+
+    def evaluate(self, y):
+        """
+        Dual value, subgradient and threshold decisions at y (one pass over the clients)
+        """
+        self.evaluations += 1
+        reduits = self.profit - y @ self.A
+        Y = reduits > 0
+        valeur = float(self.b @ y + np.maximum(reduits, 0.0).sum())
+        return valeur, self.b - self.A @ Y.astype(np.float64), Y
+
+    def duals(self, y):
+        """
+        Multipliers in profit per unit of each row, with linprog's sign (≤ 0)
+        """
+        return -y * self.profit_scale / self.row_scale
+
+
+def _master(cuts, centre, radius):
+    """
+    Minimum of the cutting-plane model in the box around the centre
+
+    Returns:
+    y, model value
+    """
+    pentes = np.array([s for s, _ in cuts])
+    constantes = np.array([c for _, c in cuts])
+    m = len(centre)
+    # Variables (y, t): t ≥ s_k·y + c_k  <=>  s_k·y - t ≤ -c_k
+    A = np.hstack([pentes, -np.ones((len(cuts), 1))])
+    bounds = [(max(0.0, yc - radius), yc + radius) for yc in centre] + [(None, None)]
+    objectif = np.zeros(m + 1)
+    objectif[-1] = 1.0
+    res = linprog(objectif, A_ub=A, b_ub=-constantes, bounds=bounds, method='highs')
+    if not res.success:
+        return None, None
+    return res.x[:m], float(res.x[-1])
+
+
+def minimize_dual(dual, tolerance=1e-7, max_iterations=300, radius=1.0):
+    """
+    Trust-region cutting-plane minimization of the dual function
+
+    Returns:
+    y: numpy array - best multipliers found (normalized)
+    report: dict - iterations, serious steps, dual value, model bound
+    """
+    centre = np.zeros(dual.n_rows)
+    valeur, pente, _ = dual.evaluate(centre)
+    cuts = [(pente, valeur - pente @ centre)]
+    report = {'iterations': 0, 'pas_serieux': 0, 'converge': False}
+
+    for iteration in range(max_iterations):
+        report['iterations'] = iteration + 1
+        y, modele = _master(cuts, centre, radius)
+        if y is None:
+            break
+        decroissance = valeur - modele
+        if decroissance <= tolerance * max(1.0, abs(valeur)):
+            report['converge'] = True
+            break
+
+        valeur_y, pente_y, _ = dual.evaluate(y)
+        cuts.append((pente_y, valeur_y - pente_y @ y))
+        if valeur_y <= valeur - 0.1 * decroissance:
+            # Pas sérieux: le centre avance, la région s'élargit si le pas touche le bord
+            report['pas_serieux'] += 1
+            if np.abs(y - centre).max() >= radius * (1 - 1e-9):
+                radius *= 2.0
+            centre, valeur = y, valeur_y
+        elif valeur_y > valeur:
+            # Le modèle surestime la décroissance: région réduite
+            radius = max(radius * 0.5, 1e-12)
+
+    report['valeur_duale'] = valeur
+    return centre, report
+
+
+def solve_dual(model, tolerance=1e-7, max_iterations=300, band=0.01, max_rounds=5):
+    """
+    Solve the allocation LP through its Lagrangian dual
+
+    Parameters:
+    model: AllocationModel - Yi only
+    tolerance: float - relative decrease predicted by the cutting-plane model
+                       under which the search stops
+    max_iterations: int - dual iterations
+    band, max_rounds: primal recovery (see solution_cache.warm_start_solve)
+
+    Returns:
+    lp_result: scipy OptimizeResult with the linprog fields used downstream
+               (x, fun, ineqlin/lower/upper marginals), or None when the
+               primal recovery did not conclude
+    report: dict - iterations, dual bound, primal profit, duality gap, timings
+    """
+    debut = time.perf_counter()
+    dual = LagrangianDual(model)
+    y, report = minimize_dual(dual, tolerance, max_iterations)
+    report['duree_duale'] = time.perf_counter() - debut
+
+    borne = report['valeur_duale'] * dual.profit_scale
+    lp_result, recovery = warm_start_solve(model, dual.duals(y), band, max_rounds)
+    report.update({
+        'evaluations': dual.evaluations,
+        'borne_duale': borne,
+        'variables_libres': recovery['variables_libres'],
+        'tours_recuperation': recovery['tours'],
+        'duree': time.perf_counter() - debut
+    })
+    if lp_result is None:
+        return None, report
+
+    profit = -float(lp_result.fun)
+    report['profit_primal'] = profit
+    report['ecart_dualite'] = (borne - profit) / abs(borne) if borne else 0.0
+    lp_result.message = (f"Solveur dual: {report['iterations']} itérations, "
+                         f"écart de dualité {report['ecart_dualite']:.2e}")
+    return lp_result, report
+
+
+def print_dual_report(report):
+    if 'profit_primal' not in report:
+        print(f"Solveur dual: récupération primale non conclusive après {report['iterations']} itérations, "
+              f"résolution HiGHS complète")
+        return
+    print(f"Solveur dual: {report['iterations']} itérations ({report['pas_serieux']} pas sérieux), "
+          f"{report['variables_libres']:,} clients au seuil, {report['duree']:.2f}s")
+    print(f"  Borne duale {report['borne_duale']:,.0f} euros, profit LP {report['profit_primal']:,.0f} euros "
+          f"(écart de dualité {report['ecart_dualite']:.2e})")
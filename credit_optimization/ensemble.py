@@ -0,0 +1,309 @@
+"""
+Stability of the client selection across PD noise realizations
+
+The calibrated PD carries a gaussian noise (scoring.noise_std). The ensemble
+draws K realizations of that noise at once as a K × N matrix, solves the K
+allocations in worker processes and keeps the K decision vectors bit-packed
+(one bit per client and realization). From them:
+
+    fréquence de sélection  fᵢ = (1/K) Σₖ Yᵢₖ
+    recouvrement de Jaccard J(k, l) = |Sₖ ∩ Sₗ| / |Sₖ ∪ Sₗ|
+
+The clients solvent in the nominal run keep their nominal loan intent and
+return rate; the others get theirs drawn once for the whole ensemble. Only the PD (and the solvency filter
+that follows it) varies from one realization to the next.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from .compliance import evaluate_compliance_batch
+from .metrics import encode_categories
+from .optimizer import optimize
+from .portfolio import Portfolio
+from .scoring import base_pd, prepare_optimizer_inputs
+from .workers import default_workers, process_context
+
+DEFAULTS = {
+    'size': 100,
+    'seed': 2024,
+    'workers': None,
+    'stable_threshold': 0.95
+}
+
+
+@dataclass
+class EnsembleResult:
+    """
+    Bit-packed K × N decisions of a seed ensemble and their statistics
+
+    decisions: numpy array of uint8 (K, ceil(N / 8)) - np.packbits of the
+               0/1 decisions along the clients axis
+    index: client labels (index of the scored clients table)
+    frequency: numpy array - selection frequency per client
+    jaccard: numpy array (K, K) - pairwise Jaccard overlap of the selections
+    realisations: pandas DataFrame - one row per realization
+    """
+    decisions: np.ndarray
+    index: np.ndarray
+    frequency: np.ndarray
+    jaccard: np.ndarray
+    realisations: pd.DataFrame
+    params: dict
+    duration: float = 0.0
+    summary: dict = field(default_factory=dict)
+
+    @property
+    def size(self):
+        return self.decisions.shape[0]
+
+    def decision_matrix(self):
+        """Unpacked K × N decisions (bool)"""
+        return np.unpackbits(self.decisions, axis=1, count=len(self.index)).astype(bool)
+
+    def frequency_series(self):
+        return pd.Series(self.frequency, index=self.index, name='frequence_selection')
+
+
+def ensemble_params(config, **overrides):
+    """
+    Ensemble parameters of a scenario (config.ensemble over DEFAULTS)
+    """
+    params = dict(DEFAULTS)
+    params.update(config.ensemble or {})
+    params.update({key: value for key, value in overrides.items() if value is not None})
+    return params
+
+
+def pd_matrix(pd_base, scoring, size, seed):
+    """
+    Calibrated PD of every client under K noise realizations
+
+    Parameters:
+    pd_base: array-like - PD before noise (see scoring.base_pd)
+
+    Returns:
+    PD: numpy array (K, N)
+    """
+    rng = np.random.RandomState(seed)
+    bruit = rng.normal(0, scoring['noise_std'], (size, len(pd_base)))
+    pd_brute = np.asarray(pd_base, dtype=np.float64)[None, :] + bruit
+    return np.clip(pd_brute, scoring['pd_min'], scoring['pd_max'])
+
+
+# État partagé des workers (envoyé une seule fois par processus)
+_SHARED = {}
+
+
+def _init_worker(Mi, ri, codes, config):
+    _SHARED.update(Mi=Mi, ri=ri, codes=codes, config=config)
+
+
+def _solve_realization(PD):
+    """
+    Allocation of one realization; returns the positions of the funded
+    clients, their funded fractions and the realization statistics
+    """
+    config = _SHARED['config']
+    solvables = np.flatnonzero(PD <= config.scoring['solvency_threshold'])
+    Mi = _SHARED['Mi'][solvables]
+    ri = _SHARED['ri'][solvables]
+    pd_s = PD[solvables]
+    result = optimize(Portfolio(Mi, ri, pd_s, _SHARED['codes'][solvables], config.categories), config)
+
+    # Montants pondérés par la fraction financée (financement partiel), comme compute_portfolio_metrics
+    Yi = np.asarray(result.Yi, dtype=np.float64)
+    selection = Yi > 0
+    montant_alloue = Mi * Yi
+    montant = montant_alloue.sum()
+    statistiques = {
+        'Clients_Solvables': len(solvables),
+        'Clients_Selectionnes': int(selection.sum()),
+        'Montant_Alloue': montant,
+        'Profit_Attendu': (montant_alloue * ri - pd_s * config.lgd * montant_alloue).sum(),
+        'Risque_Moyen': (pd_s * montant_alloue).sum() / montant if montant > 0 else 0.0,
+        'Methode': result.method
+    }
+    return solvables[selection].astype(np.int32), Yi[selection].astype(np.float32), statistiques
+
+
+def jaccard_matrix(decisions, n_clients):
+    """
+    Pairwise Jaccard overlap of K selections
+
+    |Sₖ ∩ Sₗ| for every pair comes from one K × K product of the 0/1 matrix.
+    """
+    D = np.unpackbits(decisions, axis=1, count=n_clients).astype(np.float32)
+    intersection = D @ D.T
+    tailles = np.diag(intersection)
+    union = tailles[:, None] + tailles[None, :] - intersection
+    with np.errstate(divide='ignore', invalid='ignore'):
+        jaccard = np.where(union > 0, intersection / union, 1.0)
+    return jaccard.astype(np.float64)
+
+
+def summarize(frequency, jaccard, threshold):
+    """
+    Stable approvals and rejections, unstable clients and Jaccard statistics
+    """
+    K = len(jaccard)
+    paires = jaccard[np.triu_indices(K, k=1)] if K > 1 else np.ones(1)
+    return {
+        'realisations': K,
+        'approuves_stables': int((frequency >= threshold).sum()),
+        'rejetes_stables': int((frequency <= 1 - threshold).sum()),
+        'instables': int(((frequency > 1 - threshold) & (frequency < threshold)).sum()),
+        'jamais_selectionnes': int((frequency == 0).sum()),
+        'jaccard_moyen': float(paires.mean()),
+        'jaccard_median': float(np.median(paires)),
+        'jaccard_min': float(paires.min())
+    }
+
+
+def run_ensemble(df, config, params=None, verbose=True, nominal=None):
+    """
+    Solve the allocation under K PD noise realizations
+
+    Parameters:
+    df: pandas DataFrame - scored clients (output of prepare_clients, solvent
+        or not, with risk_score or pd_modele)
+    config: ScenarioConfig
+    params: dict - see DEFAULTS (workers None: one per CPU)
+    verbose: bool
+    nominal: pandas DataFrame or None - clients of the nominal run (output of
+             pipeline.optimizer_inputs) whose loan_intent and taux_rendement
+             are reused
+
+    Returns:
+    result: EnsembleResult
+    """
+    params = params or ensemble_params(config)
+    K = int(params['size'])
+    debut = time.perf_counter()
+
+    candidats = prepare_optimizer_inputs(df, config)
+    if nominal is not None:
+        # Mêmes objectifs et taux que le problème nominal pour les clients qu'il contient
+        communs = nominal.index.intersection(candidats.index)
+        for colonne in ('loan_intent', 'taux_rendement'):
+            candidats.loc[communs, colonne] = nominal.loc[communs, colonne].values
+    Mi = candidats['montant_demande'].values
+    ri = candidats['taux_rendement'].values
+    codes = encode_categories(candidats['loan_intent'].values, config.categories)
+    N = len(candidats)
+
+    PD = pd_matrix(base_pd(candidats, config.scoring).values, config.scoring, K, params['seed'])
+
+    workers = min(K, params['workers'] or default_workers())
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=process_context(),
+                                 initializer=_init_worker, initargs=(Mi, ri, codes, config)) as pool:
+            solutions = list(pool.map(_solve_realization, PD))
+    else:
+        _init_worker(Mi, ri, codes, config)
+        solutions = [_solve_realization(PD[k]) for k in range(K)]
+        _SHARED.clear()
+
+    # Décisions compactées: un bit par client et par réalisation
+    decisions = np.zeros((K, (N + 7) // 8), dtype=np.uint8)
+    fractions = np.zeros((K, N), dtype=np.float32)
+    compteurs = np.zeros(N, dtype=np.int64)
+    for k, (selection, financees, _) in enumerate(solutions):
+        ligne = np.zeros(N, dtype=bool)
+        ligne[selection] = True
+        decisions[k] = np.packbits(ligne)
+        fractions[k, selection] = financees
+        compteurs[selection] += 1
+
+    frequency = compteurs / K
+    jaccard = jaccard_matrix(decisions, N)
+    realisations = pd.DataFrame([stats for _, _, stats in solutions], index=pd.RangeIndex(K, name='Realisation'))
+
+    # Conformité des K portefeuilles en une passe matricielle (fractions financées)
+    conformite = evaluate_compliance_batch(candidats, fractions, Mi, PD, config)
+    realisations['Score_Conformite'] = conformite['score'].to_numpy()
+    realisations['Statut'] = conformite['statut'].to_numpy()
+
+    result = EnsembleResult(
+        decisions=decisions, index=candidats.index.values, frequency=frequency, jaccard=jaccard,
+        realisations=realisations, params=params, duration=time.perf_counter() - debut,
+        summary=summarize(frequency, jaccard, params['stable_threshold'])
+    )
+    if verbose:
+        print(f"  {K} réalisations résolues en {result.duration:.1f}s ({workers} processus)")
+    return result
+
+
+def summary_table(result):
+    """
+    Stabilite sheet: ensemble parameters and stability indicators
+    """
+    lignes = [
+        ('Réalisations', result.size),
+        ('Graine', result.params['seed']),
+        ('Seuil de stabilité', result.params['stable_threshold']),
+        ('Approuvés stables', result.summary['approuves_stables']),
+        ('Rejetés stables', result.summary['rejetes_stables']),
+        ('Clients instables', result.summary['instables']),
+        ('Jaccard moyen', result.summary['jaccard_moyen']),
+        ('Jaccard médian', result.summary['jaccard_median']),
+        ('Jaccard minimum', result.summary['jaccard_min']),
+        ('Clients sélectionnés (moyenne)', result.realisations['Clients_Selectionnes'].mean()),
+        ('Profit attendu (moyenne)', result.realisations['Profit_Attendu'].mean()),
+        ('Profit attendu (écart-type)', result.realisations['Profit_Attendu'].std()),
+        ('Score de conformité (moyenne)', result.realisations['Score_Conformite'].mean()),
+        ('Durée (s)', result.duration)
+    ]
+    return pd.DataFrame(lignes, columns=['Indicateur', 'Valeur'])
+
+
+def save_ensemble(result, path):
+    """
+    Write the packed decisions, frequencies and Jaccard matrix to a .npz file
+    """
+    np.savez_compressed(
+        path, decisions=result.decisions, index=result.index, frequency=result.frequency,
+        jaccard=result.jaccard, seed=result.params['seed']
+    )
+    return path
+
+
+def load_ensemble_decisions(path):
+    """
+    Packed decisions and client labels of a saved ensemble
+
+    Returns:
+    (decisions as a K × N bool matrix, index)
+    """
+    with np.load(path, allow_pickle=False) as data:
+        index = data['index']
+        return np.unpackbits(data['decisions'], axis=1, count=len(index)).astype(bool), index
+
+
+def print_ensemble(result, nominal_frequency=None):
+    """
+    Console summary of an ensemble
+
+    nominal_frequency: selection frequencies of the clients of the nominal
+    selection, or None
+    """
+    resume = result.summary
+    realisations = result.realisations
+    seuil = result.params['stable_threshold'] * 100
+    print(f"Approuvés dans ≥ {seuil:.0f}% des réalisations: {resume['approuves_stables']:,}")
+    print(f"Rejetés dans ≥ {seuil:.0f}% des réalisations: {resume['rejetes_stables']:,}")
+    print(f"Clients instables: {resume['instables']:,}")
+    print(f"Recouvrement de Jaccard entre réalisations: moyen {resume['jaccard_moyen']:.3f}, "
+          f"médian {resume['jaccard_median']:.3f}, minimum {resume['jaccard_min']:.3f}")
+    print(f"Clients sélectionnés: {realisations['Clients_Selectionnes'].mean():,.0f} "
+          f"(de {realisations['Clients_Selectionnes'].min():,} à {realisations['Clients_Selectionnes'].max():,})")
+    print(f"Profit attendu: {realisations['Profit_Attendu'].mean():,.0f} euros "
+          f"(écart-type {realisations['Profit_Attendu'].std():,.0f})")
+    statuts = realisations['Statut'].value_counts()
+    print("Conformité des réalisations: " + ", ".join(f"{statut} {n}" for statut, n in statuts.items()))
+    if nominal_frequency is not None and len(nominal_frequency) > 0:
+        print(f"Fréquence moyenne des clients de la sélection nominale: {np.mean(nominal_frequency)*100:.1f}%")
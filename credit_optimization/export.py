@@ -0,0 +1,120 @@
+"""
+Excel exports of an optimized credit portfolio
+"""
+
+import datetime
+import os
+
+import pandas as pd
+
+DETAIL_COLUMNS = [
+    'loan_percent_income', 'cb_person_cred_hist_length', 'person_emp_length',
+    'person_age', 'person_income', 'loan_int_rate', 'person_home_ownership_RENT',
+    'PD_calibrée', 'Yi', 'montant_demande', 'loan_intent', 'taux_rendement',
+    'Yi_optimal', 'credit_alloue', 'montant_alloue', 'revenus_attendus'
+]
+OPTIONAL_DETAIL_COLUMNS = ['cout_reduit', 'periode_financement', 'frequence_selection']
+
+
+def results_table(clients, config):
+    """
+    Approved clients in the published results format
+
+    Parameters:
+    clients: pandas DataFrame - solvent clients with the Yi_optimal and credit_alloue columns
+    config: ScenarioConfig - output.export_columns / output.export_rename
+
+    Returns:
+    resultats: pandas DataFrame
+    """
+    output = config.output
+    clients_approuves = clients[clients['credit_alloue'] == 1]
+
+    resultats = clients_approuves[output['export_columns']].copy()
+    resultats.rename(columns=output.get('export_rename', {}), inplace=True)
+
+    # Convertir person_home_ownership_RENT en 0/1 au lieu de True/False
+    resultats['person_home_ownership_RENT'] = resultats['person_home_ownership_RENT'].astype(int)
+    return resultats
+
+
+def write_results(resultats, path):
+    """
+    Write the results table to Excel
+
+    Falls back to a timestamped name when the file is locked (open in Excel)
+    and to CSV when the Excel export fails.
+
+    Returns:
+    path: str - file actually written
+    """
+    try:
+        resultats.to_excel(path, index=False, engine='openpyxl')
+    except PermissionError:
+        print(f"Fichier {os.path.basename(path)} ouvert dans Excel. Tentative avec un nouveau nom...")
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        racine, extension = os.path.splitext(path)
+        path = f'{racine}_{timestamp}{extension}'
+        resultats.to_excel(path, index=False, engine='openpyxl')
+    except Exception as e:
+        print(f"Erreur lors de l'export: {e}")
+        # Export en CSV en cas d'échec
+        path = os.path.splitext(path)[0] + '.csv'
+        resultats.to_csv(path, index=False)
+        print(f"Export réalisé en CSV: {path}")
+    return path
+
+
+def scenario_parameters(config):
+    """
+    Parametres_Scenario sheet: strategy, limits and target allocation
+    """
+    parametres = [
+        ('Stratégie', config.strategy),
+        ('Taux de risque cible (%)', config.risk_tolerance * 100),
+        ('Budget total (€)', config.budget_total),
+        ('Budget utilisé (€)', config.budget_used),
+        ('Seuil de solvabilité', config.scoring['solvency_threshold'])
+    ]
+    parametres += [(f'{categorie} (%)', part * 100) for categorie, part in config.allocation.items()]
+    return pd.DataFrame(parametres, columns=['Parametre', 'Valeur'])
+
+
+def write_analysis_workbook(path, resultats, clients, analyse_par_objectif, config, extra_sheets=None):
+    """
+    Write the detailed analysis workbook
+
+    Parameters:
+    path: str - output .xlsx file
+    resultats: pandas DataFrame - output of results_table
+    clients: pandas DataFrame - all solvent clients
+    analyse_par_objectif: pandas DataFrame or None - output of category_analysis_table
+    config: ScenarioConfig
+    extra_sheets: dict of sheet name -> (DataFrame, write_index) or None
+    """
+    # Colonnes optionnelles (ex. coût réduit issu de l'analyse de sensibilité)
+    colonnes = DETAIL_COLUMNS + [col for col in OPTIONAL_DETAIL_COLUMNS if col in clients.columns]
+    clients_detail = clients[colonnes].copy()
+
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        # Feuille 1: Résultats principaux (format exemple)
+        resultats.to_excel(writer, sheet_name='Resultats_Principaux', index=False)
+
+        # Feuille 2: Analyse détaillée
+        clients_detail.to_excel(writer, sheet_name='Analyse_Detaillee', index=False)
+
+        # Feuille 3: Clients sélectionnés seulement
+        clients_selectionnes = clients_detail[clients_detail['credit_alloue'] == 1]
+        clients_selectionnes.to_excel(writer, sheet_name='Clients_Selectionnes', index=False)
+
+        # Feuille 4: Analyse par objectif
+        if analyse_par_objectif is not None:
+            analyse_par_objectif.to_excel(writer, sheet_name='Analyse_Par_Objectif')
+
+        # Feuille 5: Paramètres du scénario
+        scenario_parameters(config).to_excel(writer, sheet_name='Parametres_Scenario', index=False)
+
+        for sheet_name, (table, write_index) in (extra_sheets or {}).items():
+            table.to_excel(writer, sheet_name=sheet_name, index=write_index)
+
+    return path
@@ -0,0 +1,73 @@
+"""
+Chunked reading of raw extracts
+
+Yields the extract as consecutive DataFrames of at most chunk_size rows so a
+stage can stream over a file larger than memory. The index of each chunk
+continues the row numbering of the file, as pandas.read_excel/read_csv would
+number the whole extract.
+"""
+
+import hashlib
+from itertools import islice
+
+import pandas as pd
+
+
+def iter_chunks(path, chunk_size=5000):
+    """
+    Iterate over a .xlsx or .csv extract chunk by chunk
+
+    Parameters:
+    path: str - raw extract
+    chunk_size: int - rows per chunk
+
+    Yields:
+    chunk: pandas DataFrame
+    """
+    if path.lower().endswith('.csv'):
+        yield from pd.read_csv(path, chunksize=chunk_size)
+        return
+
+    from openpyxl import load_workbook
+
+    # Mode lecture seule: les lignes sont lues au fil de l'eau
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        start = 0
+        while True:
+            block = list(islice(rows, chunk_size))
+            if not block:
+                break
+            chunk = pd.DataFrame(block, columns=header, index=pd.RangeIndex(start, start + len(block)))
+            yield _infer_numeric(chunk)
+            start += len(block)
+    finally:
+        workbook.close()
+
+
+def _infer_numeric(chunk):
+    """
+    Numeric columns stored as text in the workbook, converted as read_excel does
+    """
+    for col in chunk.columns:
+        if chunk[col].dtype.kind in 'biuf':
+            continue
+        valeurs = pd.to_numeric(chunk[col], errors='coerce')
+        if valeurs.notna().sum() == chunk[col].notna().sum():
+            chunk[col] = valeurs
+    return chunk
+
+
+def file_fingerprint(path, block_size=1 << 20):
+    """
+    SHA-256 of the file content (read by blocks)
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,127 @@
+"""
+Portfolio Metrics Module for Banking Optimization Scenarios
+Single vectorized kernel computing portfolio and per-category statistics
+for any decision vector (LP, heuristic or fallback selection)
+"""
+
+import numpy as np
+import pandas as pd
+
+# Order of the per-category accumulators in the bincount matrix
+_ACCUMULATORS = ['nb_clients', 'montant', 'revenus', 'risque', 'taux_rendement', 'pd']
+
+
+def encode_categories(values, categories):
+    """
+    Encode category labels as integer codes
+
+    Parameters:
+    values: array-like of str - category label per client
+    categories: list of str - known categories (e.g. keys of the target allocation)
+
+    Returns:
+    codes: numpy array of int64 - index in categories, len(categories) for unknown labels
+    """
+    codes = pd.Categorical(values, categories=categories).codes.astype(np.int64)
+    codes[codes < 0] = len(categories)
+    return codes
+
+
+def compute_portfolio_metrics(Yi, portfolio, LGD, targets=None):
+    """
+    Compute every portfolio and per-category statistic in one pass
+
+    Parameters:
+    Yi: array-like - decision per client (0/1 or funded fraction)
+    portfolio: Portfolio - amounts, return rates, PD and intent codes
+    LGD: float - loss given default
+    targets: dict or None - target share per category
+
+    Returns:
+    metrics: dict with portfolio totals, per-client arrays and the
+             'par_categorie' DataFrame indexed by category
+    """
+    Yi = np.asarray(Yi, dtype=np.float64)
+    Mi, ri, PD, codes = portfolio.Mi, portfolio.ri, portfolio.PD, portfolio.codes
+    categories = portfolio.categories
+
+    n_buckets = len(categories) + 1
+
+    # Per-client contributions
+    montant_alloue = Mi * Yi
+    revenus_attendus = montant_alloue * ri
+    risque_client = montant_alloue * PD
+    pertes_attendues = risque_client * LGD
+    profit_net = revenus_attendus - pertes_attendues
+
+    # One bincount over (accumulator, category) pairs
+    # Clients financés (en totalité ou en partie): comptage et moyennes simples
+    finances = (Yi > 0).astype(np.float64)
+    weights = np.vstack([finances, montant_alloue, revenus_attendus, risque_client, ri * finances, PD * finances])
+    offsets = (np.arange(len(_ACCUMULATORS)) * n_buckets)[:, None]
+    sums = np.bincount(
+        (codes[None, :] + offsets).ravel(),
+        weights=weights.ravel(),
+        minlength=len(_ACCUMULATORS) * n_buckets
+    ).reshape(len(_ACCUMULATORS), n_buckets)
+    acc = dict(zip(_ACCUMULATORS, sums))
+
+    # Portfolio totals from the per-category sums
+    clients_selectionnes = int(round(acc['nb_clients'].sum()))
+    montant_total_alloue = acc['montant'].sum()
+    revenus_totaux = acc['revenus'].sum()
+    risque_total = acc['risque'].sum()
+    pertes_totales = risque_total * LGD
+    profit_total = revenus_totaux - pertes_totales
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        nb = acc['nb_clients']
+        par_categorie = pd.DataFrame({
+            'Nb_Clients': np.round(nb).astype(int),
+            'Montant_Total': acc['montant'],
+            'Revenus_Attendus': acc['revenus'],
+            'Pertes_Attendues': acc['risque'] * LGD,
+            'Profit_Net': acc['revenus'] - acc['risque'] * LGD,
+            'Taux_Rendement_Moyen': np.where(nb > 0, acc['taux_rendement'] / nb, 0.0),
+            'PD_Moyenne': np.where(nb > 0, acc['pd'] / nb, 0.0),
+            'Part_Reelle': np.where(montant_total_alloue > 0, acc['montant'] / montant_total_alloue, 0.0)
+        }, index=pd.Index(list(categories) + ['AUTRE'], name='loan_intent'))
+
+    if targets is not None:
+        par_categorie['Part_Cible'] = [targets.get(cat, 0.0) for cat in par_categorie.index]
+
+    # The overflow bucket only shows up when some client has an unknown category
+    if not (codes == len(categories)).any():
+        par_categorie = par_categorie.drop(index='AUTRE')
+
+    return {
+        'clients_selectionnes': clients_selectionnes,
+        'montant_total_alloue': montant_total_alloue,
+        'revenus_totaux': revenus_totaux,
+        'pertes_attendues': pertes_totales,
+        'profit_net': profit_total,
+        'risque_total': risque_total,
+        'risque_moyen': risque_total / montant_total_alloue if montant_total_alloue > 0 else 0,
+        'pd_moyenne': acc['pd'].sum() / clients_selectionnes if clients_selectionnes > 0 else 0,
+        'roi_net': profit_total / montant_total_alloue if montant_total_alloue > 0 else 0,
+        'roi_brut': revenus_totaux / montant_total_alloue if montant_total_alloue > 0 else 0,
+        'par_categorie': par_categorie,
+        'clients': {
+            'montant_alloue': montant_alloue,
+            'revenus_attendus': revenus_attendus,
+            'pertes_attendues': pertes_attendues,
+            'profit_net': profit_net
+        }
+    }
+
+
+def category_analysis_table(metrics):
+    """
+    Build the 'Analyse_Par_Objectif' table (categories with selected clients only)
+    """
+    table = metrics['par_categorie']
+    table = table[table['Nb_Clients'] > 0].copy()
+    return table.round({
+        'Montant_Total': 2, 'Revenus_Attendus': 2, 'Pertes_Attendues': 2, 'Profit_Net': 2,
+        'Taux_Rendement_Moyen': 4, 'PD_Moyenne': 4
+    })
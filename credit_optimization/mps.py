@@ -0,0 +1,221 @@
+"""
+MPS files of the allocation model
+
+write_mps serializes an AllocationModel (minimise c·x, A_ub·x ≤ b_ub,
+bounds) in free MPS format, readable by HiGHS, CBC, GLPK, Gurobi or CPLEX;
+read_mps loads it back. save_model writes the .mps file and a .json file of
+run metadata next to it (scenario, model parameters, size, solver status,
+objective and solve time), which the replay harness (benchmark.py) compares
+its own solves against.
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+from scipy import sparse
+
+from .optimizer import AllocationModel
+from .solution_cache import model_parameters
+
+DEFAULTS = {
+    'directory': None
+}
+
+
+def model_export_params(config, **overrides):
+    """
+    Model export parameters of a scenario (config.model_export over DEFAULTS)
+    """
+    params = dict(DEFAULTS)
+    params.update(config.model_export or {})
+    params.update({key: value for key, value in overrides.items() if value is not None})
+    return params
+
+
+def _row_label(i, name):
+    # Noms MPS: sans espace, uniques
+    return f"R{i}_{name}".replace(' ', '_')
+
+
+def _column_label(j, n_clients):
+    return f"Y{j}" if j < n_clients else f"Z{j - n_clients}"
+
+
+def write_mps(model, path, name='ALLOCATION'):
+    """
+    Write the model in free MPS format
+
+    Returns:
+    path: str
+    """
+    A = sparse.csc_matrix(model.A_ub)
+    rows = [_row_label(i, nom) for i, nom in enumerate(model.row_names)]
+    if isinstance(model.bounds, tuple):
+        lower = np.full(model.n_variables, float(model.bounds[0]))
+        upper = np.full(model.n_variables, float(model.bounds[1]))
+    else:
+        bounds = np.asarray(model.bounds, dtype=np.float64)
+        lower, upper = bounds[:, 0], bounds[:, 1]
+
+    lignes = [f"NAME {name}", "ROWS", " N obj"]
+    lignes += [f" L {row}" for row in rows]
+    lignes.append("COLUMNS")
+    for j in range(model.n_variables):
+        col = _column_label(j, model.n_clients)
+        if model.c[j] != 0:
+            lignes.append(f" {col} obj {float(model.c[j])!r}")
+        debut, fin = A.indptr[j], A.indptr[j + 1]
+        for i, valeur in zip(A.indices[debut:fin], A.data[debut:fin]):
+            if valeur != 0:
+                lignes.append(f" {col} {rows[i]} {float(valeur)!r}")
+    lignes.append("RHS")
+    lignes += [f" RHS {row} {float(b)!r}" for row, b in zip(rows, model.b_ub) if b != 0]
+    lignes.append("BOUNDS")
+    for j in range(model.n_variables):
+        col = _column_label(j, model.n_clients)
+        if lower[j] != 0:
+            lignes.append(f" LO BND {col} {float(lower[j])!r}" if np.isfinite(lower[j]) else f" MI BND {col}")
+        if np.isfinite(upper[j]):
+            lignes.append(f" UP BND {col} {float(upper[j])!r}")
+    lignes.append("ENDATA")
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lignes) + '\n')
+    return path
+
+
+def read_mps(path, n_clients=None):
+    """
+    Load a free MPS file with ≤ and ≥ rows as an AllocationModel
+
+    ≥ rows are negated into ≤ rows; equality and range rows are not part of
+    the allocation models and raise ValueError.
+
+    Parameters:
+    n_clients: int or None - number of leading Yi variables (all if None)
+    """
+    section = None
+    types, row_names, columns = {}, [], {}
+    objectif, entrees, rhs, bornes = {}, [], {}, {}
+    with open(path, encoding='utf-8') as f:
+        for ligne in f:
+            if not ligne.strip() or ligne.startswith('*'):
+                continue
+            champs = ligne.split()
+            if not ligne[0].isspace():
+                section = champs[0]
+                continue
+            if section == 'ROWS':
+                sens, nom = champs
+                if sens == 'N':
+                    types[nom] = 'N'
+                    continue
+                if sens not in ('L', 'G'):
+                    raise ValueError(f"Ligne {nom} de type {sens} non gérée")
+                types[nom] = sens
+                row_names.append(nom)
+            elif section == 'COLUMNS':
+                col = champs[0]
+                j = columns.setdefault(col, len(columns))
+                for nom, valeur in zip(champs[1::2], champs[2::2]):
+                    if types[nom] == 'N':
+                        objectif[j] = float(valeur)
+                    else:
+                        entrees.append((nom, j, float(valeur)))
+            elif section == 'RHS':
+                for nom, valeur in zip(champs[1::2], champs[2::2]):
+                    rhs[nom] = float(valeur)
+            elif section == 'RANGES':
+                raise ValueError("Section RANGES non gérée")
+            elif section == 'BOUNDS':
+                bornes.setdefault(champs[2], []).append((champs[0], float(champs[3]) if len(champs) > 3 else None))
+
+    index = {nom: i for i, nom in enumerate(row_names)}
+    signe = np.array([-1.0 if types[nom] == 'G' else 1.0 for nom in row_names])
+    n = len(columns)
+    A = sparse.csr_matrix(
+        ([v * signe[index[nom]] for nom, _, v in entrees], ([index[nom] for nom, _, _ in entrees], [j for _, j, _ in entrees])),
+        shape=(len(row_names), n)
+    )
+    c = np.zeros(n)
+    for j, valeur in objectif.items():
+        c[j] = valeur
+    b = np.array([rhs.get(nom, 0.0) for nom in row_names]) * signe
+
+    lower, upper = np.zeros(n), np.full(n, np.inf)
+    for col, liste in bornes.items():
+        j = columns[col]
+        for sens, valeur in liste:
+            if sens == 'UP':
+                upper[j] = valeur
+            elif sens == 'LO':
+                lower[j] = valeur
+            elif sens == 'FX':
+                lower[j] = upper[j] = valeur
+            elif sens == 'MI':
+                lower[j] = -np.inf
+            elif sens == 'PL':
+                upper[j] = np.inf
+            elif sens == 'BV':
+                lower[j], upper[j] = 0.0, 1.0
+
+    # Noms d'origine des lignes (préfixe R<i>_ retiré)
+    noms = [nom.split('_', 1)[1] if nom.startswith('R') and '_' in nom else nom for nom in row_names]
+    n_clients = n if n_clients is None else n_clients
+    # Modèle Yi seul: matrice dense et bornes (0, 1) comme build_model
+    A_ub = A.toarray() if n_clients == n else A
+    bounds = (0, 1) if (lower == 0).all() and (upper == 1).all() else np.column_stack([lower, upper])
+    return AllocationModel(c=c, A_ub=A_ub, b_ub=b, row_names=noms, bounds=bounds, n_clients=n_clients)
+
+
+def run_metadata(optimization, config, duration=None):
+    """
+    Metadata of the solve of a scenario saved next to its model
+    """
+    lp_result = optimization.lp_result
+    solveur = 'dual' if optimization.dual else 'highs'
+    if optimization.cache:
+        solveur = {'hit': 'cache', 'warm': 'demarrage_a_chaud'}.get(optimization.cache['statut'], solveur)
+    return {
+        'scenario': config.id, 'title': config.title, 'config_fingerprint': config.fingerprint(),
+        'dataset': config.dataset, 'parametres': model_parameters(config), 'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'methode': optimization.method, 'solveur': solveur,
+        'statut_solveur': getattr(lp_result, 'status', None), 'message': optimization.message,
+        'objectif': float(lp_result.fun) if lp_result is not None and lp_result.success else None,
+        'iterations': getattr(lp_result, 'nit', None), 'duree_optimisation': duration
+    }
+
+
+def save_model(model, path, metadata=None):
+    """
+    Write <path>.mps and the run metadata in <path>.json
+
+    Returns:
+    (mps path, json path)
+    """
+    racine = os.path.splitext(path)[0]
+    write_mps(model, racine + '.mps', name=os.path.basename(racine).upper()[:32])
+    meta = {
+        'variables': model.n_variables,
+        'clients': model.n_clients,
+        'contraintes': len(model.row_names),
+        'row_names': model.row_names,
+        **(metadata or {})
+    }
+    with open(racine + '.json', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False, default=str)
+    return racine + '.mps', racine + '.json'
+
+
+def load_model(path):
+    """
+    Model and metadata saved by save_model (metadata empty without .json)
+    """
+    racine = os.path.splitext(path)[0]
+    metadata = {}
+    if os.path.exists(racine + '.json'):
+        with open(racine + '.json', encoding='utf-8') as f:
+            metadata = json.load(f)
+    return read_mps(racine + '.mps', metadata.get('clients')), metadata
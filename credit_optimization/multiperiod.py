@@ -0,0 +1,429 @@
+"""
+Multi-period allocation with repayment cash flows
+
+Each client can be funded in one of T periods (from its arrival period on).
+Capital is recycled: a loan funded in period s repays (1 - PD) × M / L per
+period over its L-period term, and those expected repayments are available
+for lending from the following periods. Risk and category limits apply to
+each period's new production:
+
+maximiser Σₜ δᵗ Σᵢ (ri × Mi - PDi × LGD × Mi) × Yit
+sous Σₜ Yit ≤ 1                                  (un financement par client)
+     Σ_{s≤t} Σᵢ (Mi - Rᵢ(t-s)) × Yis ≤ Σ_{s≤t} Bs (trésorerie cumulée)
+     Σᵢ (PDi - TR) × Mi × Yit ≤ 0                (risque moyen de la période)
+     pct × Vt × (1-ε) ≤ Σ(Mi × Yit par catégorie) ≤ pct × Vt × (1+ε)
+     Vt = Σᵢ Mi × Yit
+
+The time-expanded model is built block by block as a sparse matrix. The
+rolling-horizon mode solves a window of W periods, commits the decisions of
+its first period and moves on, so each re-solve only covers the next window.
+
+The committed decisions of each period are rounded on that period's rows
+(prudent rounding, or the best subset of the clients funded by the LP) and
+the final plan is certified period by period (repair.feasibility_certificate).
+"""
+
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint, linprog, milp
+
+from .repair import feasibility_certificate
+
+DEFAULTS = {
+    'periods': 4,
+    'term_periods': 12,
+    'injection': 'initial',
+    'discount': 0.99,
+    'arrivals': 'spread',
+    'arrival_seed': 7,
+    'window': None
+}
+
+
+@dataclass
+class MultiPeriodResult:
+    """
+    Funding period per client (-1: not funded), the per-period plan and its
+    feasibility certificate
+    """
+    periode: np.ndarray
+    plan: pd.DataFrame
+    params: dict
+    solves: list = field(default_factory=list)
+    certificate: pd.DataFrame = None
+
+    @property
+    def clients_finances(self):
+        return int((self.periode >= 0).sum())
+
+    @property
+    def echecs(self):
+        """Windows whose solve failed (no decision committed for their periods)"""
+        return [solve for solve in self.solves if not solve['succes']]
+
+    @property
+    def feasible(self):
+        return self.certificate is None or bool(self.certificate['Respectee'].all())
+
+    @property
+    def statut(self):
+        if self.echecs:
+            return 'ÉCHEC'
+        return 'OK' if self.feasible else 'NON FAISABLE'
+
+
+def multiperiod_params(config, **overrides):
+    """
+    Multi-period parameters of a scenario (config.multiperiod over DEFAULTS)
+    """
+    params = dict(DEFAULTS)
+    params.update(config.multiperiod or {})
+    params.update({key: value for key, value in overrides.items() if value is not None})
+    return params
+
+
+def arrival_periods(n, params):
+    """
+    Period from which each application can be funded
+
+    'all': every application is available from the first period; 'spread':
+    applications arrive uniformly over the horizon (seeded draw).
+    """
+    if params['arrivals'] == 'all':
+        return np.zeros(n, dtype=int)
+    rng = np.random.RandomState(params['arrival_seed'])
+    return rng.randint(0, params['periods'], size=n)
+
+
+def capital_injections(budget, params):
+    """
+    New capital made available in each period
+    """
+    T = params['periods']
+    if params['injection'] == 'even':
+        return np.full(T, budget / T)
+    injections = np.zeros(T)
+    injections[0] = budget
+    return injections
+
+
+def repaid(Mi, PD, elapsed, term):
+    """
+    Expected principal repaid after `elapsed` periods (linear amortization)
+    """
+    return (1 - PD) * Mi * np.minimum(np.maximum(elapsed, 0), term) / term
+
+
+def _build_window(Mi, profit, PD, codes, categories, config, params, arrivals, start, end,
+                  candidates, committed_net):
+    """
+    Sparse time-expanded LP over periods [start, end) for the candidate clients
+
+    Variables: Y[w, j] (w-th period of the window, j-th candidate) at
+    w × n + j, then the period volumes V[w] at W × n + w.
+    """
+    n = len(candidates)
+    W = end - start
+    n_y = W * n
+    term = params['term_periods']
+    TR = config.risk_tolerance
+    epsilon = config.epsilon
+
+    M = Mi[candidates]
+    pd_c = PD[candidates]
+    code_c = codes[candidates]
+    j = np.arange(n)
+
+    rows, cols, vals, b_ub = [], [], [], []
+    row = 0
+
+    # 1. Un seul financement par client sur la fenêtre
+    if W > 1:
+        for w in range(W):
+            rows.append(j)
+            cols.append(w * n + j)
+            vals.append(np.ones(n))
+        b_ub.append(np.ones(n))
+        row += n
+
+    # 2. Trésorerie cumulée: décaissements - remboursements attendus ≤ capital injecté - engagements passés
+    injections = capital_injections(config.budget_used, params)
+    for w_t in range(W):
+        t = start + w_t
+        for w_s in range(w_t + 1):
+            elapsed = w_t - w_s
+            coef = M - repaid(M, pd_c, elapsed, term) if elapsed > 0 else M
+            rows.append(np.full(n, row))
+            cols.append(w_s * n + j)
+            vals.append(coef)
+        b_ub.append([injections[:t + 1].sum() - committed_net[t]])
+        row += 1
+
+    # 3. Risque moyen de la production de chaque période
+    for w in range(W):
+        rows.append(np.full(n, row))
+        cols.append(w * n + j)
+        vals.append((pd_c - TR) * M)
+        b_ub.append([0.0])
+        row += 1
+
+    # 4. Parts par catégorie relatives au volume Vt de la période
+    for w in range(W):
+        for code, categorie in enumerate(categories):
+            mask = code_c == code
+            if not mask.any():
+                continue
+            pct = config.allocation[categorie]
+            members = np.flatnonzero(mask)
+
+            # Σ(Mi × Yit catégorie) - pct(1+ε)Vt ≤ 0
+            rows += [np.full(len(members), row), [row]]
+            cols += [w * n + members, [n_y + w]]
+            vals += [M[members], [-pct * (1 + epsilon)]]
+            # pct(1-ε)Vt - Σ(Mi × Yit catégorie) ≤ 0
+            rows += [np.full(len(members), row + 1), [row + 1]]
+            cols += [w * n + members, [n_y + w]]
+            vals += [-M[members], [pct * (1 - epsilon)]]
+            b_ub.append([0.0, 0.0])
+            row += 2
+
+    A_ub = sparse.csr_matrix(
+        (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(row, n_y + W)
+    )
+
+    # Définition des volumes: Vt - Σᵢ Mi × Yit = 0
+    eq_rows = np.concatenate([np.repeat(np.arange(W), n), np.arange(W)])
+    eq_cols = np.concatenate([np.arange(n_y), n_y + np.arange(W)])
+    eq_vals = np.concatenate([np.tile(-M, W), np.ones(W)])
+    A_eq = sparse.csr_matrix((eq_vals, (eq_rows, eq_cols)), shape=(W, n_y + W))
+
+    # Actualisation: un même prêt rapporte plus s'il est financé plus tôt
+    discount = params['discount'] ** np.arange(start, end)
+    c = np.concatenate([-(np.outer(discount, profit[candidates])).ravel(), np.zeros(W)])
+
+    # Une demande n'est finançable qu'à partir de sa période d'arrivée
+    upper = (np.arange(start, end)[:, None] >= arrivals[candidates][None, :]).astype(float).ravel()
+    bounds = np.column_stack([np.zeros(n_y + W), np.concatenate([upper, np.full(W, np.inf)])])
+
+    return c, A_ub, np.concatenate(b_ub).astype(float), A_eq, np.zeros(W), bounds
+
+
+def _committed_net(Mi, PD, periode, T, term):
+    """
+    Net capital tied up in each period by the loans already committed
+    """
+    net = np.zeros(T)
+    funded = np.flatnonzero(periode >= 0)
+    for t in range(T):
+        s = periode[funded]
+        past = s <= t
+        net[t] = (Mi[funded][past] - repaid(Mi[funded][past], PD[funded][past], t - s[past], term)).sum()
+    return net
+
+
+def _period_rows(Mi, PD, codes, categories, config, params, periode, t, clients, pool=None):
+    """
+    Rows of period t (trésorerie, risque, parts par catégorie) over `clients`
+
+    The loans committed in earlier periods are moved to the right-hand side;
+    the volume Vt is folded into the category rows (Vt = Σᵢ Mi × Yit). As in
+    the window LP, a category gets its rows only if it has applications in
+    `pool` (default: `clients`).
+
+    Returns:
+    A: numpy array (rows, len(clients)), b: numpy array, row_names: list of str
+    """
+    M = Mi[clients]
+    code_c = codes[clients]
+    injections = capital_injections(config.budget_used, params)
+    anterieurs = np.where(periode < t, periode, -1)
+    net = _committed_net(Mi, PD, anterieurs, params['periods'], params['term_periods'])[t]
+
+    A = [M, (PD[clients] - config.risk_tolerance) * M]
+    b = [injections[:t + 1].sum() - net, 0.0]
+    row_names = [f'tresorerie_p{t}', f'risque_p{t}']
+    presents = set(codes[clients if pool is None else pool])
+    for code, categorie in enumerate(categories):
+        if code not in presents:
+            continue
+        pct = config.allocation[categorie]
+        membre = (code_c == code).astype(float)
+        A += [M * (membre - pct * (1 + config.epsilon)), M * (pct * (1 - config.epsilon) - membre)]
+        b += [0.0, 0.0]
+        row_names += [f'{categorie}_p{t}_max', f'{categorie}_p{t}_min']
+    return np.array(A).reshape(len(A), len(clients)), np.array(b, dtype=float), row_names
+
+
+def _round_period(x, A, b, profit, time_limit=30):
+    """
+    0/1 decisions of one period from its relaxed values
+
+    Prudent rounding (only the decisions at 1 are kept) when it respects the
+    period's rows. Otherwise the risk and category rows, relative to the
+    period volume, are tight at the LP optimum and a greedy drop breaks the
+    other bands: the best subset of the clients funded by the LP is chosen
+    by a small MILP (HiGHS) on the period's rows. Funding nobody respects
+    every row, so the MILP always has a solution.
+    """
+    Y = x >= 1 - 1e-6
+    tolerance = 1e-9 * np.maximum(1.0, np.abs(b))
+    if (A @ Y <= b + tolerance).all():
+        return Y
+    retenus = np.flatnonzero(x > 1e-6)
+    res = milp(-profit[retenus], constraints=LinearConstraint(A[:, retenus], -np.inf, b),
+               integrality=np.ones(len(retenus)), bounds=Bounds(0, 1),
+               options={'time_limit': time_limit, 'mip_rel_gap': 1e-4})
+    if res.x is None:
+        return Y
+    Y = np.zeros(len(x), dtype=bool)
+    Y[retenus[res.x > 0.5]] = True
+    return Y
+
+
+def plan_certificate(Mi, PD, codes, categories, config, params, periode):
+    """
+    Row-by-row check of every period of a funding plan
+
+    Returns:
+    pandas DataFrame indexed by constraint (see repair.feasibility_certificate)
+    """
+    arrivals = arrival_periods(len(Mi), params)
+    certificats = []
+    for t in range(params['periods']):
+        funded = np.flatnonzero(periode == t)
+        # Demandes finançables en t: arrivées et non financées avant t
+        pool = np.flatnonzero((arrivals <= t) & ((periode < 0) | (periode >= t)))
+        A, b, row_names = _period_rows(Mi, PD, codes, categories, config, params, periode, t, funded, pool)
+        certificats.append(feasibility_certificate(A, b, np.ones(len(funded)), row_names))
+    return pd.concat(certificats)
+
+
+def period_plan(Mi, ri, PD, codes, categories, config, params, periode):
+    """
+    Per-period production, repayments and available capital of a funding plan
+    """
+    T = params['periods']
+    term = params['term_periods']
+    LGD = config.lgd
+    injections = capital_injections(config.budget_used, params)
+    funded = np.flatnonzero(periode >= 0)
+    s = periode[funded]
+
+    lignes = []
+    capital = 0.0
+    for t in range(T):
+        nouveaux = funded[s == t]
+        anciens = s < t
+        remboursements = (
+            repaid(Mi[funded][anciens], PD[funded][anciens], t - s[anciens], term)
+            - repaid(Mi[funded][anciens], PD[funded][anciens], t - 1 - s[anciens], term)
+        ).sum()
+        capital += injections[t] + remboursements
+        montant = Mi[nouveaux].sum()
+        lignes.append({
+            'Periode': t,
+            'Capital_Injecte': injections[t],
+            'Remboursements': remboursements,
+            'Capital_Disponible': capital,
+            'Nb_Clients': len(nouveaux),
+            'Montant_Finance': montant,
+            'Profit_Attendu': (Mi[nouveaux] * ri[nouveaux] - PD[nouveaux] * LGD * Mi[nouveaux]).sum(),
+            'Risque_Moyen': (PD[nouveaux] * Mi[nouveaux]).sum() / montant if montant > 0 else 0.0,
+            **{f'Part_{categorie}': Mi[nouveaux][codes[nouveaux] == code].sum() / montant if montant > 0 else 0.0
+               for code, categorie in enumerate(categories)}
+        })
+        capital -= montant
+
+    return pd.DataFrame(lignes).set_index('Periode')
+
+
+def optimize_multiperiod(Mi, ri, PD, codes, categories, config, params=None, verbose=True):
+    """
+    Multi-period funding plan, over the full horizon or by rolling windows
+
+    Parameters:
+    Mi, ri, PD: numpy arrays - amount, return rate and PD per client
+    codes: numpy array of int - loan_intent code per client
+    categories: list of str
+    config: ScenarioConfig
+    params: dict - see DEFAULTS (window None: one solve over the whole horizon)
+    verbose: bool - print one line per solve
+
+    Returns:
+    result: MultiPeriodResult
+    """
+    params = params or multiperiod_params(config)
+    T = params['periods']
+    term = params['term_periods']
+    window = params['window'] or T
+
+    profit = Mi * ri - PD * config.lgd * Mi
+    arrivals = arrival_periods(len(Mi), params)
+    periode = np.full(len(Mi), -1)
+    solves = []
+
+    start = 0
+    while start < T:
+        end = min(T, start + window)
+        # Fenêtre glissante: seules les décisions de la première période sont engagées
+        commit_end = end if window >= T else start + 1
+
+        candidates = np.flatnonzero(periode < 0)
+        committed_net = _committed_net(Mi, PD, periode, T, term)
+
+        debut = time.perf_counter()
+        c, A_ub, b_ub, A_eq, b_eq, bounds = _build_window(
+            Mi, profit, PD, codes, categories, config, params, arrivals, start, end, candidates, committed_net
+        )
+        res = linprog(c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq, bounds=bounds, method='highs')
+        duree = time.perf_counter() - debut
+
+        n = len(candidates)
+        if res.success:
+            x = res.x[:(end - start) * n].reshape(end - start, n)
+            for w in range(commit_end - start):
+                # Arrondi corrigé sur les lignes de la période, parmi les demandes arrivées et non financées
+                t = start + w
+                eligibles = np.flatnonzero((arrivals[candidates] <= t) & (periode[candidates] < 0))
+                clients = candidates[eligibles]
+                A, b, _ = _period_rows(Mi, PD, codes, categories, config, params, periode, t, clients)
+                periode[clients[_round_period(x[w, eligibles], A, b, profit[clients])]] = t
+
+        solves.append({
+            'debut': start, 'fin': end, 'variables': A_ub.shape[1], 'contraintes': A_ub.shape[0] + A_eq.shape[0],
+            'non_nuls': A_ub.nnz + A_eq.nnz, 'succes': bool(res.success), 'message': res.message, 'duree': duree
+        })
+        if verbose:
+            statut = 'OK' if res.success else f'échec ({res.message})'
+            print(f"  Périodes {start}-{end - 1}: {A_ub.shape[1]:,} variables, {A_ub.nnz + A_eq.nnz:,} non nuls, "
+                  f"{duree:.1f}s - {statut}")
+
+        start = commit_end
+
+    plan = period_plan(Mi, ri, PD, codes, categories, config, params, periode)
+    certificate = plan_certificate(Mi, PD, codes, categories, config, params, periode)
+    return MultiPeriodResult(periode=periode, plan=plan, params=params, solves=solves, certificate=certificate)
+
+
+def print_multiperiod(result):
+    """
+    Console summary of a multi-period plan
+    """
+    plan = result.plan
+    print(f"Plan multi-périodes: {result.statut}")
+    for solve in result.echecs:
+        print(f"  Fenêtre {solve['debut']}-{solve['fin'] - 1} en échec ({solve['message']}): décisions non engagées")
+    for nom, ligne in result.certificate[~result.certificate['Respectee']].iterrows():
+        print(f"  {nom}: {ligne['Utilisation']:,.0f} pour une limite de {ligne['Second_Membre']:,.0f}")
+    print(f"Clients financés sur {result.params['periods']} périodes: {result.clients_finances:,}")
+    print(f"Montant total financé: {plan['Montant_Finance'].sum():,.0f} euros "
+          f"(dont {plan['Remboursements'].sum():,.0f} euros de capital recyclé)")
+    print(f"Profit attendu: {plan['Profit_Attendu'].sum():,.0f} euros")
+    for periode, ligne in plan.iterrows():
+        print(f"  Période {periode}: {int(ligne['Nb_Clients']):,} clients, {ligne['Montant_Finance']:,.0f} euros, "
+              f"risque {ligne['Risque_Moyen']*100:.2f}%")
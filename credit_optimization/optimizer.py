@@ -0,0 +1,446 @@
+"""
+Linear programming model of the credit allocation problem
+
+maximiser Σ(ri × Mi × Yi - PDi × LGD × Mi × Yi)
+sous Σ(Mi × Yi) ≤ B, Σ(PDi × Mi × Yi) ≤ TR × B,
+pct × B × (1-ε) ≤ Σ(Mi × Yi par catégorie) ≤ pct × B × (1+ε), 0 ≤ Yi ≤ 1
+"""
+
+import time
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+from scipy.optimize import linprog
+
+from .repair import repair_selection
+
+
+@dataclass
+class AllocationModel:
+    """
+    Inequality-form LP (minimise c·x subject to A_ub·x ≤ b_ub, 0 ≤ x ≤ 1)
+
+    The first n_clients variables are the decisions Yi; reformulations such
+    as the robust model append auxiliary variables after them.
+    """
+    c: np.ndarray
+    A_ub: object
+    b_ub: np.ndarray
+    row_names: list
+    bounds: object = (0, 1)
+    n_clients: int = None
+
+    def __post_init__(self):
+        if self.n_clients is None:
+            self.n_clients = len(self.c)
+
+    @property
+    def n_variables(self):
+        return len(self.c)
+
+    @property
+    def extended(self):
+        """True when the model has auxiliary variables besides the Yi"""
+        return self.n_variables > self.n_clients
+
+
+@dataclass
+class OptimizationResult:
+    """
+    Decision vector and how it was obtained ('lp', 'milp', 'heuristique' or 'secours')
+    """
+    Yi: np.ndarray
+    method: str
+    message: str = ''
+    lp_result: object = field(default=None, repr=False)
+    model: AllocationModel = field(default=None, repr=False)
+    repair: object = field(default=None, repr=False)
+    cache: dict = None
+    dual: dict = None
+    scaling: dict = None
+    warning: str = None
+
+
+def build_model(portfolio, config):
+    """
+    Build the allocation LP
+
+    Parameters:
+    portfolio: Portfolio - amount, return rate, PD and loan_intent code per client
+    config: ScenarioConfig
+
+    Returns:
+    model: AllocationModel
+    """
+    Mi, ri, PD = portfolio.Mi, portfolio.ri, portfolio.PD
+    budget = config.budget_used
+    LGD = config.lgd
+    epsilon = config.epsilon
+
+    # Fonction objectif: profit_i = ri * Mi - PDi * LGD * Mi (négatif pour linprog)
+    profit_net = Mi * ri - PD * LGD * Mi
+    c = -profit_net
+
+    A_ub = []
+    b_ub = []
+    row_names = []
+
+    # 1. Contrainte budgétaire: Σ(Mi × Yi) ≤ B
+    A_ub.append(Mi)
+    b_ub.append(budget)
+    row_names.append('budget')
+
+    # 2. Contrainte de risque: Σ(PDi × Mi × Yi) ≤ TR × B
+    A_ub.append(PD * Mi)
+    b_ub.append(config.risk_tolerance * budget)
+    row_names.append('risque')
+
+    # 3. Contraintes d'allocation par catégorie de prêt
+    for code, categorie in enumerate(portfolio.categories):
+        # Clients de la catégorie lus dans l'index par objectif (aucun masque sur N)
+        idx = portfolio.intent(code)
+        if not len(idx):
+            continue
+
+        pct_target = config.allocation[categorie]
+        budget_min = pct_target * budget * (1 - epsilon)
+        budget_max = pct_target * budget * (1 + epsilon)
+        montants = np.zeros(len(portfolio))
+        montants[idx] = Mi[idx]
+
+        # Contrainte minimum: -Σ(Mi × Yi pour catégorie) ≤ -budget_min
+        A_ub.append(-montants)
+        b_ub.append(-budget_min)
+        row_names.append(f'{categorie}_min')
+
+        # Contrainte maximum: Σ(Mi × Yi pour catégorie) ≤ budget_max
+        A_ub.append(montants)
+        b_ub.append(budget_max)
+        row_names.append(f'{categorie}_max')
+
+    return AllocationModel(c=c, A_ub=np.array(A_ub), b_ub=np.array(b_ub), row_names=row_names)
+
+
+def solve_lp(model):
+    """
+    Solve the LP relaxation with HiGHS
+    """
+    return linprog(model.c, A_ub=model.A_ub, b_ub=model.b_ub, bounds=model.bounds, method='highs')
+
+
+def greedy_selection(Mi, ri, PD, LGD, budget, risk_tolerance):
+    """
+    Heuristic used when the LP fails: clients by decreasing net profit,
+    accepted while the budget and the average risk stay within limits
+    """
+    profit_net_individuel = Mi * ri - PD * LGD * Mi
+    indices_tries = np.argsort(-profit_net_individuel)
+
+    Yi = np.zeros(len(Mi), dtype=int)
+    budget_utilise = 0
+    risque_cumule = 0
+
+    for idx in indices_tries:
+        nouveau_budget = budget_utilise + Mi[idx]
+        nouveau_risque_total = risque_cumule + Mi[idx] * PD[idx]
+        nouveau_risque_moyen = nouveau_risque_total / nouveau_budget if nouveau_budget > 0 else 0
+
+        if nouveau_budget <= budget and nouveau_risque_moyen <= risk_tolerance:
+            Yi[idx] = 1
+            budget_utilise = nouveau_budget
+            risque_cumule = nouveau_risque_total
+
+    return Yi
+
+
+def emergency_selection(Mi, PD, budget, count=1000):
+    """
+    Last-resort selection: the lowest-PD clients that fit in the budget
+    """
+    indices_faible_risque = np.argsort(PD)[:min(count, len(PD))]
+    Yi = np.zeros(len(Mi), dtype=int)
+
+    budget_utilise = 0
+    for idx in indices_faible_risque:
+        if budget_utilise + Mi[idx] <= budget:
+            Yi[idx] = 1
+            budget_utilise += Mi[idx]
+
+    return Yi
+
+
+def robust_inputs(Mi, PD, config):
+    """
+    PD deviations and protection level Γ of the scenario's robust parameters
+    """
+    from .robust import robust_params, pd_deviations, protection_level
+
+    params = robust_params(config)
+    return pd_deviations(PD, config, params), protection_level(len(Mi), params)
+
+
+def build_robust_from_config(model, Mi, PD, config):
+    """
+    Robust counterpart of the model with the scenario's robust parameters
+    """
+    from .robust import build_robust_model
+
+    deviations, gamma = robust_inputs(Mi, PD, config)
+    return build_robust_model(model, Mi, deviations, gamma)
+
+
+def repair_rows(nominal, model, x):
+    """
+    Rows the rounded selection must satisfy
+
+    For the robust model the risk limit is reduced by the protection the LP
+    reserved (Γ × z + Σ pi), so the repaired selection keeps that margin.
+    """
+    if not model.extended:
+        return nominal
+    risque = model.row_names.index('risque')
+    ligne = model.A_ub[[risque]] if hasattr(model.A_ub, 'tocsr') else model.A_ub[risque:risque + 1]
+    protection = float((ligne[:, model.n_clients:] @ x[model.n_clients:]).sum())
+    b_ub = nominal.b_ub.astype(float).copy()
+    b_ub[nominal.row_names.index('risque')] -= protection
+    return replace(nominal, b_ub=b_ub)
+
+
+def robust_repair(x, nominal, model, Mi, PD, config, rounds=5):
+    """
+    Repaired selection of the robust model, re-tightened until its worst-case
+    risk (which moves with the rounding) is within the limit
+    """
+    from .robust import worst_case_risk
+
+    deviations, gamma = robust_inputs(Mi, PD, config)
+    rows = repair_rows(nominal, model, x)
+    risque = nominal.row_names.index('risque')
+    limite = nominal.b_ub[risque]
+    repair = repair_selection(x, rows, -nominal.c)
+    for _ in range(rounds):
+        _, pire_cas = worst_case_risk(repair.Yi, Mi, PD, deviations, gamma)
+        if pire_cas <= limite * (1 + 1e-9):
+            break
+        rows.b_ub[risque] -= pire_cas - limite
+        repair = repair_selection(x, rows, -nominal.c)
+    return repair
+
+
+def solve_highs(model, config):
+    """
+    Solve the LP with HiGHS, on the scaled model when the scenario enables
+    the numerical scaling (see scaling.py)
+
+    Returns:
+    lp_result, scaling report (None without scaling)
+    """
+    if not (config.scaling and config.scaling.get('enabled')):
+        return solve_lp(model), None
+
+    from .scaling import scaling_params, solve_scaled
+
+    params = scaling_params(config)
+    return solve_scaled(model, params['unit'], params['passes'], params['compare'])
+
+
+def solve_model(model, config):
+    """
+    Solve the LP with HiGHS, or through its Lagrangian dual when the scenario
+    enables the dual solver (Yi-only models; HiGHS if the recovery fails)
+
+    Returns:
+    lp_result, reports: dict with the dual and scaling reports (None when unused)
+    """
+    reports = {'dual': None, 'scaling': None}
+    if not (config.dual_solver and config.dual_solver.get('enabled')) or model.extended:
+        lp_result, reports['scaling'] = solve_highs(model, config)
+        return lp_result, reports
+
+    from .dual_solver import dual_solver_params, solve_dual
+
+    params = dual_solver_params(config)
+    lp_result, reports['dual'] = solve_dual(model, params['tolerance'], params['max_iterations'],
+                                            params['band'], params['max_rounds'])
+    if lp_result is None:
+        lp_result, reports['scaling'] = solve_highs(model, config)
+    return lp_result, reports
+
+
+def solve_cached(model, portfolio, config, cache):
+    """
+    Solve the model through the solution cache
+
+    Returns:
+    lp_result, report: dict with statut ('hit', 'warm' or 'miss'), duree
+    """
+    from .solution_cache import lp_result_from_solution, solution_key, solution_metrics, structure_key, \
+        warm_start_solve
+
+    debut = time.perf_counter()
+    key = solution_key(portfolio.Mi, portfolio.ri, portfolio.PD, portfolio.codes, config)
+    entry = cache.get(key)
+    if entry is not None and list(entry['row_names']) == model.row_names and len(entry['x']) == model.n_variables:
+        lp_result = lp_result_from_solution(model, entry['x'], entry['duals'], message='Solution reprise du cache')
+        return lp_result, {'statut': 'hit', 'cle': key, 'metriques': entry['metrics'],
+                           'duree': time.perf_counter() - debut}
+
+    structure = structure_key(portfolio.Mi, portfolio.codes, portfolio.categories)
+    lp_result, report = None, {'statut': 'miss', 'cle': key}
+    if cache.warm_start and not model.extended:
+        voisin = cache.nearest(structure)
+        if voisin is not None and list(voisin['row_names']) == model.row_names:
+            lp_result, warm = warm_start_solve(model, voisin['duals'], cache.band, cache.max_rounds)
+            if lp_result is not None:
+                report = {'statut': 'warm', 'cle': key, **warm}
+    if lp_result is None:
+        lp_result, reports = solve_model(model, config)
+        report.update(reports)
+    report['duree'] = time.perf_counter() - debut
+
+    if lp_result.success:
+        cache.put(key, structure, lp_result.x, lp_result.ineqlin.marginals, model.row_names,
+                  solution_metrics(lp_result.x, portfolio, config, -float(lp_result.fun), model.n_variables))
+    return lp_result, report
+
+
+def build_models(portfolio, config):
+    """
+    Nominal model and the model given to the solver (robust reformulation
+    when config.robust is enabled, else the nominal model itself)
+    """
+    nominal = build_model(portfolio, config)
+    if config.robust and config.robust.get('enabled'):
+        return nominal, build_robust_from_config(nominal, portfolio.Mi, portfolio.PD, config)
+    return nominal, nominal
+
+
+def solve_models(model, portfolio, config, cache=None):
+    """
+    Solve the model, through the solution cache when one is given
+
+    Returns:
+    lp_result, cache report (None without cache), reports: dict with the
+    dual and scaling reports
+    """
+    if cache is None:
+        lp_result, reports = solve_model(model, config)
+        return lp_result, None, reports
+    lp_result, cache_report = solve_cached(model, portfolio, config, cache)
+    return lp_result, cache_report, {'dual': cache_report.get('dual'), 'scaling': cache_report.get('scaling')}
+
+
+def finish_optimization(lp_result, nominal, model, portfolio, config, cache_report=None, reports=None):
+    """
+    Decision of a solved model: funded fractions (partial funding), repaired
+    rounding of the relaxed solution, or the greedy heuristic when the LP failed
+
+    Returns:
+    result: OptimizationResult
+    """
+    Mi, ri, PD = portfolio.Mi, portfolio.ri, portfolio.PD
+    reports = reports or {}
+    warning = None
+    partial = config.partial_funding and config.partial_funding.get('enabled')
+    if partial:
+        from .partial_funding import funded_fractions, partial_funding_params, respects_tickets, \
+            solve_semicontinuous
+        params = partial_funding_params(config)
+
+    if partial and params['min_ticket'] > 0 and not (
+            lp_result.success and respects_tickets(lp_result.x[:model.n_clients], Mi, params['min_ticket'])):
+        # La solution linéaire a des fractions sous le ticket minimum: MILP semi-continu
+        milp_result = solve_semicontinuous(model, Mi, params['min_ticket'], params['time_limit'],
+                                           params['mip_rel_gap'])
+        if milp_result.x is not None:
+            # Solution entière (éventuellement au temps limite): aucun arrondi
+            return OptimizationResult(Yi=funded_fractions(milp_result.x, model.n_clients), method='milp',
+                                      message=milp_result.message, lp_result=milp_result, model=model,
+                                      cache=cache_report, **reports)
+        # Aucune solution entière: les fractions linéaires violent le ticket, décisions 0/1 réparées
+        partial = False
+        warning = (f"MILP semi-continu sans solution ({milp_result.message}): les fractions linéaires ne respectent "
+                   f"pas le ticket minimum, financement partiel abandonné (sélection 0/1 réparée)")
+
+    if lp_result.success and partial:
+        # Fraction financée = solution linéaire, sans arrondi
+        return OptimizationResult(Yi=funded_fractions(lp_result.x, model.n_clients), method='lp',
+                                  message=lp_result.message, lp_result=lp_result, model=model,
+                                  cache=cache_report, **reports)
+
+    if lp_result.success:
+        # Variables de décision binaires: arrondi réparé (aucune contrainte dépassée)
+        if model.extended:
+            repair = robust_repair(lp_result.x, nominal, model, Mi, PD, config)
+        else:
+            repair = repair_selection(lp_result.x, nominal, -nominal.c)
+        return OptimizationResult(Yi=repair.Yi, method='lp', message=lp_result.message,
+                                  lp_result=lp_result, model=model, repair=repair, cache=cache_report,
+                                  warning=warning, **reports)
+
+    Yi = greedy_selection(Mi, ri, PD, config.lgd, config.budget_used, config.risk_tolerance)
+    return OptimizationResult(Yi=Yi, method='heuristique', message=lp_result.message,
+                              lp_result=lp_result, model=model, cache=cache_report, warning=warning, **reports)
+
+
+def emergency_result(portfolio, config, error, model=None):
+    """
+    Emergency selection after a solver error, or the error itself when the
+    scenario does not allow it
+    """
+    if not config.fallback.get('emergency_selection', False):
+        raise error
+    Yi = emergency_selection(portfolio.Mi, portfolio.PD, config.budget_total)
+    return OptimizationResult(Yi=Yi, method='secours', message=str(error), model=model)
+
+
+def optimize(portfolio, config, cache=None):
+    """
+    Solve the allocation problem, falling back to the greedy heuristic when
+    the LP fails and to the emergency selection on solver errors (if the
+    scenario allows it)
+
+    With config.robust enabled the risk row is protected against PD
+    deviations (see robust.py). The relaxed LP solution is rounded by the
+    repair stage (see repair.py), which guarantees a feasible 0/1 selection;
+    with config.partial_funding the decision is the funded fraction and no
+    rounding takes place (see partial_funding.py).
+    With a SolutionCache the solve is skipped or warm-started when the
+    inputs were already solved (see solution_cache.py); config.dual_solver
+    replaces HiGHS by the Lagrangian dual solver (see dual_solver.py) and
+    config.scaling equilibrates the model before the HiGHS solve (see
+    scaling.py).
+
+    Parameters:
+    portfolio: Portfolio - optimizer inputs
+    config: ScenarioConfig
+    cache: SolutionCache or None
+
+    Returns:
+    result: OptimizationResult
+    """
+    model = None
+    try:
+        nominal, model = build_models(portfolio, config)
+        lp_result, cache_report, reports = solve_models(model, portfolio, config, cache)
+        return finish_optimization(lp_result, nominal, model, portfolio, config, cache_report, reports)
+    except Exception as e:
+        return emergency_result(portfolio, config, e, model)
+
+
+def fallback_selection(clients, config):
+    """
+    Quality-score selection used when no client was approved
+
+    Returns:
+    Yi: numpy array of int, or None if the dataset is too small
+    """
+    from .scoring import weighted_sum
+
+    fallback = config.fallback
+    if len(clients) < fallback['min_clients']:
+        return None
+
+    score_qualite = weighted_sum(clients, fallback['terms'])
+    top_clients_indices = score_qualite.nlargest(fallback['count']).index
+    return clients.index.isin(top_clients_indices).astype(int)
@@ -0,0 +1,340 @@
+"""
+Statistical outlier rules from streaming quantile sketches
+
+The fixed thresholds of clean_dataset only catch impossible values. The
+statistical rules flag the values far from the bulk of their column, for
+the whole book and per loan_intent segment:
+
+    IQR: x < Q1 - k × IQR or x > Q3 + k × IQR
+    MAD: |x - médiane| > k × 1.4826 × MAD
+
+The quantiles come from KLL sketches (Karnin, Lang, Liberty 2016): a
+sketch of k items per level keeps the rank error around 1.7/k whatever the
+number of rows and is filled in one pass. The sketches are persisted with
+the fingerprints of the rows already seen, so a daily run only adds the new
+rows of the in-memory extract instead of rescanning the history. Merging
+(OutlierSketches.merge) is only an API for callers that sketch their own
+chunks or partitions: the pipeline computes the bounds once on the whole
+extract, before any partitioning.
+"""
+
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from .incremental import compute_row_fingerprints
+
+SKETCH_VERSION = 1
+
+DEFAULTS = {
+    'method': 'iqr',
+    'k': 3.0,
+    'columns': ['person_income', 'loan_amnt', 'loan_int_rate', 'loan_percent_income'],
+    'segment': 'loan_intent',
+    'min_count': 200,
+    'sketch_k': 200,
+    'store': None
+}
+
+# Segment « tout le portefeuille »
+ALL = '*'
+
+
+def outlier_params(config, **overrides):
+    """
+    Outlier rule parameters of a scenario (config.outliers over DEFAULTS)
+    """
+    params = dict(DEFAULTS)
+    params.update(config.outliers or {})
+    params.update({key: value for key, value in overrides.items() if value is not None})
+    return params
+
+
+class KLLSketch:
+    """
+    Mergeable quantile sketch of a stream of floats
+
+    Level h holds items of weight 2^h; a full level is sorted and every
+    other item (random offset) is promoted to the next level. Capacities
+    shrink geometrically (factor 2/3) from the top level down.
+
+    Parameters:
+    k: int - capacity of the top level (rank error about 1.7/k)
+    seed: int or None - compaction offsets
+    """
+
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (len(self.levels) - level - 1))))
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            while len(self.levels[h]) >= self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                buffer = np.sort(self.levels[h])
+                # Nombre pair d'éléments compactés, l'éventuel dernier reste au niveau h
+                pairs = len(buffer) // 2 * 2
+                promus = buffer[self._rng.integers(2):pairs:2]
+                self.levels[h] = buffer[pairs:]
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promus])
+            h += 1
+
+    def update(self, values):
+        """
+        Add a batch of values (NaN and infinities ignored)
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return self
+        self.n += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        Add the stream summarized by another sketch
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        ordre = np.argsort(items, kind='stable')
+        return items[ordre], weights[ordre]
+
+    def quantiles(self, qs):
+        """
+        Approximate quantiles (numpy array, NaN for an empty sketch)
+        """
+        qs = np.atleast_1d(np.asarray(qs, dtype=np.float64))
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        items, weights = self._weighted()
+        rangs = np.cumsum(weights)
+        idx = np.minimum(np.searchsorted(rangs, qs * rangs[-1], side='left'), len(items) - 1)
+        valeurs = items[idx]
+        valeurs[qs <= 0] = self.min
+        valeurs[qs >= 1] = self.max
+        return valeurs
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+    def mad(self):
+        """
+        Median absolute deviation from the weighted items of the sketch
+        """
+        if self.n == 0:
+            return np.nan
+        items, weights = self._weighted()
+        ecarts = np.abs(items - self.quantile(0.5))
+        ordre = np.argsort(ecarts, kind='stable')
+        rangs = np.cumsum(weights[ordre])
+        return float(ecarts[ordre][np.searchsorted(rangs, 0.5 * rangs[-1])])
+
+    def __len__(self):
+        return sum(len(level) for level in self.levels)
+
+
+class OutlierSketches:
+    """
+    One KLL sketch per column, for the whole book and per segment
+
+    Parameters:
+    columns: list of str - numeric columns sketched
+    segment: str or None - segment column (e.g. loan_intent)
+    k: int - sketch size
+    """
+
+    def __init__(self, columns, segment='loan_intent', k=200):
+        self.columns = list(columns)
+        self.segment = segment
+        self.k = k
+        self.sketches = {}
+
+    def _sketch(self, column, segment):
+        cle = (column, segment)
+        if cle not in self.sketches:
+            self.sketches[cle] = KLLSketch(self.k, seed=len(self.sketches))
+        return self.sketches[cle]
+
+    def update(self, df):
+        """
+        Add the rows of a chunk (one vectorized pass per column and segment)
+        """
+        if not len(df):
+            return self
+        segments = None
+        if self.segment:
+            codes, libelles = pd.factorize(df[self.segment].astype(str))
+            segments = [(libelle, codes == i) for i, libelle in enumerate(libelles)]
+        for col in self.columns:
+            valeurs = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64)
+            self._sketch(col, ALL).update(valeurs)
+            for libelle, masque in segments or []:
+                self._sketch(col, libelle).update(valeurs[masque])
+        return self
+
+    def merge(self, other):
+        """
+        Add the sketches of another chunk or partition
+        """
+        for (col, segment), sketch in other.sketches.items():
+            self._sketch(col, segment).merge(sketch)
+        return self
+
+    @property
+    def rows(self):
+        return max((s.n for (_, segment), s in self.sketches.items() if segment == ALL), default=0)
+
+    def bounds(self, method='iqr', k=3.0, min_count=200):
+        """
+        Accepted range of every column and segment
+
+        Segments with fewer than min_count values take the range of the
+        whole book.
+
+        Returns:
+        bounds: pandas DataFrame indexed by (colonne, segment) with n, Q1,
+                médiane, Q3, MAD, borne_basse, borne_haute
+        """
+        if method not in ('iqr', 'mad'):
+            raise ValueError(f"Méthode de détection inconnue: {method}")
+        lignes = {}
+        for (col, segment), sketch in sorted(self.sketches.items()):
+            q1, mediane, q3 = sketch.quantiles([0.25, 0.5, 0.75])
+            mad = sketch.mad()
+            if method == 'iqr':
+                bas, haut = q1 - k * (q3 - q1), q3 + k * (q3 - q1)
+            else:
+                bas, haut = mediane - k * 1.4826 * mad, mediane + k * 1.4826 * mad
+            lignes[(col, segment)] = {'n': sketch.n, 'Q1': q1, 'mediane': mediane, 'Q3': q3, 'MAD': mad,
+                                      'borne_basse': bas, 'borne_haute': haut}
+        bounds = pd.DataFrame.from_dict(lignes, orient='index')
+        bounds.index = pd.MultiIndex.from_tuples(bounds.index, names=['colonne', 'segment'])
+
+        # Segments trop petits: bornes du portefeuille entier
+        for (col, segment) in bounds.index[bounds['n'] < min_count]:
+            if segment != ALL:
+                bounds.loc[(col, segment), ['borne_basse', 'borne_haute']] = \
+                    bounds.loc[(col, ALL), ['borne_basse', 'borne_haute']].to_numpy()
+        bounds.attrs['segment'] = self.segment
+        return bounds
+
+
+def outlier_mask(df, bounds):
+    """
+    Rows outside the range of their segment for at least one column
+
+    Returns:
+    mask: pandas Series of bool indexed like df
+    counts: dict column -> number of flagged rows
+    """
+    segment = bounds.attrs.get('segment')
+    masque = pd.Series(False, index=df.index)
+    counts = {}
+    for col in bounds.index.get_level_values('colonne').unique():
+        par_col = bounds.xs(col, level='colonne')
+        if segment:
+            # Segment inconnu des esquisses: bornes du portefeuille entier
+            segments = df[segment].astype(str).where(df[segment].astype(str).isin(par_col.index), ALL)
+        else:
+            segments = pd.Series(ALL, index=df.index)
+        bas = par_col['borne_basse'].reindex(segments).to_numpy()
+        haut = par_col['borne_haute'].reindex(segments).to_numpy()
+        valeurs = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64)
+        hors = (valeurs < bas) | (valeurs > haut)
+        counts[col] = int(hors.sum())
+        masque |= hors
+    return masque, counts
+
+
+def sketch_store_path(params, store_dir='cache'):
+    return params['store'] or os.path.join(store_dir, 'outlier_sketches.pkl')
+
+
+def update_sketch_store(raw, params, store_path):
+    """
+    Persisted sketches brought up to date with the rows of an extract
+
+    Only rows whose fingerprint was never seen are added, so the sketches
+    summarize every distinct row ingested so far (rows leaving the extract
+    stay in).
+    A store built with other columns, segment or sketch size is rebuilt.
+
+    Returns:
+    sketches: OutlierSketches
+    report: dict - nouvelles_lignes, lignes_total, duree
+    """
+    debut = time.perf_counter()
+    signature = (tuple(params['columns']), params['segment'], params['sketch_k'], SKETCH_VERSION)
+    store = None
+    if os.path.exists(store_path):
+        with open(store_path, 'rb') as f:
+            store = pickle.load(f)
+        if store.get('signature') != signature:
+            store = None
+    if store is None:
+        store = {'signature': signature, 'fingerprints': np.empty(0, dtype=np.uint64),
+                 'sketches': OutlierSketches(params['columns'], params['segment'], params['sketch_k'])}
+
+    empreintes = compute_row_fingerprints(raw).to_numpy()
+    # Première occurrence de chaque ligne jamais vue (les doublons ne comptent qu'une fois)
+    _, premieres = np.unique(empreintes, return_index=True)
+    nouvelles = np.zeros(len(empreintes), dtype=bool)
+    nouvelles[premieres] = ~np.isin(empreintes[premieres], store['fingerprints'])
+    if nouvelles.any():
+        store['sketches'].update(raw[nouvelles])
+        store['fingerprints'] = np.union1d(store['fingerprints'], empreintes[nouvelles])
+        directory = os.path.dirname(store_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = store_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(store, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, store_path)
+
+    return store['sketches'], {'nouvelles_lignes': int(nouvelles.sum()), 'lignes_total': len(store['fingerprints']),
+                               'duree': time.perf_counter() - debut}
+
+
+def outlier_bounds(raw, config, store_dir='cache', verbose=True):
+    """
+    Outlier bounds of a scenario from the persisted sketches
+
+    Returns:
+    bounds: pandas DataFrame (see OutlierSketches.bounds)
+    report: dict (see update_sketch_store)
+    """
+    params = outlier_params(config)
+    sketches, report = update_sketch_store(raw, params, sketch_store_path(params, store_dir))
+    bounds = sketches.bounds(params['method'], params['k'], params['min_count'])
+    if verbose:
+        print(f"Esquisses de quantiles: {report['nouvelles_lignes']:,} nouvelles lignes, "
+              f"{report['lignes_total']:,} au total ({report['duree']:.2f}s), règle {params['method'].upper()} "
+              f"k={params['k']}")
+    return bounds, report
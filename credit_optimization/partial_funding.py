@@ -0,0 +1,129 @@
+"""
+Partial funding of the requested amounts
+
+The decision of each client becomes the funded fraction xᵢ ∈ [0, 1] of its
+requested amount (montant financé = xᵢ × Mi). Without a minimum ticket the
+allocation model is solved as is and its LP solution is the decision: no
+rounding, every constraint holds exactly.
+
+With a minimum ticket T the fraction is semi-continuous: xᵢ = 0 or
+min(1, T / Mi) ≤ xᵢ ≤ 1 (a client requesting less than T is funded in full
+or not at all). The LP optimum has at most as many fractional clients as
+binding rows; when they all reach their ticket it is kept, otherwise the
+model is solved as a MILP by HiGHS (scipy.optimize.milp).
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import LinearConstraint, milp
+
+DEFAULTS = {
+    'min_ticket': 0,
+    'time_limit': 60,
+    'mip_rel_gap': 1e-4
+}
+
+_TOL = 1e-9
+
+
+def partial_funding_params(config, **overrides):
+    """
+    Partial funding parameters of a scenario (config.partial_funding over DEFAULTS)
+    """
+    params = dict(DEFAULTS)
+    params.update(config.partial_funding or {})
+    params.update({key: value for key, value in overrides.items() if value is not None})
+    return params
+
+
+def _variable_bounds(model):
+    if isinstance(model.bounds, tuple):
+        return np.full(model.n_variables, float(model.bounds[0])), np.full(model.n_variables, float(model.bounds[1]))
+    bounds = np.asarray(model.bounds, dtype=np.float64)
+    return bounds[:, 0].copy(), bounds[:, 1].copy()
+
+
+def solve_semicontinuous(model, Mi, min_ticket, time_limit=60, mip_rel_gap=1e-4):
+    """
+    Solve the model with semi-continuous funded fractions (minimum ticket)
+
+    Parameters:
+    model: AllocationModel - the first model.n_clients variables are the Yi
+    Mi: numpy array - requested amounts
+    min_ticket: float - smallest amount funded for a client
+    time_limit: float - seconds given to HiGHS
+    mip_rel_gap: float - relative optimality gap
+
+    Returns:
+    result: scipy OptimizeResult of milp (x is None when no solution was found)
+    """
+    n = model.n_clients
+    lower, upper = _variable_bounds(model)
+    # Yi = 0 ou Yi ∈ [min(1, T/Mi), 1]
+    lower[:n] = np.minimum(1.0, min_ticket / np.maximum(Mi, _TOL))
+    integrality = np.zeros(model.n_variables)
+    integrality[:n] = 2
+    constraints = LinearConstraint(model.A_ub, -np.inf, model.b_ub)
+    return milp(model.c, constraints=constraints, integrality=integrality, bounds=(lower, upper),
+                options={'time_limit': time_limit, 'mip_rel_gap': mip_rel_gap})
+
+
+def respects_tickets(x, Mi, min_ticket):
+    """
+    True when every funded fraction reaches the minimum ticket
+
+    The LP relaxation of the semi-continuous model is the plain allocation
+    LP, so an LP solution passing this check is optimal for the MILP too.
+    """
+    fractions = funded_fractions(x, len(Mi))
+    finances = fractions > 0
+    return bool((fractions[finances] >= np.minimum(1.0, min_ticket / Mi[finances]) - 1e-7).all())
+
+
+def funded_fractions(x, n_clients):
+    """
+    Funded fraction per client from the solver values (solver noise removed)
+    """
+    fractions = np.clip(np.asarray(x[:n_clients], dtype=np.float64), 0.0, 1.0)
+    fractions[fractions < 1e-7] = 0.0
+    fractions[fractions > 1 - 1e-7] = 1.0
+    return fractions
+
+
+def funding_table(clients):
+    """
+    Financement_Partiel sheet: requested and funded amounts of the funded clients
+    """
+    finances = clients[clients['Yi_optimal'] > 0]
+    table = pd.DataFrame({
+        'loan_intent': finances['loan_intent'],
+        'PD_calibrée': finances['PD_calibrée'],
+        'montant_demande': finances['montant_demande'],
+        'montant_finance': finances['montant_alloue'],
+        'fraction_financee': finances['Yi_optimal']
+    })
+    return table.sort_values('fraction_financee')
+
+
+def funding_summary(Yi, Mi):
+    """
+    Clients funded in full and in part, amounts requested and funded
+    """
+    Yi = np.asarray(Yi, dtype=np.float64)
+    finances = Yi > 0
+    return {
+        'clients_finances': int(finances.sum()),
+        'financement_complet': int((Yi == 1).sum()),
+        'financement_partiel': int((finances & (Yi < 1)).sum()),
+        'montant_demande': float(Mi[finances].sum()),
+        'montant_finance': float((Mi * Yi).sum())
+    }
+
+
+def print_partial_funding(summary, params):
+    ticket = f", ticket minimum {params['min_ticket']:,.0f} euros" if params['min_ticket'] else ''
+    taux = summary['montant_finance'] / summary['montant_demande'] if summary['montant_demande'] else 0.0
+    print(f"Financement partiel{ticket}: {summary['financement_complet']:,} clients financés en totalité, "
+          f"{summary['financement_partiel']:,} en partie")
+    print(f"  {summary['montant_finance']:,.0f} euros financés sur {summary['montant_demande']:,.0f} euros "
+          f"demandés par ces clients ({taux*100:.1f}%)")
@@ -0,0 +1,305 @@
+"""
+Logistic PD model fitted on the observed loan_status
+
+The extract is streamed chunk by chunk (see loader.py), so training never
+holds the whole file in memory:
+
+1. one pass for the mean and standard deviation of each feature;
+2. `epochs` passes of mini-batch stochastic gradient descent on the
+   standardized features (logistic loss with L2 penalty);
+3. one pass over the holdout rows (row-fingerprint hash, so the split is
+   stable across runs and chunk sizes) for Platt calibration and the
+   calibration metrics.
+
+Standardization and calibration are folded into a single weight vector, so
+scoring is PD = σ(X·w + b). Fitted models are cached by the SHA-256 of the
+training file and the training parameters.
+"""
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from .cleaning import clean_dataset
+from .incremental import compute_row_fingerprints
+from .loader import file_fingerprint, iter_chunks
+from .scoring import FEATURE_COLUMNS, encode_features
+
+MODEL_VERSION = 1
+
+DEFAULTS = {
+    'training_data': None,
+    'target': 'loan_status',
+    'chunk_size': 5000,
+    'epochs': 3,
+    'batch_size': 256,
+    'learning_rate': 0.1,
+    'l2': 1e-4,
+    'holdout': 0.2,
+    'seed': 0
+}
+
+# Paramètres qui changent le modèle ajusté (clé du cache)
+_TRAINING_KEYS = ['target', 'chunk_size', 'epochs', 'batch_size', 'learning_rate', 'l2', 'holdout', 'seed']
+
+
+@dataclass
+class LogisticPDModel:
+    """
+    Calibrated logistic PD model: PD = σ(X·weights + intercept)
+
+    weights are expressed on the raw features (standardization and Platt
+    calibration folded in); report holds the training time and metrics.
+    """
+    features: list
+    weights: np.ndarray
+    intercept: float
+    report: dict = field(default_factory=dict)
+
+    def predict(self, df):
+        """
+        PD of every row of an encoded client table (one matrix-vector product)
+        """
+        X = df[self.features].to_numpy(dtype=np.float64)
+        return _sigmoid(X @ self.weights + self.intercept)
+
+    def coefficients(self):
+        """Modele_PD sheet: weight per feature"""
+        return pd.DataFrame({'Coefficient': np.append(self.weights, self.intercept)},
+                            index=pd.Index(self.features + ['constante'], name='Variable'))
+
+
+def pd_model_params(config, **overrides):
+    """
+    PD model parameters of a scenario (config.pd_model over DEFAULTS)
+    """
+    params = dict(DEFAULTS)
+    params.update(config.pd_model or {})
+    params.update({key: value for key, value in overrides.items() if value is not None})
+    return params
+
+
+def _sigmoid(z):
+    return 0.5 * (1.0 + np.tanh(0.5 * z))
+
+
+def _training_chunks(path, params):
+    """
+    Cleaned and encoded chunks as (X, y, holdout mask)
+    """
+    for chunk in iter_chunks(path, params['chunk_size']):
+        # Les règles de nettoyage sont ligne à ligne (doublons: au sein du bloc)
+        chunk_clean, _ = clean_dataset(chunk, verbose=False)
+        df = encode_features(chunk_clean)
+        if df.empty:
+            continue
+        empreintes = compute_row_fingerprints(chunk.loc[df.index]).to_numpy()
+        holdout = (empreintes % np.uint64(1000)).astype(np.int64) < int(params['holdout'] * 1000)
+        yield (df[FEATURE_COLUMNS].to_numpy(dtype=np.float64),
+               df[params['target']].to_numpy(dtype=np.float64), holdout)
+
+
+def _feature_moments(path, params):
+    n, somme, somme_carres = 0, 0.0, 0.0
+    for X, _, holdout in _training_chunks(path, params):
+        X = X[~holdout]
+        n += len(X)
+        somme = somme + X.sum(axis=0)
+        somme_carres = somme_carres + (X ** 2).sum(axis=0)
+    if n == 0:
+        raise ValueError("Aucune ligne d'apprentissage après nettoyage")
+    mean = somme / n
+    scale = np.sqrt(np.maximum(somme_carres / n - mean ** 2, 0.0))
+    scale[scale == 0] = 1.0
+    return n, mean, scale
+
+
+def _platt(z, y, iterations=50):
+    """
+    Platt scaling: a, b maximizing the likelihood of σ(a·z + b) (Newton)
+    """
+    a, b = 1.0, 0.0
+    for _ in range(iterations):
+        p = _sigmoid(a * z + b)
+        w = np.maximum(p * (1 - p), 1e-12)
+        g = np.array([((p - y) * z).sum(), (p - y).sum()])
+        H = np.array([[(w * z * z).sum(), (w * z).sum()], [(w * z).sum(), w.sum()]]) + 1e-9 * np.eye(2)
+        pas = np.linalg.solve(H, g)
+        a, b = a - pas[0], b - pas[1]
+        if np.abs(pas).max() < 1e-10:
+            break
+    return a, b
+
+
+def auc_score(y, p):
+    """
+    Area under the ROC curve (Mann-Whitney, ties counted half)
+    """
+    rangs = pd.Series(p).rank().to_numpy()
+    positifs = y == 1
+    n_pos, n_neg = positifs.sum(), (~positifs).sum()
+    if n_pos == 0 or n_neg == 0:
+        return float('nan')
+    return float((rangs[positifs].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg))
+
+
+def calibration_metrics(y, p):
+    """
+    AUC, Brier score, log loss and mean PD against the observed default rate
+    """
+    p_bornee = np.clip(p, 1e-12, 1 - 1e-12)
+    return {
+        'auc': auc_score(y, p),
+        'brier': float(((p - y) ** 2).mean()),
+        'log_loss': float(-(y * np.log(p_bornee) + (1 - y) * np.log(1 - p_bornee)).mean()),
+        'pd_moyenne': float(p.mean()),
+        'taux_defaut_observe': float(y.mean())
+    }
+
+
+def train_pd_model(path, params, verbose=True):
+    """
+    Fit a calibrated logistic PD model by streaming over an extract
+
+    Parameters:
+    path: str - .xlsx or .csv extract with the target column
+    params: dict - see DEFAULTS
+    verbose: bool - one line per pass
+
+    Returns:
+    model: LogisticPDModel
+    """
+    log = print if verbose else (lambda *args, **kwargs: None)
+    debut = time.perf_counter()
+    rng = np.random.RandomState(params['seed'])
+
+    n_train, mean, scale = _feature_moments(path, params)
+    log(f"  Standardisation: {n_train:,} lignes d'apprentissage")
+
+    d = len(FEATURE_COLUMNS)
+    w, b = np.zeros(d), 0.0
+    lr, l2, taille = params['learning_rate'], params['l2'], params['batch_size']
+    etape = 0
+    for epoch in range(params['epochs']):
+        perte, n = 0.0, 0
+        for X, y, holdout in _training_chunks(path, params):
+            X, y = (X[~holdout] - mean) / scale, y[~holdout]
+            ordre = rng.permutation(len(X))
+            for debut_lot in range(0, len(X), taille):
+                lot = ordre[debut_lot:debut_lot + taille]
+                p = _sigmoid(X[lot] @ w + b)
+                erreur = p - y[lot]
+                # Pas décroissant en 1/sqrt(t)
+                pas = lr / np.sqrt(1.0 + etape / 100.0)
+                w -= pas * (X[lot].T @ erreur / len(lot) + l2 * w)
+                b -= pas * erreur.mean()
+                perte -= (y[lot] * np.log(np.maximum(p, 1e-12)) + (1 - y[lot]) * np.log(np.maximum(1 - p, 1e-12))).sum()
+                n += len(lot)
+                etape += 1
+        log(f"  Époque {epoch + 1}/{params['epochs']}: log loss {perte / max(n, 1):.4f}")
+
+    # Calibration de Platt et métriques sur l'échantillon de validation
+    z, y_val = [], []
+    for X, y, holdout in _training_chunks(path, params):
+        z.append(((X[holdout] - mean) / scale) @ w + b)
+        y_val.append(y[holdout])
+    z, y_val = np.concatenate(z), np.concatenate(y_val)
+    a, c = _platt(z, y_val)
+
+    # σ(a·((X - μ)/s·w + b) + c) = σ(X·w' + b')
+    weights = a * w / scale
+    intercept = float(a * (b - (mean / scale) @ w) + c)
+
+    report = {
+        'lignes_apprentissage': int(n_train),
+        'lignes_validation': int(len(y_val)),
+        'epoques': params['epochs'],
+        'duree_apprentissage': time.perf_counter() - debut,
+        'platt_a': float(a),
+        'platt_b': float(c),
+        'avant_calibration': calibration_metrics(y_val, _sigmoid(z)),
+        'apres_calibration': calibration_metrics(y_val, _sigmoid(a * z + c))
+    }
+    return LogisticPDModel(features=list(FEATURE_COLUMNS), weights=weights, intercept=intercept, report=report)
+
+
+def model_cache_key(path, params):
+    """
+    Hash of the training data content and of the training parameters
+    """
+    payload = json.dumps({
+        'version': MODEL_VERSION,
+        'data': file_fingerprint(path),
+        'features': FEATURE_COLUMNS,
+        'params': {key: params[key] for key in _TRAINING_KEYS}
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def save_pd_model(model, path):
+    np.savez(path, weights=model.weights, intercept=model.intercept,
+             features=np.array(model.features), report=json.dumps(model.report))
+    return path
+
+
+def load_pd_model(path):
+    with np.load(path, allow_pickle=False) as data:
+        return LogisticPDModel(
+            features=[str(f) for f in data['features']], weights=data['weights'],
+            intercept=float(data['intercept']), report=json.loads(str(data['report']))
+        )
+
+
+def fit_pd_model(path, params, cache_dir='cache', verbose=True):
+    """
+    Fitted PD model of an extract, from the cache when the data is unchanged
+
+    Returns:
+    model: LogisticPDModel (report['cache'] tells whether it was reused)
+    """
+    cache_path = os.path.join(cache_dir, f'pd_model_{model_cache_key(path, params)}.npz')
+    if os.path.exists(cache_path):
+        model = load_pd_model(cache_path)
+        model.report['cache'] = True
+        if verbose:
+            print(f"  Modèle PD repris du cache ({os.path.basename(cache_path)})")
+        return model
+
+    model = train_pd_model(path, params, verbose)
+    os.makedirs(cache_dir, exist_ok=True)
+    save_pd_model(model, cache_path)
+    model.report['cache'] = False
+    return model
+
+
+def metrics_table(model):
+    """
+    Modele_PD_Metriques sheet: training time and calibration metrics
+    """
+    report = model.report
+    table = pd.DataFrame({
+        'Avant_Calibration': report['avant_calibration'],
+        'Apres_Calibration': report['apres_calibration']
+    })
+    table.index.name = 'Metrique'
+    infos = pd.DataFrame({
+        'Avant_Calibration': [report['lignes_apprentissage'], report['lignes_validation'],
+                              report['duree_apprentissage']],
+        'Apres_Calibration': [np.nan, np.nan, np.nan]
+    }, index=pd.Index(['lignes_apprentissage', 'lignes_validation', 'duree_apprentissage'], name='Metrique'))
+    return pd.concat([table, infos])
+
+
+def print_pd_model(model):
+    report = model.report
+    avant, apres = report['avant_calibration'], report['apres_calibration']
+    origine = 'cache' if report.get('cache') else f"{report['duree_apprentissage']:.1f}s"
+    print(f"Modèle PD logistique ({report['lignes_apprentissage']:,} lignes d'apprentissage, {origine})")
+    print(f"AUC validation: {apres['auc']:.3f}")
+    print(f"Brier: {avant['brier']:.4f} -> {apres['brier']:.4f} après calibration")
+    print(f"PD moyenne: {apres['pd_moyenne']*100:.2f}% vs défaut observé {apres['taux_defaut_observe']*100:.2f}%")
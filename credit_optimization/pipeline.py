@@ -0,0 +1,694 @@
+"""
+Scenario pipeline: load, clean, score, optimize and export
+
+Every stage is a plain function without side effects on the caller's data;
+errors are raised as PipelineError instead of terminating the interpreter,
+so the pipeline can be driven in-process by a scheduler or an orchestrator.
+"""
+
+import hashlib
+import os
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from .cleaning import clean_dataset
+from .compliance import evaluate_compliance, print_compliance
+from .dashboard import dashboard_payload, start_dashboard_rendering
+from .decisions import DECISION_COLUMNS, decision_store_path, write_decision_store
+from .dual_solver import print_dual_report
+from .ensemble import ensemble_params, run_ensemble, print_ensemble, save_ensemble, summary_table
+from .export import results_table, write_results, write_analysis_workbook
+from .incremental import incremental_update, fingerprint_noise
+from .mps import model_export_params, run_metadata, save_model
+from .multiperiod import multiperiod_params, optimize_multiperiod, print_multiperiod
+from .metrics import compute_portfolio_metrics, category_analysis_table
+from .optimizer import optimize, fallback_selection
+from .outliers import outlier_bounds
+from .partial_funding import partial_funding_params, funding_summary, funding_table, print_partial_funding
+from .partitioned import prepare_partitioned
+from .portfolio import Portfolio
+from .pd_model import pd_model_params, fit_pd_model, metrics_table, print_pd_model
+from .repair import print_repair
+from .robust import robust_params, pd_deviations, protection_level, robust_report, print_robust_report
+from .scaling import print_scaling_report
+from .scoring import score_clients, prepare_optimizer_inputs
+from .solution_cache import open_solution_cache
+from .sensitivity import sensitivity_report, print_sensitivity
+from .stress import print_stress, run_stress, stress_params
+
+# À changer dès que les règles de nettoyage évoluent (invalide les stores incrémentaux)
+CLEANING_VERSION = 'v1'
+
+_DATASET_CACHE = {}
+
+
+class PipelineError(Exception):
+    """Raised when a scenario cannot be completed"""
+
+
+def _silent(*args, **kwargs):
+    pass
+
+
+@dataclass
+class ScenarioResult:
+    """
+    Everything computed for one scenario (picklable)
+
+    clients holds the solvent clients with the optimizer inputs, the decision
+    (Yi_optimal / credit_alloue) and the per-client metrics; portfolio holds
+    the arrays the optimizer was given (Mi, ri, PD and codes below).
+    """
+    config: object
+    clients: pd.DataFrame
+    portfolio: Portfolio
+    optimization: object
+    metrics: dict
+    analysis: object
+    compliance: dict
+    ingestion: dict = None
+    sensitivity: dict = None
+    robust: dict = None
+    multiperiod: object = None
+    ensemble: object = None
+    pd_model: object = None
+    stress: object = None
+    timings: dict = field(default_factory=dict)
+    outputs: dict = None
+    stages: dict = None
+
+    @property
+    def statut(self):
+        return self.compliance['statut']
+
+    @property
+    def Mi(self):
+        return self.portfolio.Mi
+
+    @property
+    def ri(self):
+        return self.portfolio.ri
+
+    @property
+    def PD(self):
+        return self.portfolio.PD
+
+    @property
+    def codes(self):
+        return self.portfolio.codes
+
+
+def load_dataset(path, use_cache=True):
+    """
+    Read a raw extract, reusing the parsed frame while the file is unchanged
+
+    Parameters:
+    path: str - .xlsx or .csv extract
+    use_cache: bool - keep the parsed frame in memory for later calls
+
+    Returns:
+    df: pandas DataFrame - shared by every caller, must not be modified
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if use_cache and key in _DATASET_CACHE:
+        return _DATASET_CACHE[key]
+
+    if path.lower().endswith('.csv'):
+        df = pd.read_csv(path)
+    else:
+        df = pd.read_excel(path)
+
+    if use_cache:
+        # Une seule version par fichier
+        for cached in [k for k in _DATASET_CACHE if k[0] == key[0]]:
+            del _DATASET_CACHE[cached]
+        _DATASET_CACHE[key] = df
+    return df
+
+
+def clear_dataset_cache():
+    _DATASET_CACHE.clear()
+
+
+def _cleaning_label(config):
+    return config.title.replace(' : ', ' - ')
+
+
+def incremental_store_path(config, store_dir='cache'):
+    return os.path.join(store_dir, f'{config.id}_incremental.pkl')
+
+
+def clean_clients(raw, config, store_dir='cache', verbose=True):
+    """
+    Clean a raw extract with the rules of a scenario (statistical outlier
+    bounds included when config.outliers is enabled)
+    """
+    bounds = None
+    if config.outliers and config.outliers.get('enabled'):
+        bounds, _ = outlier_bounds(raw, config, store_dir, verbose)
+    df_clean, _ = clean_dataset(raw, _cleaning_label(config), verbose=verbose, outlier_bounds=bounds)
+    return df_clean
+
+
+def prepare_clients(raw, config, incremental=False, store_dir='cache', verbose=True, pd_model=None,
+                    partitions=None, executor=None):
+    """
+    Clean and score a raw extract
+
+    Parameters:
+    raw: pandas DataFrame - raw extract
+    config: ScenarioConfig
+    incremental: bool - only clean and score rows that changed since the
+                 last run (store in store_dir)
+    verbose: bool - print the cleaning and ingestion reports
+    pd_model: LogisticPDModel or None - fitted PD model (see pd_model.py)
+    partitions: int or None - clean and score by partitions on worker
+                processes (see partitioned.py)
+    executor: executor of the partitions or None (local process pool)
+
+    Returns:
+    df: pandas DataFrame - cleaned and scored clients (all, solvent or not)
+    ingestion_report: dict or None
+    """
+    scoring = config.scoring
+
+    if partitions and incremental:
+        raise ValueError("Les modes incrémental et partitionné ne se combinent pas")
+    if not partitions and not incremental:
+        # Même nettoyage que l'étape 'clean' du graphe d'étapes
+        return score_clients(clean_clients(raw, config, store_dir, verbose), config, pd_model=pd_model), None
+
+    # Bornes statistiques calculées sur tout l'extrait, avant tout découpage
+    bounds = None
+    if config.outliers and config.outliers.get('enabled'):
+        bounds, _ = outlier_bounds(raw, config, store_dir, verbose)
+
+    if partitions:
+        df, _ = prepare_partitioned(raw, config, partitions, executor, pd_model, verbose, outlier_bounds=bounds)
+        return df, None
+
+    # Bruit stable dérivé de l'empreinte de chaque ligne
+    noise_seed = scoring.get('noise_seed')
+    if noise_seed is None:
+        noise_seed = config.intents.get('seed', 0)
+
+    def preparer_delta(df_delta, empreintes):
+        df_clean, _ = clean_dataset(df_delta, _cleaning_label(config), verbose=verbose, outlier_bounds=bounds)
+        return score_clients(
+            df_clean, config,
+            noise=lambda df: fingerprint_noise(empreintes.loc[df.index].values, scoring['noise_std'], seed=noise_seed),
+            pd_model=pd_model
+        )
+
+    signature = f"{config.id}/{CLEANING_VERSION}/{config.fingerprint('scoring')}"
+    if bounds is not None:
+        # Règles statistiques modifiées: lignes nettoyées à nouveau (les bornes d'un jour à
+        # l'autre ne s'appliquent qu'aux lignes nouvelles)
+        signature += '/' + config.fingerprint('outliers')
+    if pd_model is not None:
+        # Un nouveau modèle PD invalide les lignes déjà scorées
+        signature += '/' + hashlib.sha256(np.append(pd_model.weights, pd_model.intercept).tobytes()).hexdigest()[:16]
+    return incremental_update(
+        raw, preparer_delta, incremental_store_path(config, store_dir), signature,
+        scenario_name=_cleaning_label(config), verbose=verbose
+    )
+
+
+def apply_selection(clients, Yi, portfolio, config):
+    """
+    Metrics of the selection Yi, reported on the clients table (in place)
+    """
+    metrics = compute_portfolio_metrics(Yi, portfolio, config.lgd, config.allocation)
+    # Décision et métriques par client ajoutées en un seul bloc
+    colonnes = {'Yi_optimal': Yi, 'credit_alloue': (np.asarray(Yi) > 0).astype(int), **metrics['clients']}
+    clients[list(colonnes)] = pd.DataFrame(colonnes, index=clients.index)
+    return metrics
+
+
+def _print_solution(log, result, metrics, N, config):
+    if result.warning:
+        log(f"Attention: {result.warning}")
+    if result.method in ('lp', 'milp'):
+        log(f"Clients sélectionnés: {metrics['clients_selectionnes']:,} / {N:,}")
+        log(f"Montant alloué: {metrics['montant_total_alloue']:,.0f} euros")
+        log(f"Utilisation budget: {(metrics['montant_total_alloue']/config.budget_used)*100:.1f}% du budget alloué")
+        log(f"Utilisation budget total: {(metrics['montant_total_alloue']/config.budget_total)*100:.1f}% du budget total")
+        log(f"Revenus totaux: {metrics['revenus_totaux']:,.0f} euros")
+        log(f"Pertes attendues: {metrics['pertes_attendues']:,.0f} euros")
+        log(f"Profit net: {metrics['profit_net']:,.0f} euros")
+        log(f"Risque moyen: {metrics['risque_moyen']*100:.2f}%")
+        if metrics['montant_total_alloue'] > 0:
+            log(f"ROI net: {metrics['roi_net']*100:.2f}%")
+
+        # Vérifier les allocations par catégorie
+        log("\nVérification des allocations par catégorie:")
+        for categorie, ligne in metrics['par_categorie'].iterrows():
+            log(f"  {categorie}: {ligne['Part_Reelle']*100:.1f}% (cible: {ligne['Part_Cible']*100:.0f}%)")
+
+    elif result.method == 'heuristique':
+        log("Échec de l'optimisation:", result.message)
+        log("Application d'une approche heuristique...")
+        log(f"Solution heuristique: {metrics['clients_selectionnes']:,} clients")
+        log(f"Montant alloué: {metrics['montant_total_alloue']:,.0f} euros")
+        log(f"Profit net: {metrics['profit_net']:,.0f} euros")
+        log(f"Risque: {metrics['risque_moyen']*100:.2f}%")
+
+    else:
+        log(f"Erreur lors de l'optimisation: {result.message}")
+        log(f"Sélection de secours: {metrics['clients_selectionnes']:,} clients")
+
+
+def scenario_pd_model(config, store_dir='cache', verbose=True, data=None):
+    """
+    PD model of a scenario fitted on loan_status (None unless config.pd_model is enabled)
+
+    The model is trained on pd_model.training_data, else on the extract
+    being scored (data, the --data path, or config.dataset).
+    """
+    if not (config.pd_model and config.pd_model.get('enabled')):
+        return None
+    params = pd_model_params(config)
+    if verbose:
+        print("Modèle PD logistique sur loan_status:")
+    try:
+        pd_model = fit_pd_model(params['training_data'] or data or config.dataset, params, store_dir, verbose)
+    except Exception as e:
+        raise PipelineError(f"Erreur lors de l'apprentissage du modèle PD: {e}") from e
+    if verbose:
+        print_pd_model(pd_model)
+        scoring = config.scoring
+        if scoring.get('adjustment_base', 0.0) or scoring['adjustment_terms']:
+            print(f"  Ajustements du scénario ajoutés à la PD du modèle (base {scoring.get('adjustment_base', 0.0):+g}, "
+                  f"{len(scoring['adjustment_terms'])} termes, × pd_scale {scoring.get('pd_scale', 1.0):g})")
+    return pd_model
+
+
+def optimizer_inputs(df, config, verbose=True):
+    """
+    Solvent clients of a scored table with the optimizer inputs
+
+    Returns:
+    clients: pandas DataFrame
+    portfolio: Portfolio
+    """
+    log = print if verbose else _silent
+
+    # Filtrer les clients solvables
+    clients = df[df['Yi'] == 1]
+    log(f"Clients solvables: {len(clients):,}")
+
+    log(f"Budget total: {config.budget_total:,} euros")
+    log(f"Budget utilisé ({config.strategy.lower()}): {config.budget_used:,} euros ({config.budget_fraction*100:.0f}%)")
+    log(f"Risque max: {config.risk_tolerance*100}%, LGD: {config.lgd*100}%")
+
+    clients = prepare_optimizer_inputs(clients, config)
+    log(f"Données préparées: {len(clients)} clients")
+    if len(clients) > 0:
+        log(f"Montant moyen demandé: {clients['montant_demande'].mean():,.0f} euros")
+        log(f"Taux de rendement moyen: {clients['taux_rendement'].mean()*100:.2f}%")
+
+    # Préparer les données pour l'optimisation
+    return clients, Portfolio.from_clients(clients, config.categories)
+
+
+def compute_scenario(config, raw=None, incremental=False, store_dir='cache', verbose=True,
+                     partitions=None, executor=None, data=None):
+    """
+    Run the compute stages of a scenario (no file is written)
+
+    Parameters:
+    config: ScenarioConfig
+    raw: pandas DataFrame or None - raw extract; loaded from config.dataset if None
+    incremental: bool - incremental cleaning and scoring
+    store_dir: str - directory of the incremental stores
+    verbose: bool - print the progress reports
+    partitions: int or None - partitioned cleaning and scoring
+    executor: executor of the partitions or None
+    data: str or None - path of the extract when it is not config.dataset
+          (--data); raw is read from it if None, and the PD model is
+          trained on it unless pd_model.training_data is set
+
+    Returns:
+    result: ScenarioResult
+    """
+    log = print if verbose else _silent
+    timings = {}
+
+    log(config.title)
+    log("Chargement et nettoyage des données...")
+
+    # PD estimée sur loan_status (apprentissage par blocs, modèle en cache)
+    start = time.perf_counter()
+    pd_model = scenario_pd_model(config, store_dir, verbose, data)
+    if pd_model is not None:
+        timings['modele_pd'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        if raw is None:
+            raw = load_dataset(data or config.dataset)
+        log(f"Dataset original: {raw.shape[0]} clients")
+
+        df, ingestion = prepare_clients(raw, config, incremental, store_dir, verbose, pd_model, partitions, executor)
+    except Exception as e:
+        raise PipelineError(f"Erreur: {e}") from e
+    timings['preparation'] = time.perf_counter() - start
+
+    clients, portfolio = optimizer_inputs(df, config, verbose)
+
+    start = time.perf_counter()
+    try:
+        cache = None
+        if config.solution_cache and config.solution_cache.get('enabled'):
+            cache = open_solution_cache(config, store_dir)
+        optimization = optimize(portfolio, config, cache=cache)
+    except Exception as e:
+        raise PipelineError(f"Erreur lors de l'optimisation: {e}") from e
+    timings['optimisation'] = time.perf_counter() - start
+
+    return analyse_scenario(config, df, clients, portfolio, optimization, timings, ingestion, pd_model, verbose)
+
+
+def analyse_scenario(config, df, clients, portfolio, optimization, timings=None, ingestion=None, pd_model=None,
+                     verbose=True):
+    """
+    Analysis stages of a solved scenario: metrics, fallback selection,
+    robustness, sensitivity, compliance, multi-period plan, ensemble and
+    stress tests
+
+    Parameters:
+    df: pandas DataFrame - scored clients (all, solvent or not)
+    clients, portfolio: see optimizer_inputs (clients is modified in place)
+    optimization: OptimizationResult
+    timings: dict or None - durations already measured (completed in place)
+
+    Returns:
+    result: ScenarioResult
+    """
+    log = print if verbose else _silent
+    timings = {} if timings is None else timings
+    N = len(clients)
+    Mi, ri, PD = portfolio.Mi, portfolio.ri, portfolio.PD
+
+    if optimization.cache is not None:
+        rapport = optimization.cache
+        if rapport['statut'] == 'hit':
+            log(f"Solution reprise du cache en {rapport['duree']*1000:.0f} ms")
+            metriques = rapport.get('metriques') or {}
+            if 'montant_total_alloue' in metriques:
+                log(f"  Solution relâchée en cache: {metriques['montant_total_alloue']:,.0f} euros, profit net "
+                    f"{metriques['profit_net']:,.0f} euros, risque moyen {metriques['risque_moyen']*100:.2f}%")
+        elif rapport['statut'] == 'warm':
+            log(f"Démarrage à chaud depuis le cache: {rapport['variables_libres']:,} variables libres sur "
+                f"{rapport['variables']:,} ({rapport['tours']} tours, {rapport['duree']:.2f}s)")
+
+    start = time.perf_counter()
+    metrics = apply_selection(clients, optimization.Yi, portfolio, config)
+    _print_solution(log, optimization, metrics, N, config)
+    if verbose and optimization.dual is not None:
+        print_dual_report(optimization.dual)
+    if verbose and optimization.scaling is not None:
+        print_scaling_report(optimization.scaling)
+    if verbose and optimization.repair is not None:
+        print_repair(optimization.repair)
+    if verbose and config.partial_funding and config.partial_funding.get('enabled'):
+        print_partial_funding(funding_summary(optimization.Yi, Mi), partial_funding_params(config))
+
+    if metrics['clients_selectionnes'] == 0:
+        log("Aucun client approuvé - application de critères de secours")
+        Yi_secours = fallback_selection(clients, config)
+        if Yi_secours is None:
+            raise PipelineError("Dataset trop petit pour générer un résultat")
+        metrics = apply_selection(clients, Yi_secours, portfolio, config)
+        optimization.Yi = Yi_secours
+        optimization.method = 'secours'
+        log(f"Sélection de secours: {metrics['clients_selectionnes']} clients")
+
+    # Protection du portefeuille contre les déviations de PD
+    robust = None
+    if config.robust and config.robust.get('enabled'):
+        params = robust_params(config)
+        robust = robust_report(optimization.Yi, Mi, PD, pd_deviations(PD, config, params),
+                               protection_level(N, params), config)
+        if verbose:
+            print_robust_report(robust)
+
+    # Sensibilité issue des variables duales du solveur (sans nouvelle résolution)
+    sensitivity = None
+    if optimization.method == 'lp' and not optimization.model.extended:
+        sensitivity = sensitivity_report(optimization.model, optimization.lp_result, config)
+        clients['cout_reduit'] = sensitivity['couts_reduits']
+        if verbose:
+            print_sensitivity(sensitivity)
+
+    # Analyse des résultats par objectif de prêt
+    analysis = None
+    if metrics['clients_selectionnes'] > 0:
+        analysis = category_analysis_table(metrics)
+
+        log("\nAnalyse par objectif de prêt:")
+        log(analysis)
+
+        # Calcul des pourcentages réels vs stratégie
+        log(f"\nComparaison Stratégie vs Réalisation:")
+        for objectif, ligne in analysis.iterrows():
+            log(f"• {objectif}: Cible {ligne['Part_Cible']*100:.0f}% vs Réel {ligne['Part_Reelle']*100:.1f}%")
+
+    compliance = evaluate_compliance(clients, metrics, config)
+    timings['analyse'] = time.perf_counter() - start
+
+    # Plan multi-périodes avec recyclage du capital (en plus de l'allocation mono-période)
+    multiperiod = None
+    if config.multiperiod and config.multiperiod.get('enabled'):
+        start = time.perf_counter()
+        params = multiperiod_params(config)
+        log(f"\nAllocation multi-périodes ({params['periods']} périodes, "
+            f"{'fenêtre glissante de ' + str(params['window']) if params['window'] else 'horizon complet'}):")
+        multiperiod = optimize_multiperiod(Mi, ri, PD, portfolio.codes, config.categories, config, params, verbose)
+        clients['periode_financement'] = multiperiod.periode
+        if verbose:
+            print_multiperiod(multiperiod)
+        timings['multi_periodes'] = time.perf_counter() - start
+
+    # Stabilité de la sélection face au bruit de calibration des PD
+    ensemble = None
+    if config.ensemble and config.ensemble.get('enabled'):
+        start = time.perf_counter()
+        params = ensemble_params(config)
+        log(f"\nStabilité de la sélection ({params['size']} réalisations du bruit des PD):")
+        ensemble = run_ensemble(df, config, params, verbose, nominal=clients)
+        clients['frequence_selection'] = ensemble.frequency_series().reindex(clients.index).fillna(0.0).values
+        if verbose:
+            print_ensemble(ensemble, clients.loc[clients['credit_alloue'] == 1, 'frequence_selection'].values)
+        timings['ensemble'] = time.perf_counter() - start
+
+    # Tests de résistance du portefeuille retenu (PD choquées, sans nouvelle résolution)
+    stress = None
+    if config.stress and config.stress.get('enabled'):
+        log("")
+        stress, timings['stress'] = run_stress(optimization.Yi, portfolio, config, stress_params(config))
+        if verbose:
+            print_stress(stress, timings['stress'])
+
+    return ScenarioResult(
+        config=config, clients=clients, portfolio=portfolio,
+        optimization=optimization, metrics=metrics, analysis=analysis,
+        compliance=compliance, ingestion=ingestion, sensitivity=sensitivity, robust=robust, multiperiod=multiperiod,
+        ensemble=ensemble, pd_model=pd_model, stress=stress, timings=timings
+    )
+
+
+def dashboard_job(result, output_dir='.'):
+    """
+    Arguments of render_dashboard for a scenario (None: nothing to draw)
+
+    Returns:
+    (args, kwargs) or None
+    """
+    config = result.config
+    if result.analysis is None:
+        return None
+    payload = dashboard_payload(result.clients['Yi_optimal'].values, result.Mi, result.ri, result.PD,
+                                result.metrics, config.categories, config.lgd, config.risk_tolerance,
+                                config.epsilon, config.budget_used)
+    args = (payload, os.path.join(output_dir, config.output['results_dir']), config.output['pie_chart'])
+    return args, {'title': config.output.get('chart_title', '')}
+
+
+def start_outputs_rendering(result, output_dir='.'):
+    """
+    Start the dashboard rendering of a scenario in a background worker
+
+    Returns:
+    future or None (nothing to draw)
+    """
+    job = dashboard_job(result, output_dir)
+    if job is None:
+        return None
+    args, kwargs = job
+    return start_dashboard_rendering(*args, **kwargs)
+
+
+def export_results(result, output_dir='.', verbose=True):
+    """
+    Write the results file and the analysis workbook of a scenario
+
+    Returns:
+    files: dict - 'results' and 'analysis' paths
+    """
+    log = print if verbose else _silent
+    config = result.config
+    output = config.output
+    clients = result.clients
+    metrics = result.metrics
+
+    results_dir = os.path.join(output_dir, output['results_dir'])
+    os.makedirs(results_dir, exist_ok=True)
+
+    resultats = results_table(clients, config)
+    log(f"Clients approuvés: {len(resultats)} sur {len(clients)}")
+
+    output_filename = write_results(resultats, os.path.join(output_dir, output['results_file']))
+    log(f"Résultats exportés vers: {output_filename}")
+    log(f"Format: {len(resultats)} clients approuvés")
+
+    # Statistiques finales
+    taux_approbation = (len(resultats) / len(clients)) * 100 if len(clients) > 0 else 0
+    log(f"\nRésultats finaux:")
+    log(f"Clients analysés: {len(clients):,}")
+    log(f"Clients approuvés: {len(resultats):,}")
+    log(f"Taux d'approbation: {taux_approbation:.1f}%")
+    log(f"Montant alloué: {metrics['montant_total_alloue']:,.0f} euros")
+    log(f"Budget utilisé: {(metrics['montant_total_alloue']/config.budget_used)*100:.1f}%")
+    log(f"Budget total utilisé: {(metrics['montant_total_alloue']/config.budget_total)*100:.1f}%")
+    log(f"ROI estimé: {metrics['roi_brut']*100:.2f}%")
+
+    extra_sheets = {}
+    if result.sensitivity is not None:
+        extra_sheets['Sensibilite'] = (result.sensitivity['contraintes'], True)
+        extra_sheets['Sensibilite_Parametres'] = (result.sensitivity['parametres'], True)
+    if result.optimization.repair is not None:
+        extra_sheets['Certificat_Faisabilite'] = (result.optimization.repair.certificate, True)
+    if config.partial_funding and config.partial_funding.get('enabled'):
+        extra_sheets['Financement_Partiel'] = (funding_table(clients), False)
+    if result.multiperiod is not None:
+        extra_sheets['Plan_Multi_Periodes'] = (result.multiperiod.plan, True)
+        extra_sheets['Certificat_Multi_Periodes'] = (result.multiperiod.certificate, True)
+    if result.stress is not None:
+        extra_sheets['Stress_Tests'] = (result.stress, True)
+    if result.pd_model is not None:
+        extra_sheets['Modele_PD'] = (result.pd_model.coefficients(), True)
+        extra_sheets['Modele_PD_Metriques'] = (metrics_table(result.pd_model), True)
+    files = {}
+    files['decisions'] = write_decision_store(
+        decision_store_path(config, results_dir), clients.index.values,
+        {colonne: clients['credit_alloue' if colonne == 'Yi' else colonne].values for colonne in DECISION_COLUMNS},
+        metadata={
+            'scenario': config.id, 'title': config.title, 'config_fingerprint': config.fingerprint(),
+            'dataset': config.dataset, 'method': result.optimization.method, 'statut': result.statut,
+            'clients_selectionnes': metrics['clients_selectionnes'], 'montant_total_alloue': metrics['montant_total_alloue']
+        }
+    )
+    log(f"Décisions par client exportées vers '{files['decisions']}'")
+    if config.model_export and config.model_export.get('enabled') and result.optimization.model is not None:
+        models_dir = model_export_params(config)['directory'] or os.path.join(results_dir, 'models')
+        os.makedirs(models_dir, exist_ok=True)
+        files['model'], _ = save_model(
+            result.optimization.model, os.path.join(models_dir, config.id),
+            run_metadata(result.optimization, config, result.timings.get('optimisation'))
+        )
+        log(f"Modèle d'allocation exporté vers '{files['model']}'")
+    if result.ensemble is not None:
+        extra_sheets['Stabilite'] = (summary_table(result.ensemble), False)
+        extra_sheets['Stabilite_Realisations'] = (result.ensemble.realisations, True)
+        files['ensemble'] = save_ensemble(result.ensemble, os.path.join(results_dir, f'{config.id}_ensemble.npz'))
+        log(f"Décisions de l'ensemble sauvegardées dans '{files['ensemble']}'")
+
+    analysis_path = write_analysis_workbook(
+        os.path.join(results_dir, output['analysis_file']), resultats, clients, result.analysis, config,
+        extra_sheets
+    )
+    log(f"Analyse complète exportée vers '{analysis_path}'")
+
+    return {'results': output_filename, 'analysis': analysis_path, **files}
+
+
+def write_outputs(result, output_dir='.', verbose=True):
+    """
+    Export a scenario and render its dashboard (rendering overlaps the export)
+
+    Returns:
+    outputs: dict - written files and the dashboard rendering report
+    """
+    log = print if verbose else _silent
+    start = time.perf_counter()
+
+    rendu_graphiques = None
+    try:
+        rendu_graphiques = start_outputs_rendering(result, output_dir)
+        if rendu_graphiques is not None:
+            log("Génération des visualisations lancée en arrière-plan")
+    except Exception as e:
+        log(f"Erreur lors de la génération des graphiques: {e}")
+
+    log("\nExport des résultats")
+    outputs = export_results(result, output_dir, verbose)
+
+    # Attendre la fin du rendu des graphiques
+    outputs['dashboard'] = None
+    if rendu_graphiques is not None:
+        try:
+            rapport_rendu = rendu_graphiques.result()
+            outputs['dashboard'] = rapport_rendu
+            log(f"\nVisualisations sauvegardées: {len(rapport_rendu['files'])} fichiers "
+                f"(rendu en {rapport_rendu['duration']:.1f}s, en parallèle de l'export)")
+        except Exception as e:
+            log(f"Erreur lors de la génération des graphiques: {e}")
+
+    result.timings['export'] = time.perf_counter() - start
+    result.outputs = outputs
+    return outputs
+
+
+def report_scenario(result, verbose=True):
+    """
+    Print the compliance validation and the final status of a scenario
+    """
+    if not verbose:
+        return
+    config = result.config
+
+    print("\nValidation de la conformité")
+    print_compliance(result.compliance)
+
+    print(f"\n{config.title.split(' : ')[0]} complété - Statut: {result.statut}")
+    print(f"Résultats sauvegardés dans '{config.output['results_dir']}/'")
+    print("-" * 60)
+
+
+def run_scenario(config, raw=None, incremental=False, output_dir='.', store_dir='cache', verbose=True,
+                 partitions=None, executor=None, data=None):
+    """
+    Compute, export and report one scenario
+
+    With config.checkpoints enabled the scenario runs as a graph of
+    checkpointed stages (see stages.py): only the stages whose inputs
+    changed are executed.
+
+    Returns:
+    result: ScenarioResult
+    """
+    if config.checkpoints and config.checkpoints.get('enabled'):
+        if incremental or partitions:
+            raise PipelineError("Les checkpoints ne se combinent pas avec les modes incrémental et partitionné")
+        from .stages import run_stages
+        result = run_stages(config, raw, output_dir, store_dir, verbose, data)
+    else:
+        result = compute_scenario(config, raw, incremental, store_dir, verbose, partitions, executor, data)
+        write_outputs(result, output_dir, verbose)
+    report_scenario(result, verbose)
+    return result
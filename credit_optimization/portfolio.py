@@ -0,0 +1,69 @@
+"""
+Array-backed portfolio of the clients given to the optimizer
+
+A Portfolio holds contiguous float64 arrays of the requested amounts,
+return rates and PD, the int64 intent codes and the client ids, plus a
+per-intent index in CSR layout: the positions of the clients of intent c
+are order[indptr[c]:indptr[c + 1]] (code len(categories) gathers unknown
+intents). The model build, the optimizer, the metrics and the stress tests
+read it directly; the clients DataFrame is only needed for the client
+attributes and the exports.
+"""
+
+import numpy as np
+
+from .metrics import encode_categories
+
+
+class Portfolio:
+    """
+    Optimizer inputs of N clients
+
+    Parameters:
+    Mi, ri, PD: array-like - requested amount, return rate and PD per client
+    codes: array-like of int - loan_intent code per client (see encode_categories)
+    categories: list of str - loan intents matching the codes
+    ids: array-like or None - client ids (positions if None)
+    """
+
+    __slots__ = ('Mi', 'ri', 'PD', 'codes', 'ids', 'categories', 'order', 'indptr')
+
+    def __init__(self, Mi, ri, PD, codes, categories, ids=None):
+        self.Mi = np.ascontiguousarray(Mi, dtype=np.float64)
+        self.ri = np.ascontiguousarray(ri, dtype=np.float64)
+        self.PD = np.ascontiguousarray(PD, dtype=np.float64)
+        self.codes = np.ascontiguousarray(codes, dtype=np.int64)
+        self.ids = np.arange(len(self.Mi)) if ids is None else np.asarray(ids)
+        self.categories = list(categories)
+        # Index CSR par objectif de prêt (tri stable: ordre des clients conservé)
+        self.order = np.argsort(self.codes, kind='stable')
+        counts = np.bincount(self.codes, minlength=len(self.categories) + 1)
+        self.indptr = np.concatenate([[0], np.cumsum(counts)])
+
+    @classmethod
+    def from_clients(cls, clients, categories):
+        """
+        Portfolio of a clients table prepared by prepare_optimizer_inputs
+        """
+        return cls(clients['montant_demande'].to_numpy(), clients['taux_rendement'].to_numpy(),
+                   clients['PD_calibrée'].to_numpy(), encode_categories(clients['loan_intent'].values, categories),
+                   categories, ids=clients.index.to_numpy())
+
+    def __len__(self):
+        return len(self.Mi)
+
+    def __repr__(self):
+        return f"Portfolio({len(self)} clients, {len(self.categories)} objectifs)"
+
+    def intent(self, code):
+        """
+        Positions of the clients of an intent code (sorted)
+        """
+        return self.order[self.indptr[code]:self.indptr[code + 1]]
+
+    def subset(self, positions):
+        """
+        Portfolio of some clients (positions or boolean mask)
+        """
+        return Portfolio(self.Mi[positions], self.ri[positions], self.PD[positions], self.codes[positions],
+                         self.categories, ids=self.ids[positions])
@@ -0,0 +1,193 @@
+"""
+Fast preview of a scenario on stratified client samples
+
+Clients are stratified by loan_intent × PD band (quantiles of PD_calibrée)
+and each replicate draws the same fraction of every stratum. The budget is
+scaled by the sampled share of the requested amounts, so the risk limit
+and the category bands (all proportional to the budget) shrink with it,
+and the reduced problem is solved as usual. Amounts and profits are
+extrapolated by the inverse of that share, client counts by the inverse of
+the sampled share of clients, ratios are kept as they are.
+
+Independent replicates give the spread of each estimate: the confidence
+interval is mean ± t(R-1) × s / √R over the R replicates.
+"""
+
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from .metrics import compute_portfolio_metrics
+from .optimizer import optimize
+from .portfolio import Portfolio
+
+DEFAULTS = {
+    'rate': 0.1,
+    'pd_bands': 5,
+    'replicates': 5,
+    'confidence': 0.95,
+    'seed': 0
+}
+
+# Métriques extrapolées: (clé de compute_portfolio_metrics, mise à l'échelle)
+PREVIEW_METRICS = {
+    'clients_selectionnes': 'clients',
+    'montant_total_alloue': 'montant',
+    'revenus_totaux': 'montant',
+    'pertes_attendues': 'montant',
+    'profit_net': 'montant',
+    'risque_moyen': None,
+    'roi_net': None
+}
+
+
+@dataclass
+class PreviewResult:
+    """
+    Extrapolated portfolio metrics of a scenario and their confidence intervals
+    """
+    estimates: pd.DataFrame
+    categories: pd.DataFrame
+    replicates: pd.DataFrame
+    params: dict
+    sample_size: int
+    population: int
+    duration: float
+
+    def estimate(self, metric):
+        return float(self.estimates.loc[metric, 'Estimation'])
+
+
+def preview_params(config, **overrides):
+    """
+    Preview parameters of a scenario (config.preview over DEFAULTS)
+    """
+    params = dict(DEFAULTS)
+    params.update(config.preview or {})
+    params.update({key: value for key, value in overrides.items() if value is not None})
+    return params
+
+
+def strata_labels(PD, codes, n_bands):
+    """
+    Stratum of every client: loan_intent code × PD quantile band
+    """
+    bornes = np.quantile(PD, np.linspace(0, 1, n_bands + 1)[1:-1])
+    bandes = np.searchsorted(bornes, PD, side='right')
+    return np.asarray(codes, dtype=np.int64) * n_bands + bandes
+
+
+def stratified_sample(labels, rate, rng):
+    """
+    Indices of a sample taking round(rate × n) clients (at least one) of every stratum
+    """
+    strates, inverse, effectifs = np.unique(labels, return_inverse=True, return_counts=True)
+    quotas = np.maximum(1, np.rint(rate * effectifs)).astype(np.int64)
+    # Tri aléatoire au sein de chaque strate, puis les quotas premiers de chacune
+    ordre = np.lexsort((rng.random_sample(len(labels)), inverse))
+    debuts = np.concatenate([[0], np.cumsum(effectifs)[:-1]])
+    rangs = np.arange(len(labels)) - debuts[inverse[ordre]]
+    return np.sort(ordre[rangs < quotas[inverse[ordre]]])
+
+
+def _interval(values, confidence):
+    moyenne = values.mean()
+    if len(values) < 2:
+        return moyenne, np.nan, np.nan, np.nan
+    ecart = values.std(ddof=1)
+    demi = stats.t.ppf(0.5 + confidence / 2, len(values) - 1) * ecart / np.sqrt(len(values))
+    return moyenne, ecart, moyenne - demi, moyenne + demi
+
+
+def preview(portfolio, config, params=None):
+    """
+    Solve the scenario on stratified samples and extrapolate the metrics
+
+    Parameters:
+    portfolio: Portfolio - optimizer inputs of the whole book
+    config: ScenarioConfig
+    params: dict or None - see DEFAULTS (preview_params(config) if None)
+
+    Returns:
+    result: PreviewResult
+    """
+    debut = time.perf_counter()
+    params = params or preview_params(config)
+    rng = np.random.RandomState(params['seed'])
+    Mi = portfolio.Mi
+    labels = strata_labels(portfolio.PD, portfolio.codes, params['pd_bands'])
+    montant_total = Mi.sum()
+
+    lignes, parts = [], []
+    for _ in range(params['replicates']):
+        idx = stratified_sample(labels, params['rate'], rng)
+        taux_montant = Mi[idx].sum() / montant_total
+        taux_clients = len(idx) / len(Mi)
+        # Budget, limite de risque et bandes par catégorie réduits dans la même proportion
+        config_echantillon = config.with_overrides(budget_total=config.budget_total * taux_montant)
+        echantillon = portfolio.subset(idx)
+        optimization = optimize(echantillon, config_echantillon)
+        metrics = compute_portfolio_metrics(optimization.Yi, echantillon, config.lgd, config.allocation)
+        echelle = {'clients': 1 / taux_clients, 'montant': 1 / taux_montant, None: 1.0}
+        lignes.append({nom: metrics[nom] * echelle[mode] for nom, mode in PREVIEW_METRICS.items()})
+        parts.append(metrics['par_categorie']['Part_Reelle'])
+
+    replicates = pd.DataFrame(lignes)
+    replicates.index.name = 'Replicat'
+    estimates = pd.DataFrame(
+        [_interval(replicates[nom].to_numpy(), params['confidence']) for nom in PREVIEW_METRICS],
+        index=pd.Index(list(PREVIEW_METRICS), name='Metrique'),
+        columns=['Estimation', 'Ecart_Type', 'IC_Bas', 'IC_Haut']
+    )
+    parts = pd.concat(parts, axis=1)
+    categories = pd.DataFrame({
+        'Part_Estimee': parts.mean(axis=1),
+        'Ecart_Type': parts.std(axis=1, ddof=1),
+        'Part_Cible': [config.allocation.get(cat, 0.0) for cat in parts.index]
+    })
+
+    return PreviewResult(
+        estimates=estimates, categories=categories, replicates=replicates, params=params,
+        sample_size=len(idx), population=len(Mi), duration=time.perf_counter() - debut
+    )
+
+
+def preview_scenario(config, raw=None, store_dir='cache', verbose=True):
+    """
+    Prepare the clients of a scenario and preview it (no file is written)
+
+    Returns:
+    result: PreviewResult
+    """
+    from .pipeline import load_dataset, prepare_clients
+    from .scoring import prepare_optimizer_inputs
+
+    if raw is None:
+        raw = load_dataset(config.dataset)
+    df, _ = prepare_clients(raw, config, store_dir=store_dir, verbose=False)
+    clients = prepare_optimizer_inputs(df[df['Yi'] == 1], config)
+    result = preview(Portfolio.from_clients(clients, config.categories), config)
+    if verbose:
+        print_preview(result, config)
+    return result
+
+
+def print_preview(result, config):
+    params = result.params
+    print(f"Aperçu {config.title}: {params['replicates']} échantillons stratifiés de {result.sample_size:,} "
+          f"clients sur {result.population:,} ({params['rate']*100:.0f}%), {result.duration:.2f}s")
+    libelles = {
+        'clients_selectionnes': ('Clients sélectionnés', '{:,.0f}'),
+        'montant_total_alloue': ('Montant alloué', '{:,.0f} euros'),
+        'profit_net': ('Profit net', '{:,.0f} euros'),
+        'risque_moyen': ('Risque moyen', '{:.2%}'),
+        'roi_net': ('ROI net', '{:.2%}')
+    }
+    niveau = f"IC {params['confidence']*100:.0f}%"
+    for nom, (libelle, fmt) in libelles.items():
+        ligne = result.estimates.loc[nom]
+        print(f"  {libelle}: {fmt.format(ligne['Estimation'])} ({niveau}: {fmt.format(ligne['IC_Bas'])} - "
+              f"{fmt.format(ligne['IC_Haut'])})")
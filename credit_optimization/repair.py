@@ -0,0 +1,192 @@
+"""
+Rounding and repair of the LP relaxation into a feasible 0/1 selection
+
+np.round on the relaxed decisions can overshoot the budget, the risk limit
+or a category band. The repair works on the rows of the allocation model
+(A·Y ≤ b) in three vectorized phases, each a sort and a few cumulative sums
+(O(N log N)):
+
+1. arrondi prudent: only the decisions at 1 are kept, fractional ones go to 0;
+2. corrections: a violated capacity row (budget, risque, *_max) drops the
+   selected clients with the lowest profit per unit of that row; a violated
+   minimum row (*_min) adds the unselected clients of the category with the
+   highest profit per euro, those fitting in the remaining capacity first
+   (an overshoot is then corrected by drops in the other categories);
+3. remplissage: the remaining capacity is filled with the unselected clients
+   ranked by profit per unit of budget and risk (each row weighted by its
+   remaining slack).
+
+Drops are taken as prefixes of the ranked clients whose cumulative usage
+stays within the surplus of every minimum row, so a drop never breaks a
+category band that was satisfied. The final vector is checked row by row
+(feasibility certificate).
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+_TOL = 1e-9
+
+
+@dataclass
+class RepairResult:
+    """
+    Repaired 0/1 selection, its feasibility certificate and the moves made
+    """
+    Yi: np.ndarray
+    certificate: pd.DataFrame
+    moves: dict
+    profit: float
+    lp_bound: float
+
+    @property
+    def feasible(self):
+        return bool(self.certificate['Respectee'].all())
+
+    @property
+    def gap(self):
+        """Relative profit gap to the LP relaxation bound"""
+        return (self.lp_bound - self.profit) / abs(self.lp_bound) if self.lp_bound else 0.0
+
+
+def _tolerance(b):
+    return _TOL * np.maximum(1.0, np.abs(b))
+
+
+def _fits(order, usage, capacity):
+    """
+    Clients of `order` whose cumulative usage stays within every capacity
+
+    usage: (rows, N) usage of each client; capacity: (rows,) available slack.
+    The cumulative sums run over all ranked clients, accepted or not, so the
+    accepted subset never uses more than its prefix (feasible by construction);
+    a client is only checked against the rows it uses.
+    """
+    if len(order) == 0 or len(capacity) == 0:
+        return np.ones(len(order), dtype=bool)
+    usage = usage[:, order]
+    cumul = np.cumsum(usage, axis=1)
+    return ((cumul <= capacity[:, None] + _tolerance(capacity)[:, None]) | (usage == 0)).all(axis=0)
+
+
+def _take_until(order, amounts, target):
+    """
+    Shortest prefix of `order` whose amounts reach target
+    """
+    cumul = np.cumsum(amounts)
+    k = int(np.searchsorted(cumul, target - _tolerance(target)))
+    return order[:k + 1]
+
+
+def feasibility_certificate(A, b, Yi, row_names):
+    """
+    Row-by-row check of A·Y ≤ b in the natural sense of each row
+
+    Returns:
+    pandas DataFrame indexed by constraint with Second_Membre, Utilisation,
+    Ecart (≥ 0 when respected) and Respectee
+    """
+    lhs = A @ Yi
+    ecart = b - lhs
+    sign = np.array([-1.0 if name.endswith('_min') else 1.0 for name in row_names])
+    return pd.DataFrame({
+        'Second_Membre': b * sign,
+        'Utilisation': lhs * sign,
+        'Ecart': ecart,
+        'Respectee': ecart >= -_tolerance(b)
+    }, index=pd.Index(row_names, name='Contrainte'))
+
+
+def repair_selection(x, model, profit, max_rounds=10):
+    """
+    Feasible 0/1 selection from the relaxed LP solution
+
+    Parameters:
+    x: numpy array - relaxed decisions (first model.n_clients values)
+    model: AllocationModel - nominal allocation rows (dense A_ub, Yi only)
+    profit: numpy array - net profit per client
+    max_rounds: int - correction rounds before giving up
+
+    Returns:
+    result: RepairResult
+    """
+    n = model.n_clients
+    A = np.asarray(model.A_ub)[:, :n]
+    b = np.asarray(model.b_ub, dtype=np.float64)
+    x = np.asarray(x[:n], dtype=np.float64)
+
+    # Lignes de capacité (coefficients ≥ 0) et lignes de minimum (≤ 0)
+    capacite = (A >= 0).all(axis=1)
+    minimum = ~capacite
+    cap_rows, min_rows = np.flatnonzero(capacite), np.flatnonzero(minimum)
+    A_min_abs = -A[min_rows]
+
+    # 1. Arrondi prudent
+    Y = x >= 1 - 1e-6
+    moves = {'arrondis_a_zero': int(((x > 1e-6) & ~Y).sum()), 'retraits': 0, 'ajouts': 0}
+
+    # 2. Corrections des lignes violées
+    for _ in range(max_rounds):
+        ecart = b - A @ Y
+        violees = np.flatnonzero(ecart < -_tolerance(b))
+        if len(violees) == 0:
+            break
+        for r in violees:
+            ecart = b - A @ Y
+            if ecart[r] >= -_tolerance(b[r]):
+                continue
+            if capacite[r]:
+                # Retrait des clients au plus faible profit par unité de la ligne
+                candidats = np.flatnonzero(Y & (A[r] > 0))
+                order = candidats[np.argsort(profit[candidats] / A[r, candidats], kind='stable')]
+                order = order[_fits(order, A_min_abs, np.maximum(ecart[min_rows], 0.0))]
+                retires = _take_until(order, A[r, order], -ecart[r])
+                Y[retires] = False
+                moves['retraits'] += len(retires)
+            else:
+                # Ajout des clients au plus fort profit par euro de la catégorie, ceux qui tiennent
+                # dans la capacité restante d'abord; un dépassement est corrigé par des retraits
+                # dans les autres catégories au tour suivant
+                candidats = np.flatnonzero(~Y & (A[r] < 0))
+                order = candidats[np.argsort(-profit[candidats] / -A[r, candidats], kind='stable')]
+                tient = _fits(order, A[cap_rows], np.maximum(ecart[cap_rows], 0.0))
+                order = np.concatenate([order[tient], order[~tient]])
+                ajoutes = _take_until(order, -A[r, order], -ecart[r])
+                Y[ajoutes] = True
+                moves['ajouts'] += len(ajoutes)
+
+    # 3. Remplissage de la capacité restante
+    for _ in range(3):
+        ecart = np.maximum(b - A @ Y, 0.0)
+        candidats = np.flatnonzero(~Y & (profit > 0))
+        if len(candidats) == 0:
+            break
+        # Profit par unité de budget et de risque, chaque ligne rapportée à son écart restant
+        poids = (A[cap_rows][:, candidats] / np.maximum(ecart[cap_rows], _TOL)[:, None]).sum(axis=0)
+        order = candidats[np.argsort(-profit[candidats] / np.maximum(poids, _TOL), kind='stable')]
+        ajoutes = order[_fits(order, A[cap_rows], ecart[cap_rows])]
+        if len(ajoutes) == 0:
+            break
+        Y[ajoutes] = True
+        moves['ajouts'] += len(ajoutes)
+
+    Yi = Y.astype(int)
+    return RepairResult(
+        Yi=Yi, certificate=feasibility_certificate(A, b, Yi, model.row_names), moves=moves,
+        profit=float(profit @ Yi), lp_bound=float(profit @ x)
+    )
+
+
+def print_repair(result):
+    """
+    Console summary of the rounding repair
+    """
+    moves = result.moves
+    statut = 'faisable' if result.feasible else 'NON faisable'
+    print(f"Arrondi réparé: {moves['arrondis_a_zero']} fractions arrondies à 0, {moves['retraits']} retraits, "
+          f"{moves['ajouts']} ajouts - solution {statut} "
+          f"(écart à la borne LP: {result.gap*100:.3f}%)")
+    for nom, ligne in result.certificate[~result.certificate['Respectee']].iterrows():
+        print(f"  {nom}: {ligne['Utilisation']:,.0f} pour une limite de {ligne['Second_Membre']:,.0f}")
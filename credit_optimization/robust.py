@@ -0,0 +1,153 @@
+"""
+Robust risk constraint against PD estimation uncertainty (Bertsimas–Sim)
+
+Each PDi may deviate upwards by up to di, and at most Γ clients deviate at
+the same time. The worst case of the risk row
+
+    Σ(PDi × Mi × Yi) + max_{|S| ≤ Γ} Σ_{i∈S} di × Mi × Yi ≤ TR × B
+
+is linearized with one variable z and one variable pi per client:
+
+    Σ(PDi × Mi × Yi) + Γ × z + Σ pi ≤ TR × B
+    di × Mi × Yi - z - pi ≤ 0,   z ≥ 0, pi ≥ 0
+
+so the robust model stays a single LP with N + 1 extra variables and N extra
+rows (kept sparse).
+"""
+
+import numpy as np
+from scipy import sparse
+
+DEFAULTS = {
+    'gamma': None,
+    'violation_probability': 0.05,
+    'deviation': None,
+    'deviation_multiplier': 2.0
+}
+
+
+def robust_params(config, **overrides):
+    """
+    Robust parameters of a scenario (config.robust over DEFAULTS)
+    """
+    params = dict(DEFAULTS)
+    params.update(config.robust or {})
+    params.update({key: value for key, value in overrides.items() if value is not None})
+    return params
+
+
+def pd_deviations(PD, config, params):
+    """
+    Maximal upward deviation of each PD
+
+    'deviation' gives it directly; otherwise it is deviation_multiplier times
+    the calibration noise of the scenario, capped at the PD ceiling.
+    """
+    scoring = config.scoring
+    if params['deviation'] is not None:
+        deviation = float(params['deviation'])
+    else:
+        deviation = params['deviation_multiplier'] * scoring['noise_std']
+    return np.minimum(deviation, np.maximum(0.0, 1.0 - PD))
+
+
+def protection_level(n, params):
+    """
+    Budget of uncertainty Γ
+
+    Without an explicit gamma, Γ = sqrt(2 n ln(1/ε)): with independent
+    symmetric deviations the risk limit is then violated with probability
+    at most ε (Bertsimas & Sim, 2004).
+    """
+    if params['gamma'] is not None:
+        return float(min(params['gamma'], n))
+    epsilon = params['violation_probability']
+    return float(min(n, np.sqrt(2 * n * np.log(1 / epsilon))))
+
+
+def build_robust_model(model, Mi, deviations, gamma):
+    """
+    Robust counterpart of an allocation model (risk row protected)
+
+    Variables: Y (N), z, p (N).
+
+    Returns:
+    model: AllocationModel with sparse A_ub and per-variable bounds
+    """
+    from .optimizer import AllocationModel
+
+    N = len(Mi)
+    m = len(model.b_ub)
+    risque = model.row_names.index('risque')
+    A = sparse.coo_matrix(model.A_ub)
+
+    # Lignes existantes, plus Γ × z + Σ pi sur la ligne de risque
+    rows = [A.row, np.full(N + 1, risque)]
+    cols = [A.col, np.arange(N, 2 * N + 1)]
+    vals = [A.data, np.concatenate([[gamma], np.ones(N)])]
+
+    # di × Mi × Yi - z - pi ≤ 0
+    protection_rows = m + np.arange(N)
+    rows += [protection_rows, protection_rows, protection_rows]
+    cols += [np.arange(N), np.full(N, N), N + 1 + np.arange(N)]
+    vals += [deviations * Mi, -np.ones(N), -np.ones(N)]
+
+    A_ub = sparse.csr_matrix(
+        (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(m + N, 2 * N + 1)
+    )
+    b_ub = np.concatenate([model.b_ub, np.zeros(N)])
+    c = np.concatenate([model.c, np.zeros(N + 1)])
+    bounds = np.column_stack([
+        np.zeros(2 * N + 1),
+        np.concatenate([np.ones(N), np.full(N + 1, np.inf)])
+    ])
+
+    return AllocationModel(
+        c=c, A_ub=A_ub, b_ub=b_ub,
+        row_names=model.row_names + [f'protection_{i}' for i in range(N)],
+        bounds=bounds, n_clients=N
+    )
+
+
+def worst_case_risk(Yi, Mi, PD, deviations, gamma):
+    """
+    Risk total of a selection when the Γ most harmful PDs deviate
+
+    Returns:
+    (nominal risk total, worst-case risk total)
+    """
+    Yi = np.asarray(Yi, dtype=np.float64)
+    nominal = float((PD * Mi * Yi).sum())
+    impacts = np.sort(deviations * Mi * Yi)[::-1]
+    k = int(np.floor(gamma))
+    worst = impacts[:k].sum()
+    if k < len(impacts):
+        worst += (gamma - k) * impacts[k]
+    return nominal, nominal + float(worst)
+
+
+def robust_report(Yi, Mi, PD, deviations, gamma, config):
+    """
+    Nominal and worst-case average risk of a selection against the limit
+    """
+    nominal, worst = worst_case_risk(Yi, Mi, PD, deviations, gamma)
+    montant = float((Mi * np.asarray(Yi)).sum())
+    limite = config.risk_tolerance * config.budget_used
+    return {
+        'gamma': gamma,
+        'deviation_moyenne': float(deviations.mean()) if len(deviations) else 0.0,
+        'risque_nominal': nominal / montant if montant > 0 else 0.0,
+        'risque_pire_cas': worst / montant if montant > 0 else 0.0,
+        'risque_total_pire_cas': worst,
+        'limite_risque_total': limite,
+        'protege': worst <= limite * (1 + 1e-9)
+    }
+
+
+def print_robust_report(report):
+    print(f"\nMode robuste (Γ = {report['gamma']:.0f} PD déviées de {report['deviation_moyenne']*100:.2f} pts au plus):")
+    print(f"Risque nominal: {report['risque_nominal']*100:.2f}%")
+    print(f"Risque pire cas: {report['risque_pire_cas']*100:.2f}% "
+          f"({report['risque_total_pire_cas']:,.0f} / {report['limite_risque_total']:,.0f} euros, "
+          f"{'OK' if report['protege'] else 'NOK'})")
@@ -0,0 +1,231 @@
+"""
+Numerical scaling of the allocation LP
+
+The rows mix euro amounts (Mi up to 35 000, right-hand sides near 9e7) and
+risk amounts (PD × Mi). Before the solve the model is rewritten as
+
+    min σ c·Dc x̃   s.t.   Dr A Dc x̃ ≤ Dr b,   lb / Dc ≤ x̃ ≤ ub / Dc
+
+amounts are first expressed in a common unit (unit euros), then passes of
+geometric row and column scaling (each row or column divided by the
+square root of its largest × smallest nonzero) bring the coefficients
+close to 1, and a last row pass sets the largest coefficient of every row
+to 1. Scale factors are rounded to powers of 2 so the scaling itself adds
+no rounding error. The solution is unscaled afterwards:
+
+    x = Dc x̃,   y = Dr ỹ / σ,   reduced costs d = d̃ / (σ Dc),   fun = fuñ / σ
+"""
+
+import time
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import OptimizeResult, linprog
+
+from .optimizer import AllocationModel
+
+DEFAULTS = {
+    'unit': 1000,
+    'passes': 8,
+    'compare': False
+}
+
+
+def scaling_params(config, **overrides):
+    """
+    Scaling parameters of a scenario (config.scaling over DEFAULTS)
+    """
+    params = dict(DEFAULTS)
+    params.update(config.scaling or {})
+    params.update({key: value for key, value in overrides.items() if value is not None})
+    return params
+
+
+def _power_of_two(scale):
+    return np.exp2(np.round(np.log2(scale)))
+
+
+def _extremes(A, axis):
+    """
+    Largest and smallest nonzero |a| of every row (axis=1) or column (axis=0)
+    """
+    if sparse.issparse(A):
+        absolu = abs(sparse.csr_matrix(A))
+        inverse = absolu.copy()
+        inverse.data = 1.0 / inverse.data
+        plus_grand = absolu.max(axis=axis).toarray().ravel()
+        plus_petit = inverse.max(axis=axis).toarray().ravel()
+        with np.errstate(divide='ignore'):
+            plus_petit = np.where(plus_petit > 0, 1.0 / plus_petit, 0.0)
+        return plus_grand, plus_petit
+    absolu = np.abs(A)
+    plus_grand = absolu.max(axis=axis)
+    plus_petit = np.where(absolu > 0, absolu, np.inf).min(axis=axis)
+    return plus_grand, np.where(np.isfinite(plus_petit), plus_petit, 0.0)
+
+
+def _scaled_matrix(A, row_scale, col_scale):
+    if sparse.issparse(A):
+        return (sparse.diags(row_scale) @ sparse.csr_matrix(A) @ sparse.diags(col_scale)).tocsr()
+    return row_scale[:, None] * np.asarray(A, dtype=np.float64) * col_scale[None, :]
+
+
+def coefficient_range(A):
+    """
+    Ratio of the largest to the smallest nonzero |a| of a matrix
+    """
+    if sparse.issparse(A):
+        valeurs = np.abs(sparse.csr_matrix(A).data)
+    else:
+        valeurs = np.abs(np.asarray(A)).ravel()
+    valeurs = valeurs[valeurs > 0]
+    return float(valeurs.max() / valeurs.min()) if len(valeurs) else 1.0
+
+
+def condition_number(A):
+    """
+    2-norm condition number of a dense constraint matrix without its
+    opposite rows (None when sparse)
+    """
+    if sparse.issparse(A):
+        return None
+    A = np.asarray(A, dtype=np.float64)
+    # Lignes min/max d'une catégorie opposées: une seule des deux est gardée
+    normes = np.linalg.norm(A, axis=1)
+    directions = A / np.where(normes > 0, normes, 1.0)[:, None]
+    premiers = directions[np.arange(len(A)), np.argmax(np.abs(directions) > 0, axis=1)]
+    directions *= np.where(premiers < 0, -1.0, 1.0)[:, None]
+    _, gardees = np.unique(np.round(directions, 12), axis=0, return_index=True)
+    valeurs = np.linalg.svd(A[np.sort(gardees)], compute_uv=False)
+    return float(valeurs.max() / valeurs.min()) if valeurs.min() > 0 else np.inf
+
+
+class Scaling:
+    """
+    Row, column and objective scale factors of a model
+    """
+
+    def __init__(self, row_scale, col_scale, objective_scale):
+        self.row_scale = row_scale
+        self.col_scale = col_scale
+        self.objective_scale = objective_scale
+
+    def apply(self, model):
+        """
+        Scaled copy of the model
+        """
+        if isinstance(model.bounds, tuple):
+            lower = np.full(model.n_variables, float(model.bounds[0]))
+            upper = np.full(model.n_variables, float(model.bounds[1]))
+        else:
+            bounds = np.asarray(model.bounds, dtype=np.float64)
+            lower, upper = bounds[:, 0], bounds[:, 1]
+        return AllocationModel(
+            c=self.objective_scale * model.c * self.col_scale,
+            A_ub=_scaled_matrix(model.A_ub, self.row_scale, self.col_scale),
+            b_ub=self.row_scale * model.b_ub,
+            row_names=model.row_names,
+            bounds=np.column_stack([lower / self.col_scale, upper / self.col_scale]),
+            n_clients=model.n_clients
+        )
+
+    def unscale(self, result, model):
+        """
+        linprog result of the scaled model expressed in the original units
+        """
+        x = result.x * self.col_scale
+        sigma = self.objective_scale
+        return OptimizeResult(
+            x=x, fun=float(result.fun) / sigma, success=result.success, status=result.status,
+            message=result.message, nit=result.nit,
+            ineqlin=OptimizeResult(residual=result.ineqlin.residual / self.row_scale,
+                                   marginals=result.ineqlin.marginals * self.row_scale / sigma),
+            lower=OptimizeResult(residual=result.lower.residual * self.col_scale,
+                                 marginals=result.lower.marginals / (sigma * self.col_scale)),
+            upper=OptimizeResult(residual=result.upper.residual * self.col_scale,
+                                 marginals=result.upper.marginals / (sigma * self.col_scale))
+        )
+
+
+def compute_scaling(model, unit=1000, passes=8):
+    """
+    Equilibration of a model (see module docstring)
+
+    Returns:
+    scaling: Scaling
+    """
+    n_rows, n = len(model.b_ub), model.n_variables
+    # Montants exprimés en unités de `unit` euros
+    lignes = np.full(n_rows, 1.0 / unit)
+    colonnes = np.ones(n)
+    for _ in range(passes):
+        grand, petit = _extremes(_scaled_matrix(model.A_ub, lignes, colonnes), axis=1)
+        lignes = lignes / np.where(grand > 0, np.sqrt(grand * np.where(petit > 0, petit, grand)), 1.0)
+        grand, petit = _extremes(_scaled_matrix(model.A_ub, lignes, colonnes), axis=0)
+        colonnes = colonnes / np.where(grand > 0, np.sqrt(grand * np.where(petit > 0, petit, grand)), 1.0)
+    # Dernière passe: plus grand coefficient de chaque ligne à 1
+    grand, _ = _extremes(_scaled_matrix(model.A_ub, lignes, colonnes), axis=1)
+    lignes = lignes / np.where(grand > 0, grand, 1.0)
+
+    lignes, colonnes = _power_of_two(lignes), _power_of_two(colonnes)
+    cout = np.abs(model.c * colonnes)
+    objectif = _power_of_two(1.0 / cout.max()) if cout.max() > 0 else 1.0
+    return Scaling(lignes, colonnes, float(objectif))
+
+
+def solve_scaled(model, unit=1000, passes=8, compare=False):
+    """
+    Solve the LP with HiGHS on the scaled model
+
+    Parameters:
+    model: AllocationModel
+    unit, passes: see compute_scaling
+    compare: bool - also solve the unscaled model to report the change in
+             iterations and solve time
+
+    Returns:
+    lp_result: scipy OptimizeResult in the original units
+    report: dict - coefficient ranges and condition numbers before and after,
+            iterations and durations
+    """
+    debut = time.perf_counter()
+    scaling = compute_scaling(model, unit, passes)
+    scaled = scaling.apply(model)
+    duree_scaling = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    res = linprog(scaled.c, A_ub=scaled.A_ub, b_ub=scaled.b_ub, bounds=scaled.bounds, method='highs')
+    report = {
+        'unite': unit,
+        'etendue_avant': coefficient_range(model.A_ub),
+        'etendue_apres': coefficient_range(scaled.A_ub),
+        'conditionnement_avant': condition_number(model.A_ub),
+        'conditionnement_apres': condition_number(scaled.A_ub),
+        'iterations': int(res.nit),
+        'duree': time.perf_counter() - debut,
+        'duree_scaling': duree_scaling
+    }
+    if compare:
+        debut = time.perf_counter()
+        brut = linprog(model.c, A_ub=model.A_ub, b_ub=model.b_ub, bounds=model.bounds, method='highs')
+        report['iterations_sans_scaling'] = int(brut.nit)
+        report['duree_sans_scaling'] = time.perf_counter() - debut
+        report['ecart_objectif'] = (abs(float(brut.fun) - float(res.fun) / scaling.objective_scale)
+                                    if brut.success and res.success else None)
+    if not res.success:
+        return res, report
+    return scaling.unscale(res, model), report
+
+
+def print_scaling_report(report):
+    conditionnement = ''
+    if report['conditionnement_avant'] is not None:
+        conditionnement = (f", conditionnement {report['conditionnement_avant']:.2e} -> "
+                           f"{report['conditionnement_apres']:.2e}")
+    print(f"Mise à l'échelle: étendue des coefficients {report['etendue_avant']:.2e} -> "
+          f"{report['etendue_apres']:.2e}{conditionnement}")
+    if 'iterations_sans_scaling' in report:
+        print(f"  HiGHS: {report['iterations_sans_scaling']} itérations en {report['duree_sans_scaling']:.2f}s "
+              f"sans mise à l'échelle, {report['iterations']} en {report['duree']:.2f}s avec")
+    else:
+        print(f"  HiGHS: {report['iterations']} itérations en {report['duree']:.2f}s")
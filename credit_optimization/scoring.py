@@ -0,0 +1,188 @@
+"""
+Feature encoding and PD scoring for the credit allocation pipeline
+"""
+
+import numpy as np
+import pandas as pd
+
+FEATURE_COLUMNS = [
+    'person_age', 'person_income', 'person_emp_length', 'loan_amnt',
+    'loan_int_rate', 'loan_percent_income', 'cb_person_cred_hist_length',
+    'person_home_ownership_RENT'
+]
+
+_COMPARISONS = {
+    '<': lambda col, value: col < value,
+    '<=': lambda col, value: col <= value,
+    '>': lambda col, value: col > value,
+    '>=': lambda col, value: col >= value,
+    'between': lambda col, value: col.between(value[0], value[1])
+}
+
+
+def encode_features(df_clean):
+    """
+    Drop incomplete rows and add the encoded features used by the scoring
+
+    Parameters:
+    df_clean: pandas DataFrame - output of clean_dataset
+
+    Returns:
+    df: pandas DataFrame - complete rows with person_home_ownership_RENT (0/1)
+    """
+    df = df_clean.dropna().copy()
+
+    # Encodage des variables catégorielles
+    df_encoded = pd.get_dummies(df, columns=['person_home_ownership', 'loan_intent'], drop_first=False)
+
+    # Créer la colonne person_home_ownership_RENT si nécessaire
+    if 'person_home_ownership_RENT' not in df_encoded.columns:
+        df_encoded['person_home_ownership_RENT'] = (df['person_home_ownership'] == 'RENT').astype(int)
+
+    for col in FEATURE_COLUMNS:
+        if col in df_encoded.columns:
+            df[col] = df_encoded[col]
+
+    # Un lot sans locataire n'a pas de colonne indicatrice: même type partout
+    df['person_home_ownership_RENT'] = df['person_home_ownership_RENT'].astype(int)
+    return df
+
+
+def term_values(df, term):
+    """
+    Evaluate one weighted term of a scoring rule
+
+    A term is a dict with 'column' and 'weight' and either a comparison
+    ('op', 'value') giving a 0/1 flag, a 'divisor' scaling the column, or
+    'complement' for (1 - column).
+    """
+    col = df[term['column']]
+    if 'op' in term:
+        values = _COMPARISONS[term['op']](col, term['value']).astype(int)
+    elif term.get('complement'):
+        values = 1 - col
+    elif 'divisor' in term:
+        values = col / term['divisor']
+    else:
+        values = col
+    return values * term['weight']
+
+
+def weighted_sum(df, terms, base=None):
+    """
+    Sum of weighted terms, accumulated left to right starting from base
+    """
+    total = base
+    for term in terms:
+        values = term_values(df, term)
+        total = values if total is None else total + values
+    if total is None:
+        return pd.Series(0.0, index=df.index)
+    return total
+
+
+def scenario_adjustments(df, scoring):
+    """
+    Scenario adjustments of the risk score (adjustment_base plus adjustment_terms)
+    """
+    return weighted_sum(df, scoring['adjustment_terms'], base=scoring.get('adjustment_base', 0.0))
+
+
+def risk_score(df, scoring):
+    """
+    Heuristic risk score: base factors plus the scenario adjustments
+    """
+    base_risk_score = weighted_sum(df, scoring['base_terms'])
+    return np.maximum(scoring['risk_floor'], base_risk_score + scenario_adjustments(df, scoring))
+
+
+def base_pd(df, scoring):
+    """
+    PD before noise: the scaled score, or the fitted model PD plus the
+    scenario adjustments (scaled like the score) when present
+    """
+    if 'pd_modele' in df.columns:
+        # Le modèle remplace les facteurs de base, pas les ajustements du scénario
+        return df['pd_modele'] + scenario_adjustments(df, scoring) * scoring.get('pd_scale', 1.0)
+    return df['risk_score'] * scoring.get('pd_scale', 1.0)
+
+
+def score_clients(df_clean, config, noise=None, pd_model=None):
+    """
+    Encode, score and calibrate the PD of cleaned clients
+
+    Parameters:
+    df_clean: pandas DataFrame - output of clean_dataset
+    config: ScenarioConfig
+    noise: callable(df) -> array or None - PD noise; defaults to a gaussian
+           draw seeded with scoring['noise_seed']
+    pd_model: LogisticPDModel or None - PD fitted on loan_status, used
+              instead of the scaled heuristic score (pd_modele column)
+
+    Returns:
+    df: pandas DataFrame with risk_score, PD_calibrée and Yi (solvency)
+    """
+    return score_encoded(encode_features(df_clean), config, noise, pd_model)
+
+
+def score_encoded(df, config, noise=None, pd_model=None):
+    """
+    Score and calibrate the PD of encoded clients (see score_clients)
+
+    Parameters:
+    df: pandas DataFrame - output of encode_features (modified in place)
+    """
+    scoring = config.scoring
+    df['risk_score'] = risk_score(df, scoring)
+    if pd_model is not None:
+        df['pd_modele'] = pd_model.predict(df)
+
+    if noise is None:
+        rng = np.random.RandomState(scoring.get('noise_seed'))
+        bruit = rng.normal(0, scoring['noise_std'], len(df))
+    else:
+        bruit = noise(df)
+
+    pd_brute = base_pd(df, scoring) + bruit
+    df['PD_calibrée'] = np.minimum(scoring['pd_max'], np.maximum(scoring['pd_min'], pd_brute))
+
+    # Décision de solvabilité
+    df['Yi'] = (df['PD_calibrée'] <= scoring['solvency_threshold']).astype(int)
+    return df
+
+
+def assign_intents(clients, config):
+    """
+    Loan intent per client
+
+    'random' draws intents from the target allocation with the scenario seed
+    (the behaviour the published results were produced with); 'dataset'
+    keeps the loan_intent column of the extract.
+    """
+    if config.intents.get('source', 'random') == 'dataset' and 'loan_intent' in clients.columns:
+        return clients['loan_intent'].values
+
+    objectifs = list(config.allocation.keys())
+    probabilites = np.array(list(config.allocation.values()), dtype=float)
+    probabilites = probabilites / probabilites.sum()
+
+    rng = np.random.RandomState(config.intents.get('seed'))
+    return rng.choice(objectifs, size=len(clients), p=probabilites)
+
+
+def prepare_optimizer_inputs(clients, config):
+    """
+    Add montant_demande, loan_intent and taux_rendement to solvent clients
+
+    Returns:
+    clients: pandas DataFrame (copy)
+    """
+    returns = config.returns
+    clients = clients.copy()
+
+    clients['montant_demande'] = (clients['loan_amnt'] * returns.get('amount_factor', 1.0)).astype(int)
+    clients['loan_intent'] = assign_intents(clients, config)
+
+    base_rate = clients['loan_int_rate'] / 100 * returns.get('rate_factor', 1.0)
+    clients['taux_rendement'] = base_rate + clients['loan_intent'].map(returns['premiums']).fillna(0).astype(float)
+    return clients
@@ -0,0 +1,193 @@
+"""
+Sensitivity analysis of the allocation LP from the HiGHS dual information
+
+Marginals, slacks and reduced costs come from the single solve; the validity
+range of each right-hand side is the interval over which the optimal basis
+(and therefore every marginal) stays unchanged. Values refer to the LP
+relaxation, before the 0/1 rounding of the decisions.
+"""
+
+import numpy as np
+import pandas as pd
+
+_TOL = 1e-9
+
+
+def _natural_rows(model):
+    """
+    Natural right-hand side of each row and its sign in the A_ub·x ≤ b_ub form
+
+    Category minimum rows are stored as -Σ(Mi × Yi) ≤ -budget_min.
+    """
+    sign = np.array([-1.0 if name.endswith('_min') else 1.0 for name in model.row_names])
+    return model.b_ub * sign, sign
+
+
+def _basis(model, lp_result):
+    """
+    Basic structural columns and basic slack rows of the optimal vertex
+
+    Returns:
+    (structural indices, slack row indices) or None when the basis cannot be
+    identified (degenerate vertex)
+    """
+    m = len(model.b_ub)
+    x = lp_result.x
+    slack = lp_result.ineqlin.residual
+    marginals = lp_result.ineqlin.marginals
+
+    structural = np.flatnonzero((x > _TOL) & (x < 1 - _TOL))
+    slack_rows = np.flatnonzero(slack > _TOL * np.maximum(1.0, np.abs(model.b_ub)))
+
+    # Sommet dégénéré: une contrainte saturée à marginal nul garde son écart en base
+    if len(structural) + len(slack_rows) < m:
+        degenerate = np.setdiff1d(np.flatnonzero(np.abs(marginals) < _TOL), slack_rows)
+        slack_rows = np.sort(np.concatenate([slack_rows, degenerate[:m - len(structural) - len(slack_rows)]]))
+
+    if len(structural) + len(slack_rows) != m:
+        return None
+    return structural, slack_rows
+
+
+def rhs_ranges(model, lp_result):
+    """
+    Validity range of every right-hand side (in the A_ub·x ≤ b_ub form)
+
+    Moving b_i by δ moves the basic variables by δ·B⁻¹eᵢ; the range is the
+    set of δ keeping structural basics in [0, 1] and basic slacks ≥ 0.
+
+    Returns:
+    lower, upper: numpy arrays (NaN when the basis cannot be identified)
+    """
+    m = len(model.b_ub)
+    lower = np.full(m, np.nan)
+    upper = np.full(m, np.nan)
+
+    basis = _basis(model, lp_result)
+    if basis is None:
+        return lower, upper
+    structural, slack_rows = basis
+
+    # B = [A_ub[:, structurels], I[:, écarts]] (m × m)
+    B = np.hstack([model.A_ub[:, structural], np.eye(m)[:, slack_rows]])
+    try:
+        directions = np.linalg.solve(B, np.eye(m))
+    except np.linalg.LinAlgError:
+        return lower, upper
+
+    values = np.concatenate([lp_result.x[structural], lp_result.ineqlin.residual[slack_rows]])
+    lo = np.concatenate([np.zeros(len(structural)), np.zeros(len(slack_rows))])
+    hi = np.concatenate([np.ones(len(structural)), np.full(len(slack_rows), np.inf)])
+
+    for i in range(m):
+        d = directions[:, i]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            to_hi = np.where(d > _TOL, (hi - values) / d, np.where(d < -_TOL, (lo - values) / d, np.inf))
+            to_lo = np.where(d > _TOL, (lo - values) / d, np.where(d < -_TOL, (hi - values) / d, -np.inf))
+        lower[i] = model.b_ub[i] + to_lo.max(initial=-np.inf)
+        upper[i] = model.b_ub[i] + to_hi.min(initial=np.inf)
+
+    return lower, upper
+
+
+def constraint_sensitivity(model, lp_result):
+    """
+    Marginal value, slack and validity range of every constraint
+
+    Returns:
+    table: pandas DataFrame indexed by constraint with Second_Membre, Utilisation,
+           Ecart, Saturee, Valeur_Marginale (profit per euro of right-hand side),
+           Valeur_1M (profit for +1,000,000 euros), Borne_Min, Borne_Max
+    """
+    rhs, sign = _natural_rows(model)
+    slack = lp_result.ineqlin.residual
+    # linprog minimise -profit: d(profit)/d(b) = -marginal, puis retour au sens naturel
+    valeur_marginale = -lp_result.ineqlin.marginals * sign + 0.0
+
+    lower, upper = rhs_ranges(model, lp_result)
+    borne_a, borne_b = lower * sign, upper * sign
+
+    table = pd.DataFrame({
+        'Second_Membre': rhs,
+        'Utilisation': rhs - slack * sign,
+        'Ecart': slack,
+        'Saturee': slack <= _TOL * np.maximum(1.0, np.abs(rhs)),
+        'Valeur_Marginale': valeur_marginale,
+        'Valeur_1M': valeur_marginale * 1_000_000,
+        'Borne_Min': np.fmin(borne_a, borne_b),
+        'Borne_Max': np.fmax(borne_a, borne_b)
+    }, index=pd.Index(model.row_names, name='Contrainte'))
+    return table
+
+
+def parameter_sensitivity(constraints, config):
+    """
+    Derivative of the optimal profit with respect to the scenario parameters
+
+    BUDGET_UTILISE enters the budget, risk (TR × B) and category rows
+    (pct × B × (1 ± ε)); TAUX_RISQUE the risk row; epsilon every category row.
+    """
+    valeur = constraints['Valeur_Marginale']
+    B = config.budget_used
+    epsilon = config.epsilon
+
+    d_budget = valeur['budget'] + valeur['risque'] * config.risk_tolerance
+    d_epsilon = 0.0
+    for categorie, pct in config.allocation.items():
+        if f'{categorie}_min' not in valeur.index:
+            continue
+        d_budget += valeur[f'{categorie}_min'] * pct * (1 - epsilon) + valeur[f'{categorie}_max'] * pct * (1 + epsilon)
+        d_epsilon += -valeur[f'{categorie}_min'] * pct * B + valeur[f'{categorie}_max'] * pct * B
+
+    d_risque = valeur['risque'] * B
+
+    return pd.DataFrame({
+        'Valeur': [B, config.risk_tolerance, epsilon],
+        'Derivee_Profit': [d_budget, d_risque, d_epsilon],
+        'Variation': [1_000_000, 0.01, 0.01],
+        'Impact_Profit': [d_budget * 1_000_000, d_risque * 0.01, d_epsilon * 0.01]
+    }, index=pd.Index(['BUDGET_UTILISE', 'TAUX_RISQUE', 'epsilon'], name='Parametre'))
+
+
+def reduced_costs(lp_result):
+    """
+    Reduced cost of every client in profit terms
+
+    Negative for a rejected client (profit increase needed before it enters
+    the portfolio), positive for a client at its upper bound (profit lost if
+    it had to be dropped), zero for fractional clients.
+    """
+    return -(lp_result.lower.marginals + lp_result.upper.marginals)
+
+
+def sensitivity_report(model, lp_result, config):
+    """
+    Sensitivity report of a solved allocation LP
+
+    Returns:
+    report: dict with 'contraintes' and 'parametres' DataFrames and the
+            per-client 'couts_reduits' array
+    """
+    constraints = constraint_sensitivity(model, lp_result)
+    return {
+        'contraintes': constraints,
+        'parametres': parameter_sensitivity(constraints, config),
+        'couts_reduits': reduced_costs(lp_result)
+    }
+
+
+def print_sensitivity(report):
+    """
+    Short console summary of a sensitivity report
+    """
+    contraintes = report['contraintes']
+    parametres = report['parametres']
+
+    print("\nAnalyse de sensibilité (relaxation linéaire):")
+    print(f"Valeur d'un million de budget supplémentaire: {parametres.loc['BUDGET_UTILISE', 'Impact_Profit']:,.0f} euros")
+    print(f"Valeur d'un point de tolérance au risque: {parametres.loc['TAUX_RISQUE', 'Impact_Profit']:,.0f} euros")
+    print(f"Valeur d'un point de tolérance epsilon: {parametres.loc['epsilon', 'Impact_Profit']:,.0f} euros")
+    saturees = contraintes[contraintes['Saturee']]
+    for nom, ligne in saturees.iterrows():
+        print(f"  {nom}: {ligne['Valeur_Marginale']:+.4f} euros/euro "
+              f"(valide de {ligne['Borne_Min']:,.0f} à {ligne['Borne_Max']:,.0f})")
@@ -0,0 +1,227 @@
+"""
+Resident what-if service over a local HTTP API
+
+The dataset is loaded, cleaned, scored and solved once at start-up
+(compute_scenario); the client arrays, the base solution and an in-memory
+solution cache stay hot. A what-if request only carries scenario parameters
+(risk_tolerance, budget_fraction, allocation, lgd, epsilon): the model is
+rebuilt over the same arrays and solved from the duals of the closest
+previous solution (see solution_cache.warm_start_solve), so a parameter
+change answers in well under a second.
+
+Requests run on a thread pool. Identical requests in flight are coalesced:
+they share one future and the solve happens once.
+
+    GET  /etat        service state, base parameters and counters
+    POST /simulation  {"risk_tolerance": 0.04, "allocation": {...}, "decisions": true}
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from .compliance import evaluate_compliance
+from .metrics import compute_portfolio_metrics
+from .optimizer import optimize
+from .pipeline import compute_scenario
+from .solution_cache import MemorySolutionCache, solution_key, solution_metrics, structure_key
+
+# Paramètres modifiables par une requête
+WHATIF_PARAMETERS = ['risk_tolerance', 'budget_fraction', 'allocation', 'lgd', 'epsilon']
+
+
+class WhatIfService:
+    """
+    Hot scenario state answering what-if requests
+
+    Parameters:
+    config: ScenarioConfig - base scenario
+    raw: pandas DataFrame or None - raw extract (config.dataset if None)
+    store_dir: str - cache directory (PD model, incremental stores)
+    workers: int - threads solving requests
+    data: str or None - path of the extract when it is not config.dataset
+    verbose: bool - print the start-up reports
+    """
+
+    def __init__(self, config, raw=None, store_dir='cache', workers=2, verbose=True, data=None):
+        debut = time.perf_counter()
+        self.config = config
+        self.cache = MemorySolutionCache()
+        # Intentions des clients tirées une fois: une requête change les cibles, pas les données
+        self.base = compute_scenario(config, raw=raw, store_dir=store_dir, verbose=verbose, data=data)
+        self.client_ids = self.base.clients.index.to_numpy()
+        self._seed_cache()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='whatif')
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.stats = {'requetes': 0, 'coalescees': 0, 'resolutions': 0,
+                      'demarrage': time.perf_counter() - debut}
+
+    def _seed_cache(self):
+        """
+        Base solution as first warm-start point of the requests
+        """
+        base, optimization = self.base, self.base.optimization
+        lp_result = optimization.lp_result
+        if lp_result is None or not lp_result.success or optimization.model.extended:
+            return
+        portfolio = base.portfolio
+        self.cache.put(solution_key(portfolio.Mi, portfolio.ri, portfolio.PD, portfolio.codes, self.config),
+                       structure_key(portfolio.Mi, portfolio.codes, portfolio.categories),
+                       lp_result.x, lp_result.ineqlin.marginals, optimization.model.row_names,
+                       solution_metrics(lp_result.x, portfolio, self.config, -float(lp_result.fun),
+                                        optimization.model.n_variables))
+
+    def scenario(self, params):
+        """
+        Base scenario with the request parameters (unknown keys raise ValueError)
+        """
+        inconnus = set(params) - set(WHATIF_PARAMETERS)
+        if inconnus:
+            raise ValueError(f"Paramètres non reconnus: {', '.join(sorted(inconnus))}")
+        changes = {key: params[key] for key in WHATIF_PARAMETERS if key in params}
+        if 'allocation' in changes:
+            intentions = set(changes['allocation']) - set(self.config.allocation)
+            if intentions:
+                raise ValueError(f"Objectifs de prêt inconnus: {', '.join(sorted(intentions))}")
+            changes['allocation'] = {**self.config.allocation, **changes['allocation']}
+        for key in ('risk_tolerance', 'budget_fraction', 'lgd', 'epsilon'):
+            if key in changes and not 0 <= float(changes[key]) <= 1:
+                raise ValueError(f"{key} doit être compris entre 0 et 1")
+        return self.config.with_overrides(**changes)
+
+    def submit(self, params):
+        """
+        Future of the answer to a request, shared with identical requests in flight
+        """
+        config = self.scenario(params)
+        # Clé du scénario normalisé: {} et {"lgd": <LGD de base>} désignent la même simulation
+        cle = json.dumps({key: getattr(config, key) for key in WHATIF_PARAMETERS}, sort_keys=True, default=str)
+        with self._lock:
+            self.stats['requetes'] += 1
+            future = self._pending.get(cle)
+            if future is not None:
+                self.stats['coalescees'] += 1
+                return future
+            future = self.executor.submit(self._solve, config)
+            self._pending[cle] = future
+
+        def liberer(_):
+            with self._lock:
+                self._pending.pop(cle, None)
+        future.add_done_callback(liberer)
+        return future
+
+    def ask(self, params, decisions=False, timeout=None):
+        """
+        Metrics (and optionally the selected client ids) of a what-if request
+        """
+        reponse = dict(self.submit(params).result(timeout))
+        selection = reponse.pop('_Yi')
+        if decisions:
+            reponse['clients_selectionnes_ids'] = self.client_ids[selection > 0].tolist()
+        return reponse
+
+    def _solve(self, config):
+        debut = time.perf_counter()
+        base = self.base
+        optimization = optimize(base.portfolio, config, cache=self.cache)
+        metrics = compute_portfolio_metrics(optimization.Yi, base.portfolio, config.lgd, config.allocation)
+        compliance = evaluate_compliance(base.clients.assign(credit_alloue=(optimization.Yi > 0).astype(int)), metrics, config)
+        with self._lock:
+            self.stats['resolutions'] += 1
+
+        par_categorie = metrics['par_categorie'][['Nb_Clients', 'Montant_Total', 'Profit_Net', 'Part_Reelle']]
+        return {
+            'parametres': {key: getattr(config, key) for key in WHATIF_PARAMETERS},
+            'statut': compliance['statut'],
+            'score_conformite': compliance['score'],
+            'methode': optimization.method,
+            'cache': optimization.cache['statut'] if optimization.cache else None,
+            'clients_selectionnes': metrics['clients_selectionnes'],
+            'montant_total_alloue': float(metrics['montant_total_alloue']),
+            'profit_net': float(metrics['profit_net']),
+            'risque_moyen': float(metrics['risque_moyen']),
+            'roi_net': float(metrics['roi_net']),
+            'par_categorie': par_categorie.to_dict(orient='index'),
+            'duree': time.perf_counter() - debut,
+            '_Yi': np.asarray(optimization.Yi)
+        }
+
+    def state(self):
+        return {
+            'scenario': self.config.id,
+            'clients': len(self.client_ids),
+            'parametres': {key: getattr(self.config, key) for key in WHATIF_PARAMETERS},
+            'solutions_en_cache': len(self.cache),
+            **self.stats
+        }
+
+    def close(self):
+        self.executor.shutdown()
+
+
+def _handler(service):
+    class WhatIfHandler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            corps = json.dumps(payload, ensure_ascii=False, default=float).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(corps)))
+            self.end_headers()
+            self.wfile.write(corps)
+
+        def do_GET(self):
+            if self.path == '/etat':
+                self._send(200, service.state())
+            else:
+                self._send(404, {'erreur': f'Ressource inconnue: {self.path}'})
+
+        def do_POST(self):
+            if self.path != '/simulation':
+                self._send(404, {'erreur': f'Ressource inconnue: {self.path}'})
+                return
+            try:
+                longueur = int(self.headers.get('Content-Length', 0))
+                params = json.loads(self.rfile.read(longueur) or b'{}')
+                if not isinstance(params, dict):
+                    raise ValueError("Le corps de la requête doit être un objet JSON")
+                decisions = bool(params.pop('decisions', False))
+                self._send(200, service.ask(params, decisions=decisions))
+            except (ValueError, TypeError) as e:
+                self._send(400, {'erreur': str(e)})
+            except Exception as e:
+                self._send(500, {'erreur': f"Erreur lors de la simulation: {e}"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return WhatIfHandler
+
+
+def make_server(service, host='127.0.0.1', port=8765):
+    """
+    HTTP server of a WhatIfService (one thread per connection)
+    """
+    return ThreadingHTTPServer((host, port), _handler(service))
+
+
+def serve(config, raw=None, host='127.0.0.1', port=8765, store_dir='cache', workers=2, verbose=True, data=None):
+    """
+    Start the service and answer requests until interrupted
+    """
+    service = WhatIfService(config, raw=raw, store_dir=store_dir, workers=workers, verbose=verbose, data=data)
+    server = make_server(service, host, port)
+    print(f"Service de simulation prêt sur http://{host}:{server.server_port} "
+          f"({len(service.client_ids):,} clients, démarrage {service.stats['demarrage']:.1f}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Arrêt du service")
+    finally:
+        server.server_close()
+        service.close()
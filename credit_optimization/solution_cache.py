@@ -0,0 +1,324 @@
+"""
+On-disk cache of allocation LP solutions
+
+The key is a SHA-256 of the optimizer inputs (Mi, ri, PD, intent codes) and
+of the scenario parameters the model depends on (TAUX_RISQUE,
+BUDGET_UTILISE, repartition, epsilon, LGD, robust section). An entry keeps
+the relaxed solution, the duals and the portfolio metrics of the solve in a
+.npz file; index.json records sizes and last use, and the least recently
+used entries are evicted once the cache exceeds max_bytes.
+
+A hit rebuilds the solver result without solving. A near miss (same
+clients and intents, other parameters or PD) is a warm start: the cached
+duals price every client, clients with a clearly positive or negative
+reduced cost are fixed, and only the undecided ones are solved. The fixings
+are then checked against the duals of that restricted LP and the
+violators released until the reduced costs of every fixed client have the
+right sign (the solution is then optimal for the full LP).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from scipy.optimize import OptimizeResult, linprog
+
+CACHE_VERSION = 1
+
+DEFAULTS = {
+    'directory': None,
+    'max_mb': 200,
+    'warm_start': True,
+    'band': 0.05,
+    'max_rounds': 5
+}
+
+_TOL = 1e-9
+
+
+def solution_cache_params(config, **overrides):
+    """
+    Solution cache parameters of a scenario (config.solution_cache over DEFAULTS)
+    """
+    params = dict(DEFAULTS)
+    params.update(config.solution_cache or {})
+    params.update({key: value for key, value in overrides.items() if value is not None})
+    return params
+
+
+def _hash_arrays(digest, *arrays):
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str((array.dtype.str, array.shape)).encode())
+        digest.update(array.tobytes())
+
+
+def model_parameters(config):
+    """
+    Scenario parameters the allocation model depends on
+    """
+    robust = config.robust if config.robust and config.robust.get('enabled') else None
+    return {
+        'risk_tolerance': config.risk_tolerance, 'budget_used': config.budget_used,
+        'allocation': config.allocation, 'epsilon': config.epsilon, 'lgd': config.lgd,
+        'noise_std': config.scoring.get('noise_std') if robust else None, 'robust': robust
+    }
+
+
+def solution_key(Mi, ri, PD, codes, config):
+    digest = hashlib.sha256(f'v{CACHE_VERSION}'.encode())
+    _hash_arrays(digest, np.asarray(Mi, dtype=np.float64), np.asarray(ri, dtype=np.float64),
+                 np.asarray(PD, dtype=np.float64), np.asarray(codes, dtype=np.int64))
+    digest.update(json.dumps(model_parameters(config), sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:32]
+
+
+def structure_key(Mi, codes, categories):
+    """
+    Key of the near-miss candidates: same clients, amounts and intents
+    """
+    digest = hashlib.sha256(f'v{CACHE_VERSION}'.encode())
+    _hash_arrays(digest, np.asarray(Mi, dtype=np.float64), np.asarray(codes, dtype=np.int64))
+    digest.update(json.dumps(list(categories)).encode())
+    return digest.hexdigest()[:32]
+
+
+def solution_metrics(x, portfolio, config, profit_lp, n_variables):
+    """
+    Portfolio metrics of a relaxed solution, stored with its entry so that a
+    hit reports them without recomputing (amounts weighted by the fractions)
+    """
+    Y = np.clip(np.asarray(x[:len(portfolio)], dtype=np.float64), 0.0, 1.0)
+    montant = portfolio.Mi * Y
+    total = float(montant.sum())
+    return {
+        'profit_lp': profit_lp,
+        'variables': n_variables,
+        'clients_selectionnes': int((Y > 1e-7).sum()),
+        'montant_total_alloue': total,
+        'profit_net': float((montant * (portfolio.ri - portfolio.PD * config.lgd)).sum()),
+        'risque_moyen': float((montant * portfolio.PD).sum() / total) if total > 0 else 0.0
+    }
+
+
+def lp_result_from_solution(model, x, duals, message=''):
+    """
+    Solver result of a solution given its duals (linprog/HiGHS conventions)
+
+    lower/upper marginals split the reduced costs c - Aᵀy by sign.
+    """
+    A = model.A_ub
+    reduits = model.c - A.T @ duals
+    return OptimizeResult(
+        x=x, fun=float(model.c @ x), success=True, status=0, message=message,
+        ineqlin=OptimizeResult(residual=model.b_ub - A @ x, marginals=duals),
+        lower=OptimizeResult(residual=x, marginals=np.maximum(reduits, 0.0)),
+        upper=OptimizeResult(residual=1.0 - x, marginals=np.minimum(reduits, 0.0))
+    )
+
+
+class SolutionCache:
+    """
+    Directory of cached LP solutions with size-based LRU eviction
+
+    Parameters:
+    directory: str
+    max_bytes: int - total size kept on disk
+    warm_start: bool - start near misses from the cached duals
+    band, max_rounds: see warm_start_solve
+    """
+
+    def __init__(self, directory, max_bytes=200 * 1024 * 1024, warm_start=True, band=0.05, max_rounds=5):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.warm_start = warm_start
+        self.band = band
+        self.max_rounds = max_rounds
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, 'index.json')
+        self.index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Entrées dont le fichier a disparu
+        return {key: entry for key, entry in index.items() if os.path.exists(self._path(key))}
+
+    def _save_index(self):
+        tmp = self._index_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(tmp, self._index_path)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.npz')
+
+    @property
+    def size(self):
+        return sum(entry['taille'] for entry in self.index.values())
+
+    def get(self, key):
+        """
+        Cached entry (dict of arrays and metadata) or None
+        """
+        if key not in self.index:
+            return None
+        try:
+            with np.load(self._path(key), allow_pickle=False) as data:
+                entry = {name: data[name] for name in data.files}
+        except (OSError, ValueError):
+            self.index.pop(key, None)
+            self._save_index()
+            return None
+        entry['metrics'] = json.loads(str(entry['metrics']))
+        self.index[key]['dernier_acces'] = time.time()
+        self._save_index()
+        return entry
+
+    def nearest(self, structure):
+        """
+        Most recently used entry with the same structure key, or None
+        """
+        candidats = [key for key, entry in self.index.items() if entry['structure'] == structure]
+        if not candidats:
+            return None
+        return self.get(max(candidats, key=lambda key: self.index[key]['dernier_acces']))
+
+    def put(self, key, structure, x, duals, row_names, metrics):
+        """
+        Store a solution and evict the least recently used entries over max_bytes
+        """
+        path = self._path(key)
+        np.savez(path, x=x, duals=duals, row_names=np.array(row_names), metrics=json.dumps(metrics))
+        maintenant = time.time()
+        self.index[key] = {'structure': structure, 'taille': os.path.getsize(path),
+                           'creation': maintenant, 'dernier_acces': maintenant}
+        self.evict()
+        self._save_index()
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits in max_bytes
+        """
+        supprimees = []
+        for key in sorted(self.index, key=lambda key: self.index[key]['dernier_acces']):
+            if self.size <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            del self.index[key]
+            supprimees.append(key)
+        return supprimees
+
+
+class MemorySolutionCache:
+    """
+    In-process variant of SolutionCache (same interface, nothing written)
+
+    Keeps the max_entries most recently used solutions; safe to share
+    between threads.
+    """
+
+    def __init__(self, max_entries=64, warm_start=True, band=0.05, max_rounds=5):
+        self.max_entries = max_entries
+        self.warm_start = warm_start
+        self.band = band
+        self.max_rounds = max_rounds
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def nearest(self, structure):
+        with self._lock:
+            for key in reversed(self.entries):
+                if self.entries[key]['structure'] == structure:
+                    self.entries.move_to_end(key)
+                    return self.entries[key]
+        return None
+
+    def put(self, key, structure, x, duals, row_names, metrics):
+        with self._lock:
+            self.entries[key] = {'structure': structure, 'x': x, 'duals': duals,
+                                 'row_names': np.array(row_names), 'metrics': metrics}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+def open_solution_cache(config, store_dir='cache'):
+    """
+    Solution cache of a scenario (directory defaults to <store_dir>/solutions)
+    """
+    params = solution_cache_params(config)
+    return SolutionCache(
+        params['directory'] or os.path.join(store_dir, 'solutions'), max_bytes=int(params['max_mb'] * 1024 * 1024),
+        warm_start=params['warm_start'], band=params['band'], max_rounds=params['max_rounds']
+    )
+
+
+def warm_start_solve(model, duals, band=0.05, max_rounds=5):
+    """
+    Solve the allocation LP starting from the duals of a neighbouring problem
+
+    Clients whose reduced cost under the previous duals exceeds band × |cᵢ|
+    are fixed (to 0 if positive, 1 if negative) and the others solved as a
+    restricted LP. Fixings contradicted by the new duals are released and
+    the restricted LP solved again (the band is widened when the fixings
+    make it infeasible); once all of them agree the solution is optimal for
+    the full model.
+
+    Returns:
+    (lp_result, report) or (None, report) when the warm start did not conclude
+    """
+    A = np.asarray(model.A_ub)
+    c, b = model.c, model.b_ub
+    seuil = band * np.maximum(np.abs(c), _TOL)
+
+    reduits_initiaux = c - A.T @ duals
+    libres = np.abs(reduits_initiaux) <= seuil
+    a_un = (reduits_initiaux < 0) & ~libres
+
+    report = {'variables': len(c), 'tours': 0, 'variables_libres': int(libres.sum())}
+    for tour in range(max_rounds):
+        report['tours'] = tour + 1
+        report['variables_libres'] = int(libres.sum())
+        b_reduit = b - A[:, a_un].sum(axis=1)
+        res = linprog(c[libres], A_ub=A[:, libres], b_ub=b_reduit, bounds=(0, 1), method='highs')
+        if not res.success:
+            # Fixations incompatibles avec les nouvelles contraintes: bande élargie
+            seuil = seuil * 4
+            libres |= np.abs(reduits_initiaux) <= seuil
+            a_un &= ~libres
+            continue
+
+        y = res.ineqlin.marginals
+        reduits = c - A.T @ y
+        # Un client fixé à 1 doit avoir un coût réduit ≤ 0, fixé à 0 un coût réduit ≥ 0
+        violations = (a_un & (reduits > _TOL * np.maximum(1.0, np.abs(c)))) | \
+                     (~libres & ~a_un & (reduits < -_TOL * np.maximum(1.0, np.abs(c))))
+        if not violations.any():
+            x = a_un.astype(np.float64)
+            x[libres] = res.x
+            return lp_result_from_solution(model, x, y, message=res.message), report
+        libres |= violations
+        a_un &= ~violations
+
+    return None, report
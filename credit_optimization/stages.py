@@ -0,0 +1,385 @@
+"""
+Checkpointed stage graph of a scenario
+
+    load → clean → encode → score → build → solve → repair → metrics → export
+                                                                     → plots
+
+The output of every stage is pickled in <store_dir>/stages/<scenario>/ under
+a key hashing the stage, its parameters (the configuration sections it
+reads) and the digests of the outputs of its inputs. A rerun skips every
+stage whose key already has a checkpoint and only loads the checkpoints the
+recomputed stages need: after a failure (workbook open in Excel, solver
+error...) the run resumes after the last completed stage, and a changed
+parameter only recomputes the stages that read it and the stages below.
+Since a key depends on the digest of the upstream outputs rather than on
+their keys, a recomputed stage whose output did not change leaves the
+stages below it untouched. Export and plots checkpoints are only reused
+while the files they wrote still exist.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import time
+from dataclasses import dataclass
+
+import pandas as pd
+
+from .dashboard import render_dashboard
+from .optimizer import build_models, emergency_result, finish_optimization, solve_models
+from .pd_model import pd_model_params
+from .pipeline import (
+    CLEANING_VERSION, PipelineError, analyse_scenario, clean_clients, dashboard_job, export_results,
+    load_dataset, optimizer_inputs, scenario_pd_model
+)
+from .scoring import FEATURE_COLUMNS, encode_features, score_encoded
+from .solution_cache import model_parameters, open_solution_cache
+
+STAGES_VERSION = 1
+
+DEFAULTS = {
+    'directory': None,
+    'keep': 2,
+    'rerun': []
+}
+
+
+def checkpoint_params(config, **overrides):
+    """
+    Checkpoint parameters of a scenario (config.checkpoints over DEFAULTS)
+    """
+    params = dict(DEFAULTS)
+    params.update(config.checkpoints or {})
+    params.update({key: value for key, value in overrides.items() if value is not None})
+    return params
+
+
+def _enabled(section):
+    return section if section and section.get('enabled') else None
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return [os.path.abspath(path), stat.st_mtime_ns, stat.st_size]
+
+
+def _written_files(output):
+    # Chemins écrits par une étape d'export (valeurs str et listes 'files')
+    if not isinstance(output, dict):
+        return []
+    fichiers = [value for value in output.values() if isinstance(value, str)]
+    return fichiers + list(output.get('files', []))
+
+
+class CheckpointStore:
+    """
+    Stage outputs of one scenario on disk
+
+    Each checkpoint is <stage>_<key>.pkl; manifest.json records its digest,
+    date, duration and the files the stage wrote. Files are written to a
+    temporary name then renamed, so an interrupted run never leaves a
+    truncated checkpoint. Only the keep most recent checkpoints of a stage
+    are kept.
+    """
+
+    def __init__(self, directory, keep=2):
+        self.directory = directory
+        self.keep = max(1, int(keep))
+        os.makedirs(directory, exist_ok=True)
+        self._manifest_path = os.path.join(directory, 'manifest.json')
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        try:
+            with open(self._manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return manifest if manifest.get('version') == STAGES_VERSION else {}
+
+    def _save_manifest(self):
+        self.manifest['version'] = STAGES_VERSION
+        tmp = self._manifest_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self._manifest_path)
+
+    def _path(self, stage, key):
+        return os.path.join(self.directory, f'{stage}_{key}.pkl')
+
+    def lookup(self, stage, key):
+        """
+        Manifest entry of a usable checkpoint, or None
+        """
+        entry = self.manifest.get('etapes', {}).get(stage, {}).get(key)
+        if entry is None or not os.path.exists(self._path(stage, key)):
+            return None
+        if not all(os.path.exists(path) for path in entry['fichiers']):
+            return None
+        return entry
+
+    def load(self, stage, key):
+        with open(self._path(stage, key), 'rb') as f:
+            return pickle.load(f)
+
+    def save(self, stage, key, output, duration, files=()):
+        """
+        Write a stage output and return its digest
+        """
+        data = pickle.dumps(output, protocol=pickle.HIGHEST_PROTOCOL)
+        digest = hashlib.sha256(data).hexdigest()[:32]
+        path = self._path(stage, key)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.tmp', path)
+
+        entries = self.manifest.setdefault('etapes', {}).setdefault(stage, {})
+        entries[key] = {'digest': digest, 'horodatage': time.time(), 'duree': duration, 'octets': len(data),
+                        'fichiers': list(files)}
+        # Checkpoints les plus anciens de l'étape supprimés au-delà de keep
+        for ancienne in sorted(entries, key=lambda k: entries[k]['horodatage'])[:-self.keep]:
+            del entries[ancienne]
+            try:
+                os.remove(self._path(stage, ancienne))
+            except OSError:
+                pass
+        self._save_manifest()
+        return digest
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    A node of the graph: run(context, *outputs of inputs) -> output
+    """
+    name: str
+    inputs: tuple
+    params: object
+    run: object
+    writes_files: bool = False
+
+
+class _Context:
+    def __init__(self, config, raw, output_dir, store_dir, verbose, data=None):
+        self.config = config
+        self.raw = raw
+        self.data = data or config.dataset
+        self.output_dir = output_dir
+        self.store_dir = store_dir
+        self.verbose = verbose
+
+    def log(self, *args):
+        if self.verbose:
+            print(*args)
+
+
+def _solver_error(config, error):
+    # Erreur du solveur conservée pour la sélection de secours, si le scénario l'autorise
+    if not config.fallback.get('emergency_selection', False):
+        raise PipelineError(f"Erreur lors de l'optimisation: {error}") from error
+    return error
+
+
+def _load(ctx):
+    raw = ctx.raw if ctx.raw is not None else load_dataset(ctx.data)
+    ctx.log(f"Dataset original: {raw.shape[0]} clients")
+    return raw
+
+
+def _load_params(ctx):
+    if ctx.raw is not None:
+        return {'extrait': hashlib.sha256(pd.util.hash_pandas_object(ctx.raw).values.tobytes()).hexdigest()}
+    return {'dataset': _file_signature(ctx.data)}
+
+
+def _clean(ctx, raw):
+    return clean_clients(raw, ctx.config, ctx.store_dir, ctx.verbose)
+
+
+def _encode(ctx, df_clean):
+    return encode_features(df_clean)
+
+
+def _score(ctx, encoded):
+    pd_model = scenario_pd_model(ctx.config, ctx.store_dir, ctx.verbose, ctx.data)
+    df = score_encoded(encoded.copy(), ctx.config, pd_model=pd_model)
+    clients, portfolio = optimizer_inputs(df, ctx.config, ctx.verbose)
+    return {'df': df, 'clients': clients, 'portfolio': portfolio, 'pd_model': pd_model}
+
+
+def _score_params(ctx):
+    config = ctx.config
+    params = {key: getattr(config, key) for key in ('scoring', 'returns', 'intents', 'allocation')}
+    params['pd_model'] = _enabled(config.pd_model)
+    if params['pd_model']:
+        params['apprentissage'] = _file_signature(pd_model_params(config)['training_data'] or ctx.data)
+    return params
+
+
+def _build(ctx, score):
+    try:
+        nominal, model = build_models(score['portfolio'], ctx.config)
+    except Exception as e:
+        return {'nominal': None, 'model': None, 'erreur': _solver_error(ctx.config, e)}
+    return {'nominal': nominal, 'model': model, 'erreur': None}
+
+
+def _solve(ctx, score, build):
+    if build['erreur'] is not None:
+        return {'lp_result': None, 'cache': None, 'reports': None, 'erreur': build['erreur']}
+    config = ctx.config
+    try:
+        cache = open_solution_cache(config, ctx.store_dir) if _enabled(config.solution_cache) else None
+        lp_result, cache_report, reports = solve_models(build['model'], score['portfolio'], config, cache)
+    except Exception as e:
+        return {'lp_result': None, 'cache': None, 'reports': None, 'erreur': _solver_error(config, e)}
+    return {'lp_result': lp_result, 'cache': cache_report, 'reports': reports, 'erreur': None}
+
+
+def _repair(ctx, score, build, solve):
+    config, portfolio = ctx.config, score['portfolio']
+    erreur = solve['erreur']
+    if erreur is None:
+        try:
+            return finish_optimization(solve['lp_result'], build['nominal'], build['model'], portfolio, config,
+                                       solve['cache'], solve['reports'])
+        except Exception as e:
+            erreur = e
+    try:
+        return emergency_result(portfolio, config, erreur, build['model'])
+    except Exception as e:
+        raise PipelineError(f"Erreur lors de l'optimisation: {e}") from e
+
+
+def _metrics(ctx, score, optimization):
+    return analyse_scenario(ctx.config, score['df'], score['clients'].copy(), score['portfolio'], optimization,
+                            {}, None, score['pd_model'], ctx.verbose)
+
+
+def _metrics_params(ctx):
+    # Toutes les sections sauf celles qui ne changent que les sorties ou la vitesse
+    exclues = {'title', 'description', 'output', 'model_export', 'solution_cache', 'checkpoints'}
+    return {'configuration': ctx.config.fingerprint(*[key for key in ctx.config.to_dict() if key not in exclues])}
+
+
+def _export(ctx, result):
+    ctx.log("\nExport des résultats")
+    return export_results(result, ctx.output_dir, ctx.verbose)
+
+
+def _plots(ctx, result):
+    job = dashboard_job(result, ctx.output_dir)
+    if job is None:
+        return None
+    args, kwargs = job
+    rapport = render_dashboard(*args, **kwargs)
+    ctx.log(f"Visualisations sauvegardées: {len(rapport['files'])} fichiers (rendu en {rapport['duration']:.1f}s)")
+    return rapport
+
+
+def _output_params(ctx):
+    return {'output': ctx.config.output, 'model_export': _enabled(ctx.config.model_export),
+            'dossier': os.path.abspath(ctx.output_dir)}
+
+
+STAGES = [
+    Stage('load', (), _load_params, _load),
+    Stage('clean', ('load',), lambda ctx: {'version': CLEANING_VERSION, 'outliers': _enabled(ctx.config.outliers)},
+          _clean),
+    Stage('encode', ('clean',), lambda ctx: {'colonnes': FEATURE_COLUMNS}, _encode),
+    Stage('score', ('encode',), _score_params, _score),
+    Stage('build', ('score',), lambda ctx: model_parameters(ctx.config), _build),
+    Stage('solve', ('score', 'build'),
+          lambda ctx: {'dual_solver': _enabled(ctx.config.dual_solver), 'scaling': _enabled(ctx.config.scaling)},
+          _solve),
+    Stage('repair', ('score', 'build', 'solve'),
+          lambda ctx: {'partial_funding': _enabled(ctx.config.partial_funding), 'fallback': ctx.config.fallback},
+          _repair),
+    Stage('metrics', ('score', 'repair'), _metrics_params, _metrics),
+    Stage('export', ('metrics',), _output_params, _export, writes_files=True),
+    Stage('plots', ('metrics',), lambda ctx: {'output': ctx.config.output, 'dossier': os.path.abspath(ctx.output_dir)},
+          _plots, writes_files=True)
+]
+
+STAGE_NAMES = [stage.name for stage in STAGES]
+
+
+def stage_key(stage, ctx, input_digests):
+    payload = json.dumps({'version': STAGES_VERSION, 'etape': stage.name, 'parametres': stage.params(ctx),
+                          'entrees': input_digests}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+def run_stages(config, raw=None, output_dir='.', store_dir='cache', verbose=True, data=None):
+    """
+    Compute and export a scenario through the checkpointed stage graph
+
+    Parameters:
+    config: ScenarioConfig - config.checkpoints gives the directory
+            (default <store_dir>/stages/<id>), the checkpoints kept per
+            stage and the stages to recompute anyway (rerun)
+    raw: pandas DataFrame or None - raw extract; data (or config.dataset)
+         is read by the load stage if None (and only when the file changed)
+    data: str or None - path of the extract when it is not config.dataset;
+          also the PD model training data unless pd_model.training_data is set
+
+    Returns:
+    result: ScenarioResult - stages maps every stage to its status
+            ('calcul' or 'checkpoint'), duration and key
+    """
+    params = checkpoint_params(config)
+    inconnues = set(params['rerun']) - set(STAGE_NAMES)
+    if inconnues:
+        raise PipelineError(f"Étapes inconnues: {', '.join(sorted(inconnues))}")
+    store = CheckpointStore(params['directory'] or os.path.join(store_dir, 'stages', config.id), params['keep'])
+    ctx = _Context(config, raw, output_dir, store_dir, verbose, data)
+    ctx.log(config.title)
+
+    stages = {stage.name: stage for stage in STAGES}
+    keys, digests, values, report = {}, {}, {}, {}
+
+    def execute(stage):
+        start = time.perf_counter()
+        try:
+            output = stage.run(ctx, *[value(name) for name in stage.inputs])
+        except PipelineError:
+            raise
+        except Exception as e:
+            raise PipelineError(f"Erreur à l'étape {stage.name}: {e}") from e
+        duree = time.perf_counter() - start
+        values[stage.name] = output
+        digests[stage.name] = store.save(stage.name, keys[stage.name], output, duree,
+                                         _written_files(output) if stage.writes_files else ())
+        report[stage.name] = {'statut': 'calcul', 'duree': duree, 'cle': keys[stage.name]}
+
+    def value(name):
+        # Checkpoint chargé à la demande; illisible: l'étape est recalculée
+        if name not in values:
+            try:
+                values[name] = store.load(name, keys[name])
+            except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+                execute(stages[name])
+        return values[name]
+
+    for stage in STAGES:
+        keys[stage.name] = stage_key(stage, ctx, [digests[name] for name in stage.inputs])
+        entry = None if stage.name in params['rerun'] else store.lookup(stage.name, keys[stage.name])
+        if entry is None:
+            execute(stage)
+        else:
+            digests[stage.name] = entry['digest']
+            report[stage.name] = {'statut': 'checkpoint', 'duree': 0.0, 'cle': keys[stage.name]}
+
+    reprises = [name for name in STAGE_NAMES if report[name]['statut'] == 'checkpoint']
+    calculees = [name for name in STAGE_NAMES if report[name]['statut'] == 'calcul']
+    ctx.log(f"\nÉtapes reprises des checkpoints: {', '.join(reprises) or 'aucune'}")
+    ctx.log(f"Étapes exécutées: {', '.join(calculees) or 'aucune'} "
+            f"({sum(report[name]['duree'] for name in calculees):.1f}s)")
+
+    result = value('metrics')
+    # Sections hors clé (titre, sorties) reprises de la configuration courante
+    result.config = config
+    result.outputs = {**value('export'), 'dashboard': value('plots')}
+    result.stages = report
+    return result
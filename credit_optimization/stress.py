@@ -0,0 +1,172 @@
+"""
+Macro stress testing of a selected portfolio (no new solve)
+
+A stress s shocks the PD of every client of intent c:
+
+    PDˢᵢ = clip(mₛ,c × PDᵢ + aₛ,c, 0, 1)
+
+with a multiplier m and an add-on a per intent (uniform shocks use the same
+value for every intent; the Scenario 2 adjustment base of +0.04 applied to
+the Scenario 1 book is a = 0.04). The S stressed PD vectors of the funded
+clients form an S × N matrix, built and reduced in chunks of chunk_size
+stresses; one matrix product per chunk gives the stressed expected loss,
+risk ratio and profit of every stress, and the breach flags:
+
+    Depassement_Limite:     Σ PDˢ × Mi × Yi > TR × budget utilisé
+    Depassement_Conformite: risque moyen > compliance.max_risk
+    Perte_Nette:            profit net stressé < 0
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+DEFAULTS = {
+    'chunk_size': 64,
+    'multipliers': [1.1, 1.25, 1.5, 2.0, 3.0],
+    'add_ons': [0.01, 0.02, 0.04],
+    'intent_multiplier': 2.0,
+    'shocks': []
+}
+
+
+def stress_params(config, **overrides):
+    """
+    Stress parameters of a scenario (config.stress over DEFAULTS)
+    """
+    params = dict(DEFAULTS)
+    params.update(config.stress or {})
+    params.update({key: value for key, value in overrides.items() if value is not None})
+    return params
+
+
+def _per_intent(value, categories, default):
+    # Valeur uniforme, ou dictionnaire par objectif de prêt (les autres gardent default)
+    if isinstance(value, dict):
+        inconnus = set(value) - set(categories)
+        if inconnus:
+            raise ValueError(f"Objectifs de prêt inconnus dans un choc: {', '.join(sorted(inconnus))}")
+        return [float(value.get(cat, default)) for cat in categories]
+    return [float(value)] * len(categories)
+
+
+def build_shocks(params, categories):
+    """
+    Shock matrices of the stresses of a scenario
+
+    The stresses are the base case, the uniform multipliers, the uniform
+    add-ons, intent_multiplier applied to each intent alone, then the
+    custom shocks ({"name", "multiplier", "add"}, each a number or a dict
+    per intent).
+
+    Returns:
+    names: list of str
+    multipliers, add_ons: numpy arrays S × (categories + 1); the last column
+                          applies to clients of an unknown intent
+    """
+    noms, mult, add = ['Base'], [[1.0] * len(categories)], [[0.0] * len(categories)]
+    for m in params['multipliers']:
+        noms.append(f'PD x{m:g}')
+        mult.append([float(m)] * len(categories))
+        add.append([0.0] * len(categories))
+    for a in params['add_ons']:
+        noms.append(f'PD +{a:g}')
+        mult.append([1.0] * len(categories))
+        add.append([float(a)] * len(categories))
+    if params['intent_multiplier']:
+        for cat in categories:
+            noms.append(f"{cat} x{params['intent_multiplier']:g}")
+            mult.append(_per_intent({cat: params['intent_multiplier']}, categories, 1.0))
+            add.append([0.0] * len(categories))
+    for choc in params['shocks']:
+        noms.append(choc['name'])
+        mult.append(_per_intent(choc.get('multiplier', 1.0), categories, 1.0))
+        add.append(_per_intent(choc.get('add', 0.0), categories, 0.0))
+
+    # Colonne des objectifs inconnus: choc uniforme moyen
+    multipliers = np.array(mult)
+    add_ons = np.array(add)
+    return noms, np.column_stack([multipliers, multipliers.mean(axis=1)]), \
+        np.column_stack([add_ons, add_ons.mean(axis=1)])
+
+
+def stress_test(Yi, portfolio, config, names, multipliers, add_ons, chunk_size=64):
+    """
+    Stressed metrics of a fixed portfolio for S stresses
+
+    Parameters:
+    Yi: numpy array - decision (funded fraction) per client
+    portfolio: Portfolio - optimizer inputs
+    config: ScenarioConfig
+    names, multipliers, add_ons: see build_shocks
+    chunk_size: int - stresses per S × N block
+
+    Returns:
+    table: pandas DataFrame indexed by stress
+    """
+    Yi = np.asarray(Yi, dtype=np.float64)
+    finances = Yi > 0
+    # Seuls les clients financés entrent dans la matrice
+    exposition = (portfolio.Mi * Yi)[finances]
+    pd_base = portfolio.PD[finances]
+    codes = portfolio.codes[finances]
+    revenus = float(exposition @ portfolio.ri[finances])
+    montant = float(exposition.sum())
+    limite = config.risk_tolerance * config.budget_used
+
+    S = len(names)
+    risque = np.empty(S)
+    pd_moyenne = np.empty(S)
+    for debut in range(0, S, chunk_size):
+        fin = min(debut + chunk_size, S)
+        # Bloc (fin - debut) × N des PD choquées
+        bloc = np.clip(multipliers[debut:fin][:, codes] * pd_base + add_ons[debut:fin][:, codes], 0.0, 1.0)
+        risque[debut:fin] = bloc @ exposition
+        pd_moyenne[debut:fin] = bloc.mean(axis=1) if len(pd_base) else 0.0
+
+    pertes = risque * config.lgd
+    risque_moyen = risque / montant if montant > 0 else np.zeros(S)
+    table = pd.DataFrame({
+        'PD_Moyenne': pd_moyenne,
+        'Risque_Moyen': risque_moyen,
+        'Pertes_Attendues': pertes,
+        'Profit_Net': revenus - pertes,
+        'ROI_Net': (revenus - pertes) / montant if montant > 0 else np.zeros(S),
+        'Utilisation_Limite_Risque': risque / limite if limite > 0 else np.inf,
+        'Depassement_Limite': risque > limite * (1 + 1e-9),
+        'Depassement_Conformite': risque_moyen > config.compliance['max_risk'],
+        'Perte_Nette': revenus - pertes < 0
+    }, index=pd.Index(names, name='Stress'))
+    return table
+
+
+def run_stress(Yi, portfolio, config, params=None):
+    """
+    Stress table of a scenario (stresses from build_shocks)
+
+    Returns:
+    table: pandas DataFrame (see stress_test)
+    duration: float - seconds
+    """
+    debut = time.perf_counter()
+    params = params or stress_params(config)
+    names, multipliers, add_ons = build_shocks(params, config.categories)
+    table = stress_test(Yi, portfolio, config, names, multipliers, add_ons, params['chunk_size'])
+    return table, time.perf_counter() - debut
+
+
+def print_stress(table, duration):
+    ruptures = table[table['Depassement_Limite'] | table['Depassement_Conformite'] | table['Perte_Nette']]
+    print(f"Tests de résistance: {len(table)} chocs de PD en {duration*1000:.0f} ms, "
+          f"{len(ruptures)} avec dépassement")
+    pire = table['Pertes_Attendues'].idxmax()
+    print(f"  Choc le plus sévère: {pire} - risque moyen {table.loc[pire, 'Risque_Moyen']:.2%}, "
+          f"profit net {table.loc[pire, 'Profit_Net']:,.0f} euros")
+    for nom, ligne in ruptures.head(10).iterrows():
+        motifs = [libelle for colonne, libelle in [('Depassement_Limite', 'limite de risque'),
+                                                   ('Depassement_Conformite', 'risque max de conformité'),
+                                                   ('Perte_Nette', 'perte nette')] if ligne[colonne]]
+        print(f"  - {nom}: {', '.join(motifs)} (risque moyen {ligne['Risque_Moyen']:.2%})")
+    if len(ruptures) > 10:
+        print(f"  ... et {len(ruptures) - 10} autres")
@@ -0,0 +1,17 @@
+"""
+Worker processes shared by the parallel stages
+"""
+
+import multiprocessing
+import os
+
+
+def process_context():
+    # Les workers ne doivent pas hériter des threads de l'appelant (fork): forkserver ou spawn
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def default_workers():
+    """Number of worker processes when none is configured"""
+    return os.cpu_count() or 1
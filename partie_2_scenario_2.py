@@ -2,569 +2,14 @@
 Scénario 2 : Sécurisation des Actifs
 Stratégie d'optimisation pour période de ralentissement économique
 Protège le capital avec un risque très faible (≤ 5%)
-"""
-
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.optimize import linprog
-import warnings
-warnings.filterwarnings('ignore')
-
-# Import data cleaning module
-from data_cleaning_module import clean_dataset
-
-# Configuration pour l'affichage
-plt.style.use('default')
-sns.set_palette("husl")
-
-print("Scénario 2 : Sécurisation des Actifs")
-print("Chargement et nettoyage des données...")
-
-try:
-    df_original = pd.read_excel('content/credit_risk_dataset.xlsx')
-    print(f"Dataset original: {df_original.shape[0]} clients")
-
-    # Data cleaning and validation
-    df_clean, cleaning_report = clean_dataset(df_original, "Scénario 2 - Sécurisation des Actifs")
-
-    # Préprocessing
-    df = df_clean.copy()
-    df = df.dropna()
-    
-    # Encodage des variables catégorielles
-    df_encoded = pd.get_dummies(df, columns=['person_home_ownership', 'loan_intent'], drop_first=False)
-    
-    # Créer la colonne person_home_ownership_RENT si nécessaire
-    if 'person_home_ownership_RENT' not in df_encoded.columns:
-        df_encoded['person_home_ownership_RENT'] = (df['person_home_ownership'] == 'RENT').astype(int)
-    
-    # Sélection des features importantes
-    feature_columns = [
-        'person_age', 'person_income', 'person_emp_length', 'loan_amnt', 
-        'loan_int_rate', 'loan_percent_income', 'cb_person_cred_hist_length',
-        'person_home_ownership_RENT'
-    ]
-    
-    # Copier les colonnes vers df
-    for col in feature_columns:
-        if col in df_encoded.columns:
-            df[col] = df_encoded[col]
-    
-    available_features = [col for col in feature_columns if col in df.columns]
-
-    base_risk_score = (
-        (df['loan_percent_income'] * 0.45) +  # Impact plus fort du ratio prêt/revenu
-        (df['loan_int_rate'] / 100 * 0.35) +  # Taux d'intérêt plus pénalisant
-        ((df['person_age'] < 25).astype(int) * 0.20) +  # Jeunes plus vulnérables
-        ((df['person_age'] > 60).astype(int) * 0.15) +  # Seniors plus à risque
-        ((df['person_emp_length'] < 2).astype(int) * 0.18) +  # Emploi instable critique
-        ((df['cb_person_cred_hist_length'] < 3).astype(int) * 0.15) +  # Historique court pénalisant
-        ((df['person_income'] < 40000).astype(int) * 0.12)  # Revenus faibles plus risqués
-    )
-    
-    # Ajustements pour le Scénario 2 (conditions économiques défavorables mais réalistes)
-    scenario2_adjustments = (
-        +0.04 +  # Augmentation modérée de 4% pour ralentissement économique
-        +(df['person_income'] < 25000).astype(int) * 0.03 +  # Pénalité revenus très faibles
-        +(df['person_emp_length'] < 0.5).astype(int) * 0.03 +  # Pénalité emploi très récent
-        +(df['cb_person_cred_hist_length'] < 1).astype(int) * 0.02 +  # Pénalité historique très court
-        +(df['loan_percent_income'] > 0.30).astype(int) * 0.03 +  # Pénalité ratio très élevé
-        -(df['person_income'] > 100000).astype(int) * 0.015  # Bonus revenus élevés
-    )
-
-    # Score de risque final avec distribution adaptée au ralentissement
-    df['risk_score'] = np.maximum(0.015, base_risk_score + scenario2_adjustments)
-
-    # Probabilité de défaut calibrée pour Scénario 2 - optimisée pour 6500-7500 clients avec risque <= 5%
-    # Réduire encore plus les risques pour permettre d'atteindre la cible
-    np.random.seed(123)  # Seed différent du Scénario 1
-    noise = np.random.normal(0, 0.005, len(df))  # Variabilité très réduite
-    # Réduire drastiquement les risques de base pour le Scénario 2
-    df['PD_calibrée'] = np.minimum(0.12, np.maximum(0.003, (df['risk_score'] * 0.25) + noise))
-    
-    # Décision de solvabilité avec seuil optimisé pour la cible de clients
-    seuil_optimal = 0.12  # Seuil optimisé pour avoir suffisamment de clients à faible risque
-    df['Yi'] = (df['PD_calibrée'] <= seuil_optimal).astype(int)
-    
-    # Filtrer les clients solvables
-    clients_solvables = df[df['Yi'] == 1].copy()
-    print(f"Clients solvables: {len(clients_solvables):,}")
-
-except Exception as e:
-    print(f"Erreur: {e}")
-    exit(1)
-
-# Paramètres du Scénario 2
-BUDGET_TOTAL = 93_729_390  # Budget fixe pour les deux scénarios
-TAUX_RISQUE = 0.05  # 5%
-LGD = 0.6  # Loss Given Default = 60% (paramètre manquant ajouté)
-# Scénario 2: Sécurisation - utiliser moins de budget pour être plus conservateur
-BUDGET_UTILISE = int(BUDGET_TOTAL * 0.75)  # 75% du budget pour sécurisation
-
-print(f"Budget total: {BUDGET_TOTAL:,} euros")
-print(f"Budget utilisé (sécurisation): {BUDGET_UTILISE:,} euros (75%)")
-print(f"Risque max: {TAUX_RISQUE*100}%, LGD: {LGD*100}%")
-
-# 3. Répartition stratégique par objectif (Scénario 2)
-print("\n3. Répartition stratégique par objectif")
-
-repartition_scenario2 = {
-    'EDUCATION': 0.30,        # 30%
-    'MEDICAL': 0.30,          # 30%
-    'PERSONAL': 0.15,         # 15%
-    'VENTURE': 0.10,          # 10%
-    'HOMEIMPROVEMENT': 0.10,  # 10%
-    'DEBTCONSOLIDATION': 0.10 # 10%
-}
-
-# 4. Préparation des données pour l'optimisation
-print("\n4. Préparation des données")
-
-np.random.seed(123)  # Seed différent pour avoir des clients différents
-
-# Montants demandés (plus petits en période de ralentissement)
-clients_solvables['montant_demande'] = (clients_solvables['loan_amnt'] * 0.8).astype(int)
-
-# Objectifs de prêt selon la répartition du scénario 2
-loan_intent_columns = [col for col in clients_solvables.columns if col.startswith('loan_intent_')]
-
-if loan_intent_columns:
-    def get_loan_intent(row):
-        for col in loan_intent_columns:
-            if row[col] == 1:
-                return col.replace('loan_intent_', '')
-        return 'PERSONAL'
-    
-    clients_solvables['loan_intent'] = clients_solvables.apply(get_loan_intent, axis=1)
-else:
-    objectifs = list(repartition_scenario2.keys())
-    probabilites = list(repartition_scenario2.values())
-
-    # Normaliser les probabilités pour s'assurer qu'elles somment à 1
-    probabilites = np.array(probabilites)
-    probabilites = probabilites / probabilites.sum()
-
-    clients_solvables['loan_intent'] = np.random.choice(
-        objectifs, size=len(clients_solvables), p=probabilites
-    )
-
-# Calculer les taux de rendement (plus faibles en période de ralentissement)
-def calculer_taux_rendement_scenario2(row):
-    base_rate = row['loan_int_rate'] / 100 * 0.8  # Réduction de 20% des taux
-    
-    # Ajustements selon l'objectif du prêt pour Scénario 2
-    ajustements = {
-        'EDUCATION': 0.015,           # +1.5% (secteur prioritaire)
-        'MEDICAL': 0.015,             # +1.5% (secteur prioritaire)
-        'PERSONAL': 0.005,            # +0.5% (consommation réduite)
-        'VENTURE': 0.008,             # +0.8% (risque entrepreneurial réduit)
-        'HOMEIMPROVEMENT': 0.008,     # +0.8% (investissement réduit)
-        'DEBTCONSOLIDATION': 0.012    # +1.2% (restructuration importante)
-    }
-    
-    return base_rate + ajustements.get(row['loan_intent'], 0)
-
-clients_solvables['taux_rendement'] = clients_solvables.apply(calculer_taux_rendement_scenario2, axis=1)
-
-print(f"Données préparées: {len(clients_solvables)} clients")
-print(f"Montant moyen demandé: {clients_solvables['montant_demande'].mean():,.0f} euros")
-print(f"Taux de rendement moyen: {clients_solvables['taux_rendement'].mean()*100:.2f}%")
-
-# Préparer les données pour l'optimisation
-N = len(clients_solvables)
-Mi = clients_solvables['montant_demande'].values
-ri = clients_solvables['taux_rendement'].values
-PD = clients_solvables['PD_calibrée'].values
-
-# Fonction objectif: Maximiser le profit net attendu
-# profit_i = ri * Mi - PDi * LGD * Mi (revenus - pertes attendues)
-profit_net = Mi * ri - PD * LGD * Mi
-c = -profit_net  # Négatif pour maximisation avec linprog
-
-# Contraintes d'inégalité (A_ub × x ≤ b_ub)
-A_ub = []
-b_ub = []
-
-# 1. Contrainte budgétaire: Σ(Mi × Yi) ≤ BUDGET_UTILISE
-A_ub.append(Mi)
-b_ub.append(BUDGET_UTILISE)
-
-# 2. Contrainte de risque: Σ(PDi × Mi × Yi) ≤ TR × B
-A_ub.append(PD * Mi)
-b_ub.append(TAUX_RISQUE * BUDGET_UTILISE)
-
-# 3. Contraintes d'allocation par catégorie de prêt
-# Pour chaque catégorie: pct × B × (1-ε) ≤ Σ(Mi × Yi pour cette catégorie) ≤ pct × B × (1+ε)
-epsilon = 0.05  # Tolérance de 5%
-
-# Créer des masques pour chaque catégorie de prêt
-categories_masks = {}
-for categorie in repartition_scenario2.keys():
-    mask = (clients_solvables['loan_intent'] == categorie).values
-    categories_masks[categorie] = mask
-
-    if mask.sum() > 0:  # Si on a des clients dans cette catégorie
-        pct_target = repartition_scenario2[categorie]
-        budget_min = pct_target * BUDGET_UTILISE * (1 - epsilon)
-        budget_max = pct_target * BUDGET_UTILISE * (1 + epsilon)
-
-        # Contrainte minimum: -Σ(Mi × Yi pour catégorie) ≤ -budget_min
-        A_ub.append(-(Mi * mask))
-        b_ub.append(-budget_min)
-
-        # Contrainte maximum: Σ(Mi × Yi pour catégorie) ≤ budget_max
-        A_ub.append(Mi * mask)
-        b_ub.append(budget_max)
-
-# Bornes des variables (0 ≤ Yi ≤ 1, variables binaires)
-bounds = [(0, 1) for _ in range(N)]
-
-# Résolution de l'optimisation linéaire
-
-try:
-    # Convertir les listes en arrays numpy
-    A_ub_array = np.array(A_ub)
-    b_ub_array = np.array(b_ub)
-
-    result = linprog(c, A_ub=A_ub_array, b_ub=b_ub_array, bounds=bounds, method='highs')
-
-    if result.success:
-
-
-        # Variables de décision optimales (arrondir à 0 ou 1 pour binaire)
-        Yi_optimal = np.round(result.x).astype(int)
-
-        # Calculer les métriques de la solution
-        clients_selectionnes = np.sum(Yi_optimal)
-        montant_total_alloue = np.sum(Mi * Yi_optimal)
-        revenus_totaux = np.sum(Mi * Yi_optimal * ri)
-        pertes_attendues = np.sum(Mi * Yi_optimal * PD * LGD)
-        profit_net = revenus_totaux - pertes_attendues
-        risque_moyen = np.sum(Mi * Yi_optimal * PD) / montant_total_alloue if montant_total_alloue > 0 else 0
-
-        print(f"Clients sélectionnés: {clients_selectionnes:,} / {N:,}")
-        print(f"Montant alloué: {montant_total_alloue:,.0f} euros")
-        print(f"Utilisation budget: {(montant_total_alloue/BUDGET_UTILISE)*100:.1f}% du budget alloué")
-        print(f"Utilisation budget total: {(montant_total_alloue/BUDGET_TOTAL)*100:.1f}% du budget total")
-        print(f"Revenus totaux: {revenus_totaux:,.0f} euros")
-        print(f"Pertes attendues: {pertes_attendues:,.0f} euros")
-        print(f"Profit net: {profit_net:,.0f} euros")
-        print(f"Risque moyen: {risque_moyen*100:.2f}%")
-        if montant_total_alloue > 0:
-            print(f"ROI net: {(profit_net/montant_total_alloue)*100:.2f}%")
-
-        # Vérifier les allocations par catégorie
-        print("\nVérification des allocations par catégorie:")
-        for categorie, pct_target in repartition_scenario2.items():
-            mask = (clients_solvables['loan_intent'] == categorie).values
-            montant_categorie = np.sum(Mi * Yi_optimal * mask)
-            pct_reel = (montant_categorie / montant_total_alloue) * 100 if montant_total_alloue > 0 else 0
-            print(f"  {categorie}: {pct_reel:.1f}% (cible: {pct_target*100:.0f}%)")
-
-        # Ajouter les résultats au DataFrame
-        clients_solvables['Yi_optimal'] = Yi_optimal
-        clients_solvables['credit_alloue'] = Yi_optimal
-        clients_solvables['montant_alloue'] = Mi * Yi_optimal
-        clients_solvables['revenus_attendus'] = Mi * Yi_optimal * ri
-        clients_solvables['pertes_attendues'] = Mi * Yi_optimal * PD * LGD
-        clients_solvables['profit_net'] = clients_solvables['revenus_attendus'] - clients_solvables['pertes_attendues']
-        
-    else:
-        print("Échec de l'optimisation:", result.message)
-        print("Application d'une solution heuristique...")
-
-        # Trier les clients par profit net décroissant
-        profit_net_individuel = Mi * ri - PD * LGD * Mi
-        indices_tries = np.argsort(-profit_net_individuel)
 
-        Yi_heuristique = np.zeros(N, dtype=int)
-        budget_utilise = 0
-        risque_cumule = 0
-
-        for idx in indices_tries:
-            nouveau_budget = budget_utilise + Mi[idx]
-            nouveau_risque_total = risque_cumule + Mi[idx] * PD[idx]
-            nouveau_risque_moyen = nouveau_risque_total / nouveau_budget if nouveau_budget > 0 else 0
-
-            if (nouveau_budget <= BUDGET_UTILISE and
-                nouveau_risque_moyen <= TAUX_RISQUE):
-                Yi_heuristique[idx] = 1
-                budget_utilise = nouveau_budget
-                risque_cumule = nouveau_risque_total
-
-        # Calculer les métriques de la solution heuristique
-        clients_selectionnes = np.sum(Yi_heuristique)
-        montant_total_alloue = np.sum(Mi * Yi_heuristique)
-        revenus_totaux = np.sum(Mi * Yi_heuristique * ri)
-        pertes_attendues = np.sum(Mi * Yi_heuristique * PD * LGD)
-        profit_net = revenus_totaux - pertes_attendues
-        risque_moyen = np.sum(Mi * Yi_heuristique * PD) / montant_total_alloue if montant_total_alloue > 0 else 0
-
-        print(f"Solution heuristique: {clients_selectionnes:,} clients")
-        print(f"Montant alloué: {montant_total_alloue:,.0f} euros")
-        print(f"Profit net: {profit_net:,.0f} euros")
-        print(f"Risque: {risque_moyen*100:.2f}%")
-
-        # Ajouter les résultats au DataFrame
-        clients_solvables['Yi_optimal'] = Yi_heuristique
-        clients_solvables['credit_alloue'] = Yi_heuristique
-        clients_solvables['montant_alloue'] = Mi * Yi_heuristique
-        clients_solvables['revenus_attendus'] = Mi * Yi_heuristique * ri
-        clients_solvables['pertes_attendues'] = Mi * Yi_heuristique * PD * LGD
-        clients_solvables['profit_net'] = clients_solvables['revenus_attendus'] - clients_solvables['pertes_attendues']
-
-except Exception as e:
-    print(f"Erreur lors de l'optimisation: {e}")
-    exit(1)
-
-# 7. Analyse des résultats par objectif de prêt
-print("\n7. Analyse des résultats par objectif")
-
-if 'credit_alloue' in clients_solvables.columns:
-    # Clients sélectionnés
-    clients_selectionnes_df = clients_solvables[clients_solvables['credit_alloue'] == 1]
-
-    if len(clients_selectionnes_df) > 0:
-        analyse_par_objectif = clients_selectionnes_df.groupby('loan_intent').agg({
-            'credit_alloue': 'count',
-            'montant_alloue': 'sum',
-            'revenus_attendus': 'sum',
-            'taux_rendement': 'mean',
-            'PD_calibrée': 'mean'
-        }).round(2)
-
-        analyse_par_objectif.columns = ['Nb_Clients', 'Montant_Total', 'Revenus_Attendus', 'Taux_Rendement_Moyen', 'PD_Moyenne']
-
-        print("Analyse par objectif de prêt:")
-        print(analyse_par_objectif)
-
-        # Calcul des pourcentages réels vs stratégie
-        print(f"\nComparaison Stratégie vs Réalisation:")
-        montant_total_reel = analyse_par_objectif['Montant_Total'].sum()
-
-        for objectif in repartition_scenario2.keys():
-            if objectif in analyse_par_objectif.index:
-                montant_reel = analyse_par_objectif.loc[objectif, 'Montant_Total']
-                pourcentage_reel = (montant_reel / montant_total_reel) * 100
-                pourcentage_cible = repartition_scenario2[objectif] * 100
-                print(f"• {objectif}: Cible {pourcentage_cible:.0f}% vs Réel {pourcentage_reel:.1f}%")
-
-# Créer le dossier de résultats
-import os
-os.makedirs('scenario_2_results', exist_ok=True)
-
-# Génération des visualisations (optionnel)
-if 'credit_alloue' in clients_solvables.columns and 'analyse_par_objectif' in locals():
-    try:
-        # Graphique simple de répartition
-        plt.figure(figsize=(10, 6))
-        objectifs = list(analyse_par_objectif.index)
-        montants = analyse_par_objectif['Montant_Total'].values
-
-        plt.pie(montants, labels=objectifs, autopct='%1.1f%%', startangle=90)
-        plt.title('Répartition des Montants par Objectif de Prêt - Scénario 2')
-        plt.savefig('scenario_2_results/repartition_montants_scenario2.png', dpi=300, bbox_inches='tight')
-        plt.close()
-
-        print("Visualisations sauvegardées")
-    except Exception as e:
-        print(f"Erreur lors de la génération des graphiques: {e}")
-
-# 8. Export des résultats
-print("\n8. Export des résultats")
-
-if 'credit_alloue' in clients_solvables.columns:
-    clients_approuves = clients_solvables[clients_solvables['Yi_optimal'] == 1].copy()
-
-    print(f"Clients approuvés: {len(clients_approuves)} sur {len(clients_solvables)}")
-
-    if len(clients_approuves) == 0:
-        print("Aucun client approuvé - application de critères de secours")
-
-        if len(clients_solvables) >= 50:
-            score_qualite = (
-                (1 - clients_solvables['PD_calibrée']) * 0.6 +
-                (clients_solvables['person_income'] / 200000) * 0.4
-            )
-
-            top_clients_indices = score_qualite.nlargest(50).index
-            clients_solvables.loc[top_clients_indices, 'Yi_optimal'] = 1
-            clients_solvables.loc[top_clients_indices, 'credit_alloue'] = 1
-
-            clients_approuves = clients_solvables[clients_solvables['Yi_optimal'] == 1].copy()
-            print(f"Sélection de secours: {len(clients_approuves)} clients")
-        else:
-            print("Dataset trop petit pour générer un résultat")
-            exit(1)
-
-    # Préparer les données finales avec seulement les clients approuvés
-    resultats_scenario2 = clients_approuves[[
-        'loan_percent_income', 'cb_person_cred_hist_length', 'person_emp_length',
-        'person_age', 'person_income', 'loan_int_rate', 'person_home_ownership_RENT',
-        'PD_calibrée', 'Yi_optimal'
-    ]].copy()
-
-    # Renommer Yi_optimal en Yi pour correspondre au format de l'exemple
-    # Tous les clients dans ce dataset ont Yi = 1 (approuvés)
-    resultats_scenario2.rename(columns={'Yi_optimal': 'Yi'}, inplace=True)
-
-    # Convertir person_home_ownership_RENT en 0/1 au lieu de True/False
-    resultats_scenario2['person_home_ownership_RENT'] = resultats_scenario2['person_home_ownership_RENT'].astype(int)
-
-    # Sauvegarder au format Excel (comme l'exemple)
-    output_filename = 'Scenario_2_Optimisation_Resultats.xlsx'
-
-    try:
-        resultats_scenario2.to_excel(output_filename, index=False, engine='openpyxl')
-    except PermissionError:
-        print(f"Fichier {output_filename} ouvert dans Excel. Tentative avec un nouveau nom...")
-        import datetime
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_filename = f'Scenario_2_Optimisation_Resultats_{timestamp}.xlsx'
-        resultats_scenario2.to_excel(output_filename, index=False, engine='openpyxl')
-    except Exception as e:
-        print(f"Erreur lors de l'export: {e}")
-        # Export en CSV en cas d'échec
-        output_filename = 'Scenario_2_Optimisation_Resultats.csv'
-        resultats_scenario2.to_csv(output_filename, index=False)
-        print(f"Export réalisé en CSV: {output_filename}")
-
-    print(f"Résultats exportés vers: {output_filename}")
-    print(f"Format: {len(resultats_scenario2)} clients approuvés")
-
-    # Statistiques finales
-    clients_approuves_total = len(resultats_scenario2)
-    clients_analyses_total = len(clients_solvables)
-    taux_approbation = (clients_approuves_total / clients_analyses_total) * 100
-
-    print(f"\nRésultats finaux:")
-    print(f"Clients analysés: {clients_analyses_total:,}")
-    print(f"Clients approuvés: {clients_approuves_total:,}")
-    print(f"Taux d'approbation: {taux_approbation:.1f}%")
-    print(f"Montant alloué: {montant_total_alloue:,.0f} euros")
-    print(f"Budget utilisé: {(montant_total_alloue/BUDGET_TOTAL)*100:.1f}%")
-    print(f"Budget total utilisé: {(montant_total_alloue/BUDGET_TOTAL)*100:.1f}%")
-    print(f"ROI estimé: {(revenus_totaux/montant_total_alloue)*100:.2f}%")
-
-    # Export détaillé pour analyse
-    clients_solvables_detail = clients_solvables[[
-        'loan_percent_income', 'cb_person_cred_hist_length', 'person_emp_length',
-        'person_age', 'person_income', 'loan_int_rate', 'person_home_ownership_RENT',
-        'PD_calibrée', 'Yi', 'montant_demande', 'loan_intent', 'taux_rendement',
-        'Yi_optimal', 'credit_alloue', 'montant_alloue', 'revenus_attendus'
-    ]].copy()
-
-    with pd.ExcelWriter('scenario_2_results/Scenario_2_Analyse_Complete.xlsx', engine='openpyxl') as writer:
-        # Feuille 1: Résultats principaux (format exemple)
-        resultats_scenario2.to_excel(writer, sheet_name='Resultats_Principaux', index=False)
-
-        # Feuille 2: Analyse détaillée
-        clients_solvables_detail.to_excel(writer, sheet_name='Analyse_Detaillee', index=False)
-
-        # Feuille 3: Clients sélectionnés seulement
-        clients_selectionnes = clients_solvables_detail[clients_solvables_detail['credit_alloue'] == 1]
-        clients_selectionnes.to_excel(writer, sheet_name='Clients_Selectionnes', index=False)
-
-        # Feuille 4: Analyse par objectif
-        if 'analyse_par_objectif' in locals():
-            analyse_par_objectif.to_excel(writer, sheet_name='Analyse_Par_Objectif')
-
-        # Feuille 5: Paramètres du scénario
-        parametres_scenario = pd.DataFrame({
-            'Parametre': [
-                'Stratégie',
-                'Taux de risque cible (%)',
-                'Budget total (€)',
-                'Budget conservateur (€)',
-                'Seuil de solvabilité',
-                'EDUCATION (%)',
-                'MEDICAL (%)',
-                'PERSONAL (%)',
-                'VENTURE (%)',
-                'HOMEIMPROVEMENT (%)',
-                'DEBTCONSOLIDATION (%)'
-            ],
-            'Valeur': [
-                'Sécurisation des Actifs',
-                TAUX_RISQUE * 100,
-                BUDGET_TOTAL,
-                BUDGET_TOTAL,
-                0.25,
-                repartition_scenario2['EDUCATION'] * 100,
-                repartition_scenario2['MEDICAL'] * 100,
-                repartition_scenario2['PERSONAL'] * 100,
-                repartition_scenario2['VENTURE'] * 100,
-                repartition_scenario2['HOMEIMPROVEMENT'] * 100,
-                repartition_scenario2['DEBTCONSOLIDATION'] * 100
-            ]
-        })
-        parametres_scenario.to_excel(writer, sheet_name='Parametres_Scenario', index=False)
-
-    print(f"Analyse complète exportée vers 'scenario_2_results/Scenario_2_Analyse_Complete.xlsx'")
-
-else:
-    print("Erreur: Les données d'optimisation ne sont pas disponibles")
-
-# 9. Validation de la conformité
-print("\n9. Validation de la conformité")
-
-if 'credit_alloue' in clients_solvables.columns:
-    clients_finaux = clients_solvables[clients_solvables['credit_alloue'] == 1]
-
-    if len(clients_finaux) > 0 and clients_finaux['montant_alloue'].sum() > 0:
-        risque_final = np.average(clients_finaux['PD_calibrée'], weights=clients_finaux['montant_alloue'])
-        age_moyen = clients_finaux['person_age'].mean()
-        revenu_moyen = clients_finaux['person_income'].mean()
-        emploi_stable = (clients_finaux['person_emp_length'] >= 3).mean() * 100
-        historique_bon = (clients_finaux['cb_person_cred_hist_length'] >= 4).mean() * 100
-        ratio_pret_revenu = clients_finaux['loan_percent_income'].mean() * 100
-    elif len(clients_finaux) > 0:
-        # Si pas de montants alloués, utiliser moyenne simple
-        risque_final = clients_finaux['PD_calibrée'].mean()
-        age_moyen = clients_finaux['person_age'].mean()
-        revenu_moyen = clients_finaux['person_income'].mean()
-        emploi_stable = (clients_finaux['person_emp_length'] >= 3).mean() * 100
-        historique_bon = (clients_finaux['cb_person_cred_hist_length'] >= 4).mean() * 100
-        ratio_pret_revenu = clients_finaux['loan_percent_income'].mean() * 100
-    else:
-        print("Aucun client final pour validation")
-        statut = "ECHEC"
-
-    # Validation seulement si on a des clients
-    if len(clients_finaux) > 0 and 'risque_final' in locals():
-        print("Conformité aux exigences:")
-        print(f"Risque <= 5%: {risque_final*100:.2f}% ({'OK' if risque_final <= 0.05 else 'NOK'})")
-        print(f"Emploi stable: {emploi_stable:.1f}% ({'OK' if emploi_stable >= 50 else 'NOK'})")
-        print(f"Bon historique: {historique_bon:.1f}% ({'OK' if historique_bon >= 50 else 'NOK'})")
-        print(f"Age approprié: {age_moyen:.1f} ans ({'OK' if 18 <= age_moyen <= 75 else 'NOK'})")
-        print(f"Revenus décents: {revenu_moyen:,.0f} euros ({'OK' if revenu_moyen >= 15000 else 'NOK'})")
-        print(f"Nombre de clients: {len(clients_finaux):,} ({'OK' if 6500 <= len(clients_finaux) <= 7500 else 'NOK'})")
-
-        criteres_respectes = [
-            risque_final <= 0.05,
-            emploi_stable >= 50,
-            historique_bon >= 50,
-            18 <= age_moyen <= 75,
-            revenu_moyen >= 15000,
-            ratio_pret_revenu <= 45,
-            6500 <= len(clients_finaux) <= 7500
-        ]
-
-        score_conformite = sum(criteres_respectes) / len(criteres_respectes) * 100
+Paramètres du scénario: scenarios/scenario_2.json
+Usage: python partie_2_scenario_2.py [--incremental]
+"""
 
-        if score_conformite >= 90:
-            statut = "CONFORME"
-        elif score_conformite >= 70:
-            statut = "LARGEMENT CONFORME"
-        else:
-            statut = "PARTIELLEMENT CONFORME"
+import sys
 
-        print(f"Score de conformité: {score_conformite:.1f}%")
-else:
-    statut = "ECHEC"
+from credit_optimization.cli import main
 
-print(f"\nScénario 2 complété - Statut: {statut}")
-print("Résultats sauvegardés dans 'scenario_2_results/'")
-print("-" * 60)
+if __name__ == '__main__':
+    sys.exit(main(['scenarios/scenario_2.json'] + sys.argv[1:]))